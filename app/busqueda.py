@@ -0,0 +1,217 @@
+# busqueda.py
+"""
+Responsabilidad: Buscar estudiantes por nombres, apellidos y correo sin distinguir tildes ni mayúsculas.
+
+Los textos se pliegan (sin tildes ni mayúsculas: "Gómez" -> "gomez") y se
+parten en términos: cada palabra de nombres y apellidos, y el correo completo.
+El índice guarda los términos distintos ordenados y, para cada uno, las filas
+en que aparece (en un solo arreglo, agrupadas por término). Así un prefijo
+corresponde a un rango contiguo de términos y de filas, que se encuentra con
+bisección y se puntúa con numpy sin recorrer término por término.
+
+Para tolerar errores de tipeo ("gomes", "rodriguez" -> "Rodríguez") las palabras
+de nombres y apellidos también se indexan por trigramas: los términos que
+comparten suficientes trigramas con la palabra buscada cuentan como coincidencia
+difusa, con menos puntaje. El correo solo se busca por prefijo.
+
+Cada palabra de la consulta debe coincidir con algún término de la fila; el
+puntaje de la fila es la suma del mejor puntaje de cada palabra.
+"""
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from operator import attrgetter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Campos indexados y el peso de una coincidencia en cada uno
+CAMPOS_BUSQUEDA = ["nombres", "apellidos", "correo"]
+PESOS_CAMPO = np.array([1.0, 1.0, 0.8], dtype=np.float32)
+
+# Fracción del puntaje de una coincidencia difusa respecto de una exacta
+FACTOR_DIFUSO = 0.6
+
+# Similitud mínima (coeficiente de Dice sobre trigramas) para una coincidencia difusa
+UMBRAL_SIMILITUD = 0.5
+
+# Palabras de la consulta más cortas no se buscan en forma difusa
+LARGO_MINIMO_DIFUSO = 3
+
+# Términos más parecidos que se consideran por cada palabra de la consulta
+MAX_TERMINOS_DIFUSOS = 200
+
+_SEPARADORES = re.compile(r"[\W_]+")
+
+# Mayor carácter posible: cierra el rango de términos que empiezan con un prefijo
+_FIN_PREFIJO = "\U0010ffff"
+
+def plegar(texto: str) -> str:
+    """
+    Quita tildes y mayúsculas: "José Núñez" -> "jose nunez".
+    """
+    if texto.isascii():
+        return texto.lower()
+    descompuesto = unicodedata.normalize("NFKD", texto)
+    return "".join(caracter for caracter in descompuesto if not unicodedata.combining(caracter)).casefold()
+
+def terminos_nombre(texto: str) -> List[str]:
+    """Palabras plegadas de un nombre o apellido, sin repetir."""
+    return list(dict.fromkeys(termino for termino in _SEPARADORES.split(plegar(texto)) if termino))
+
+def palabras_consulta(consulta: str) -> List[str]:
+    """
+    Palabras plegadas de una consulta. Se separan solo por espacios, así un
+    correo (o su comienzo) se busca completo.
+    """
+    palabras = (palabra.strip(".,;:") for palabra in plegar(consulta).split())
+    return list(dict.fromkeys(palabra for palabra in palabras if palabra))
+
+def trigramas(termino: str) -> List[str]:
+    """Trigramas distintos de un término, con dos espacios al inicio y uno al final."""
+    relleno = f"  {termino} "
+    return list(dict.fromkeys(relleno[i:i + 3] for i in range(len(relleno) - 2)))
+
+class IndiceBusqueda:
+    """
+    Índice invertido de las filas de una lista de estudiantes (ver la descripción del módulo).
+
+    Las filas se identifican por su posición en la lista con que se construyó;
+    el índice no se actualiza, el almacén construye uno nuevo cuando cambia.
+    """
+    def __init__(self, estudiantes: List) -> None:
+        self.filas_totales = len(estudiantes)
+        identificadores: Dict[str, int] = {}
+        filas = array("i")
+        codigos = array("i")
+        campos = array("b")
+
+        for posicion_campo, campo in enumerate(CAMPOS_BUSQUEDA):
+            # Los nombres se repiten mucho: cada valor distinto se parte una vez
+            memoria: Dict[str, Tuple[int, ...]] = {}
+            for fila, valor in enumerate(map(attrgetter(campo), estudiantes)):
+                if not valor:
+                    continue
+                if campo == "correo":
+                    termino = plegar(valor)
+                    codigo = identificadores.get(termino)
+                    if codigo is None:
+                        codigo = identificadores[termino] = len(identificadores)
+                    filas.append(fila)
+                    codigos.append(codigo)
+                    campos.append(posicion_campo)
+                    continue
+                codigos_valor = memoria.get(valor)
+                if codigos_valor is None:
+                    codigos_valor = memoria[valor] = tuple(
+                        identificadores.setdefault(termino, len(identificadores)) for termino in terminos_nombre(valor)
+                    )
+                for codigo in codigos_valor:
+                    filas.append(fila)
+                    codigos.append(codigo)
+                    campos.append(posicion_campo)
+
+        # Términos ordenados y, por cada uno, sus filas contiguas en self.filas
+        terminos = list(identificadores)
+        orden = sorted(range(len(terminos)), key=terminos.__getitem__)
+        self.terminos: List[str] = [terminos[codigo] for codigo in orden]
+        rango = np.empty(len(terminos), dtype=np.int32)
+        rango[orden] = np.arange(len(terminos), dtype=np.int32)
+        codigos = rango[np.frombuffer(codigos, dtype=np.int32)]
+        por_termino = np.argsort(codigos, kind="stable")
+        self.filas = np.frombuffer(filas, dtype=np.int32)[por_termino]
+        self.campos = np.frombuffer(campos, dtype=np.int8)[por_termino]
+        self.inicio = np.zeros(len(terminos) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codigos, minlength=len(terminos)), out=self.inicio[1:])
+        # En un correo cuenta como exacta la coincidencia con la parte anterior a la arroba
+        self.largos = np.fromiter(
+            (len(termino.partition("@")[0]) for termino in self.terminos), dtype=np.float32, count=len(self.terminos)
+        )
+
+        # Trigramas de las palabras de nombres y apellidos (los correos no se buscan en forma difusa)
+        de_nombres = np.zeros(len(terminos), dtype=bool)
+        de_nombres[codigos[np.frombuffer(campos, dtype=np.int8) != CAMPOS_BUSQUEDA.index("correo")]] = True
+        por_trigrama: Dict[str, array] = {}
+        self.cantidad_trigramas = np.zeros(len(terminos), dtype=np.float32)
+        for codigo in np.flatnonzero(de_nombres).tolist():
+            propios = trigramas(self.terminos[codigo])
+            self.cantidad_trigramas[codigo] = len(propios)
+            for trigrama in propios:
+                lista = por_trigrama.get(trigrama)
+                if lista is None:
+                    lista = por_trigrama[trigrama] = array("i")
+                lista.append(codigo)
+        self.trigramas: Dict[str, np.ndarray] = {
+            trigrama: np.frombuffer(lista, dtype=np.int32) for trigrama, lista in por_trigrama.items()
+        }
+
+    def _rango_prefijo(self, palabra: str) -> Tuple[int, int]:
+        return bisect_left(self.terminos, palabra), bisect_left(self.terminos, palabra + _FIN_PREFIJO)
+
+    def _terminos_parecidos(self, palabra: str) -> Tuple[np.ndarray, np.ndarray]:
+        # Términos con similitud suficiente y su similitud, de mayor a menor
+        listas = [self.trigramas[trigrama] for trigrama in trigramas(palabra) if trigrama in self.trigramas]
+        if not listas:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        codigos, compartidos = np.unique(np.concatenate(listas), return_counts=True)
+        similitud = 2 * compartidos / (len(trigramas(palabra)) + self.cantidad_trigramas[codigos])
+        elegidos = np.flatnonzero(similitud >= UMBRAL_SIMILITUD)
+        elegidos = elegidos[np.argsort(-similitud[elegidos], kind="stable")[:MAX_TERMINOS_DIFUSOS]]
+        return codigos[elegidos], similitud[elegidos].astype(np.float32)
+
+    def puntuar_palabra(self, palabra: str, difusa: bool = True) -> np.ndarray:
+        """
+        Puntaje de cada fila para una palabra de la consulta (0 si no coincide).
+
+        Un término que empieza con la palabra vale el peso del campo por
+        0.5 + 0.5 * (largo de la palabra / largo del término), hasta 1 si es
+        exacto (en un correo, si cubre la parte anterior a la arroba). Una
+        coincidencia difusa vale el peso por FACTOR_DIFUSO y por la similitud.
+        Se queda el mejor puntaje de cada fila.
+        """
+        puntajes = np.zeros(self.filas_totales, dtype=np.float32)
+        desde, hasta = self._rango_prefijo(palabra)
+        if desde < hasta:
+            inicio, fin = self.inicio[desde], self.inicio[hasta]
+            largos = np.repeat(self.largos[desde:hasta], np.diff(self.inicio[desde:hasta + 1]))
+            valores = PESOS_CAMPO[self.campos[inicio:fin]] * (0.5 + 0.5 * np.minimum(len(palabra) / largos, 1))
+            np.maximum.at(puntajes, self.filas[inicio:fin], valores)
+
+        if difusa and len(palabra) >= LARGO_MINIMO_DIFUSO:
+            codigos, similitudes = self._terminos_parecidos(palabra)
+            if len(codigos):
+                tramos = [np.arange(self.inicio[codigo], self.inicio[codigo + 1]) for codigo in codigos.tolist()]
+                cantidades = np.diff(self.inicio)[codigos]
+                posiciones = np.concatenate(tramos)
+                valores = PESOS_CAMPO[self.campos[posiciones]] * FACTOR_DIFUSO * np.repeat(similitudes, cantidades)
+                np.maximum.at(puntajes, self.filas[posiciones], valores)
+        return puntajes
+
+    def buscar(self, consulta: str, limite: int, difusa: bool = True) -> Tuple[List[Tuple[int, float]], int]:
+        """
+        Filas que coinciden con todas las palabras de `consulta`, de mayor a menor
+        puntaje (a igual puntaje, en el orden del almacén).
+
+        Devuelve hasta `limite` pares (posición, puntaje) y el total de coincidencias.
+        """
+        total = None
+        for palabra in palabras_consulta(consulta):
+            puntajes = self.puntuar_palabra(palabra, difusa)
+            if total is None:
+                total = puntajes
+            else:
+                # Una fila sin coincidencia para alguna palabra queda descartada
+                total = np.where((total > 0) & (puntajes > 0), total + puntajes, 0)
+        if total is None:
+            return [], 0
+
+        candidatas = np.flatnonzero(total)
+        if len(candidatas) > limite:
+            # Las `limite` mejores, sin ordenar todas las coincidencias
+            corte = np.partition(-total[candidatas], limite - 1)[limite - 1]
+            elegidas = candidatas[-total[candidatas] <= corte]
+        else:
+            elegidas = candidatas
+        elegidas = elegidas[np.lexsort((elegidas, -total[elegidas]))][:limite]
+        return [(fila, float(total[fila])) for fila in elegidas.tolist()], len(candidatas)
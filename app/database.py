@@ -1,10 +1,187 @@
 # database.py
 """
-Responsabilidad: Configuración base del sistema de archivos como “base de datos”.
+Responsabilidad: Persistencia de los estudiantes cargados en un archivo SQLite.
 
-Define la ruta al archivo .csv.
+Define la ruta del archivo de base de datos (variable de entorno ESTUDIANTES_DB;
+una cadena vacía desactiva la persistencia) y crea la tabla y sus índices si no existen.
+Las consultas se responden desde la memoria; la base solo se consulta por ID
+mientras las filas del snapshot abierto al arrancar no se construyeron (ver
+EstudianteStore.get_estudiante_by_id).
 
-Se asegura que el archivo exista y tenga cabeceras si es necesario.
+La base se abre en modo WAL: las lecturas no se bloquean mientras se escribe una carga.
+Cada carga de CSV se guarda en una sola transacción con executemany.
+"""
+import os
+import sqlite3
+from contextlib import contextmanager
+from operator import attrgetter
+from typing import Dict, Iterator, List, Tuple
+
+from app.models.estudiante import CAMPOS_ESTUDIANTE, EstudianteModel, crear_estudiantes
+
+# Ruta del archivo SQLite
+RUTA_BASE_DATOS = os.getenv("ESTUDIANTES_DB", os.path.join("data", "estudiantes.db"))
+
+# Columnas con índice propio: solo las que se consultan en la base (cada índice
+# encarece las cargas)
+COLUMNAS_INDEXADAS = ["id_estudiante"]
+
+# Columnas de la tabla: posición en el archivo, campos del estudiante y veredicto de validación
+COLUMNAS = ["posicion"] + CAMPOS_ESTUDIANTE + ["valido", "codigos_error"]
+
+# Filas que se leen de la base por cada llamada a fetchmany
+TAMANO_LECTURA = 10000
+
+class BaseDatosEstudiantes:
+    """
+    Tabla de estudiantes en SQLite con el mismo orden que el almacén en memoria.
+    """
+    def __init__(self, ruta: str = RUTA_BASE_DATOS):
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self.ruta = ruta
+        # El servidor usa la conexión desde el hilo del event loop y desde el pool de hilos
+        self.conexion = sqlite3.connect(ruta, check_same_thread=False, isolation_level=None)
+        self.conexion.execute("PRAGMA journal_mode=WAL")
+        # En WAL, NORMAL solo puede perder la última transacción ante un corte de luz
+        self.conexion.execute("PRAGMA synchronous=NORMAL")
+        self._en_transaccion = False
+        self._crear_tabla()
+
+    def _crear_tabla(self) -> None:
+        definiciones = ", ".join(
+            ["posicion INTEGER PRIMARY KEY"]
+            + [f"{campo} TEXT" for campo in CAMPOS_ESTUDIANTE]
+            + ["valido INTEGER", "codigos_error INTEGER NOT NULL DEFAULT 0"]
+        )
+        self.conexion.execute(f"CREATE TABLE IF NOT EXISTS estudiantes ({definiciones})")
+        self._crear_indices()
+        # Las bases creadas antes tenían índices en columnas que no se consultan
+        propios = {f"idx_estudiantes_{columna}" for columna in COLUMNAS_INDEXADAS}
+        anteriores = self.conexion.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'estudiantes' AND name LIKE 'idx_estudiantes_%'"
+        ).fetchall()
+        for nombre, in anteriores:
+            if nombre not in propios:
+                self.conexion.execute(f"DROP INDEX IF EXISTS {nombre}")
+
+    def _crear_indices(self) -> None:
+        for columna in COLUMNAS_INDEXADAS:
+            self.conexion.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_estudiantes_{columna} ON estudiantes ({columna})"
+            )
+
+    @contextmanager
+    def transaccion(self) -> Iterator[None]:
+        """
+        Agrupa todas las escrituras del bloque en una transacción.
+
+        Si ya hay una transacción abierta, las escrituras se suman a ella.
+        """
+        if self._en_transaccion:
+            yield
+            return
+        self.conexion.execute("BEGIN")
+        self._en_transaccion = True
+        try:
+            yield
+            self._crear_indices()
+            # La generación identifica el contenido confirmado (ver app/snapshot.py)
+            self.conexion.execute(f"PRAGMA user_version = {self.generacion() + 1}")
+        except BaseException:
+            self.conexion.execute("ROLLBACK")
+            raise
+        else:
+            self.conexion.execute("COMMIT")
+        finally:
+            self._en_transaccion = False
+
+    def insertar(self, inicio: int, estudiantes: List[EstudianteModel]) -> None:
+        """
+        Inserta estudiantes numerados desde la posición `inicio`.
+        """
+        marcadores = ", ".join("?" * len(COLUMNAS))
+        with self.transaccion():
+            self.conexion.executemany(
+                f"INSERT INTO estudiantes ({', '.join(COLUMNAS)}) VALUES ({marcadores})",
+                self._filas(inicio, estudiantes)
+            )
+
+    def _filas(self, inicio: int, estudiantes: List[EstudianteModel]) -> Iterator[tuple]:
+        valores = attrgetter(*CAMPOS_ESTUDIANTE)
+        for posicion, estudiante in enumerate(estudiantes, inicio):
+            valido = estudiante.es_valido
+            yield (posicion, *valores(estudiante), None if valido is None else int(valido), estudiante.codigos_error)
+
+    def actualizar(self, estudiantes: Dict[int, EstudianteModel]) -> None:
+        """
+        Reemplaza las filas de las posiciones indicadas.
+        """
+        asignaciones = ", ".join(f"{columna} = ?" for columna in COLUMNAS[1:])
+        with self.transaccion():
+            self.conexion.executemany(
+                f"UPDATE estudiantes SET {asignaciones} WHERE posicion = ?",
+                ((*fila[1:], fila[0]) for posicion, estudiante in estudiantes.items()
+                 for fila in self._filas(posicion, [estudiante]))
+            )
+
+    def vaciar(self) -> None:
+        """
+        Borra todos los estudiantes.
+
+        Los índices se eliminan y se vuelven a crear al confirmar la transacción:
+        construirlos una vez sobre la tabla llena es más rápido que actualizarlos
+        con cada fila insertada.
+        """
+        with self.transaccion():
+            for columna in COLUMNAS_INDEXADAS:
+                self.conexion.execute(f"DROP INDEX IF EXISTS idx_estudiantes_{columna}")
+            self.conexion.execute("DELETE FROM estudiantes")
+
+    def generacion(self) -> int:
+        """
+        Número de transacciones confirmadas; cambia cada vez que cambian los datos.
+        """
+        return self.conexion.execute("PRAGMA user_version").fetchone()[0]
+
+    def leer_todos(self) -> Iterator[EstudianteModel]:
+        """
+        Reconstruye los estudiantes guardados, en el orden en que se cargaron.
+        """
+        cursor = self.conexion.execute(
+            f"SELECT {', '.join(COLUMNAS[1:])} FROM estudiantes ORDER BY posicion"
+        )
+        while True:
+            filas = cursor.fetchmany(TAMANO_LECTURA)
+            if not filas:
+                break
+            columnas = dict(zip(COLUMNAS[1:], map(list, zip(*filas))))
+            for estudiante, valido, codigos_error in zip(
+                crear_estudiantes(columnas), columnas["valido"], columnas["codigos_error"]
+            ):
+                if valido is not None:
+                    estudiante.asignar_veredicto(codigos_error)
+                yield estudiante
+
+    def buscar(self, columna: str, valor: str) -> List[EstudianteModel]:
+        """
+        Devuelve los estudiantes con `columna` igual a `valor` usando el índice de la columna.
+        """
+        if columna not in COLUMNAS_INDEXADAS:
+            raise ValueError(f"La columna {columna} no tiene índice")
+        cursor = self.conexion.execute(
+            f"SELECT {', '.join(COLUMNAS[1:])} FROM estudiantes WHERE {columna} = ? ORDER BY posicion",
+            (valor,)
+        )
+        return [self._crear_estudiante(fila) for fila in cursor]
+
+    def cerrar(self) -> None:
+        self.conexion.close()
 
-No se conecta a una base de datos real; simula la lógica de persistencia.
-"""
\ No newline at end of file
+    def _crear_estudiante(self, fila: Tuple) -> EstudianteModel:
+        estudiante = EstudianteModel(*fila[:len(CAMPOS_ESTUDIANTE)])
+        valido, codigos_error = fila[len(CAMPOS_ESTUDIANTE):]
+        if valido is not None:
+            estudiante.asignar_veredicto(codigos_error)
+        return estudiante
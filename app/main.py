@@ -1,12 +1,34 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app.database import RUTA_BASE_DATOS, BaseDatosEstudiantes
+from app.metricas import MiddlewareMetricas, RegistroMetricas, vigilar_bucle_eventos
+from app.models.estudiante import EstudianteStore
+from app.perfilado import MiddlewarePerfilado
 from app.routers import estudiantes
+from app.snapshot import RUTA_SNAPSHOT
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Recuperar los estudiantes guardados; con ESTUDIANTES_DB y ESTUDIANTES_SNAPSHOT
+    # vacías todo queda en memoria. El snapshot se abre sin construir las filas.
+    store = EstudianteStore()
+    base_datos = BaseDatosEstudiantes(RUTA_BASE_DATOS) if RUTA_BASE_DATOS else None
+    store.conectar(base_datos, RUTA_SNAPSHOT or None)
+    vigilancia = asyncio.create_task(vigilar_bucle_eventos())
+    yield
+    vigilancia.cancel()
+    store.desconectar()
 
 app = FastAPI(
     title="API de Estudiantes",
     description="API para cargar y gestionar datos de estudiantes desde CSV",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuración de CORS
@@ -16,8 +38,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "X-Perfil", "ETag"],
 )
 
+# Latencia de cada endpoint para GET /metrics
+app.add_middleware(MiddlewareMetricas)
+
+# Perfilado a pedido de una petición (ver app/perfilado.py); sin token no hace nada
+app.add_middleware(MiddlewarePerfilado)
+
 # Incluir routers
 app.include_router(estudiantes.router, prefix="/api", tags=["estudiantes"])
 
@@ -25,6 +54,13 @@ app.include_router(estudiantes.router, prefix="/api", tags=["estudiantes"])
 async def root():
     return {"message": "API de Estudiantes funcionando correctamente"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    Métricas en el formato de texto de Prometheus.
+    """
+    return PlainTextResponse(RegistroMetricas.exponer(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,305 @@
+# metricas.py
+"""
+Responsabilidad: Métricas de la API expuestas en el formato de texto de Prometheus.
+
+Cada métrica se registra al crearse en RegistroMetricas, que arma el texto que
+devuelve GET /metrics. Se mide:
+    - la latencia de cada endpoint, hasta enviar el último byte (MiddlewareMetricas)
+    - el tiempo de cada etapa de una carga y sus filas por segundo (TiemposIngesta)
+    - las filas del almacén y los bytes que ocupan, calculados al consultar
+    - los aciertos y fallos de las cachés de validación
+    - el retraso del bucle de eventos (vigilar_bucle_eventos)
+
+Los contadores se actualizan también desde los hilos del executor, por eso cada
+métrica protege sus valores con un lock.
+"""
+import asyncio
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.models.estudiante import EstudianteStore
+
+# Límites de los buckets, en segundos
+BUCKETS_PETICIONES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_INGESTA = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+BUCKETS_BUCLE = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Cada cuánto despierta la tarea que mide el retraso del bucle de eventos
+INTERVALO_BUCLE = 0.5
+
+def _numero(valor: float) -> str:
+    if math.isinf(valor):
+        return "+Inf" if valor > 0 else "-Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+def _etiquetas(nombres: Sequence[str], valores: Sequence[str]) -> str:
+    if not nombres:
+        return ""
+    pares = []
+    for nombre, valor in zip(nombres, valores):
+        valor = str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pares.append(f'{nombre}="{valor}"')
+    return "{" + ",".join(pares) + "}"
+
+class RegistroMetricas:
+    """
+    Métricas conocidas por este proceso, en el orden en que se crearon.
+    """
+    _metricas: List["Metrica"] = []
+
+    @classmethod
+    def registrar(cls, metrica: "Metrica") -> None:
+        cls._metricas.append(metrica)
+
+    @classmethod
+    def exponer(cls) -> str:
+        """
+        Texto de todas las métricas en el formato de exposición de Prometheus (0.0.4).
+        """
+        lineas = []
+        for metrica in cls._metricas:
+            lineas.extend(metrica.lineas())
+        return "\n".join(lineas) + "\n"
+
+class Metrica:
+    """
+    Base de las métricas: nombre, ayuda y nombres de las etiquetas.
+    """
+    tipo = "untyped"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._lock = threading.Lock()
+        RegistroMetricas.registrar(self)
+
+    def _clave(self, valores: Sequence[str]) -> Tuple[str, ...]:
+        if len(valores) != len(self.etiquetas):
+            raise ValueError(f"{self.nombre} espera las etiquetas {self.etiquetas}, se recibieron {tuple(valores)}")
+        return tuple(str(valor) for valor in valores)
+
+    def lineas(self) -> List[str]:
+        return [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"] + self._muestras()
+
+    def _muestras(self) -> List[str]:
+        raise NotImplementedError
+
+class Contador(Metrica):
+    """Valor que solo aumenta."""
+    tipo = "counter"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = ()):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+
+    def incrementar(self, *etiquetas: str, cantidad: float = 1.0) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0.0) + cantidad
+
+    def _muestras(self) -> List[str]:
+        with self._lock:
+            valores = list(self._valores.items())
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}" for clave, valor in valores]
+
+class Medidor(Metrica):
+    """
+    Valor que sube y baja. Con `funcion` el valor se calcula al exponer las métricas.
+    """
+    tipo = "gauge"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (), funcion: Optional[Callable[[], float]] = None):
+        super().__init__(nombre, ayuda, etiquetas)
+        self._valores: Dict[Tuple[str, ...], float] = {}
+        self._funcion = funcion
+
+    def fijar(self, valor: float, *etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = valor
+
+    def _muestras(self) -> List[str]:
+        if self._funcion is not None:
+            return [f"{self.nombre} {_numero(self._funcion())}"]
+        with self._lock:
+            valores = list(self._valores.items())
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}" for clave, valor in valores]
+
+class Histograma(Metrica):
+    """
+    Distribución de observaciones en buckets acumulados, con su suma y su cantidad.
+    """
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_PETICIONES):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(sorted(buckets))
+        # Por combinación de etiquetas: observaciones por bucket (el último es +Inf) y suma
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observar(self, valor: float, *etiquetas: str) -> None:
+        clave = self._clave(etiquetas)
+        posicion = len(self.buckets)
+        for indice, limite in enumerate(self.buckets):
+            if valor <= limite:
+                posicion = indice
+                break
+        with self._lock:
+            serie = self._series.get(clave)
+            if serie is None:
+                serie = self._series[clave] = ([0] * (len(self.buckets) + 1), [0.0])
+            serie[0][posicion] += 1
+            serie[1][0] += valor
+
+    def _muestras(self) -> List[str]:
+        with self._lock:
+            series = [(clave, list(cuentas), suma[0]) for clave, (cuentas, suma) in self._series.items()]
+        muestras = []
+        nombres = self.etiquetas + ("le",)
+        for clave, cuentas, suma in series:
+            acumulado = 0
+            for limite, cuenta in zip(self.buckets + (math.inf,), cuentas):
+                acumulado += cuenta
+                muestras.append(f"{self.nombre}_bucket{_etiquetas(nombres, clave + (_numero(limite),))} {acumulado}")
+            muestras.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(suma)}")
+            muestras.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {acumulado}")
+        return muestras
+
+LATENCIA_PETICIONES = Histograma(
+    "http_peticion_duracion_segundos",
+    "Duración de las peticiones HTTP hasta enviar el último byte de la respuesta.",
+    ("metodo", "ruta", "estado"),
+)
+DURACION_ETAPA_INGESTA = Histograma(
+    "ingesta_etapa_duracion_segundos",
+    "Tiempo de cada etapa de una carga de CSV: decodificar, parsear, construir, validar, procesos y guardar.",
+    ("etapa",),
+    BUCKETS_INGESTA,
+)
+DURACION_INGESTA = Histograma(
+    "ingesta_duracion_segundos",
+    "Duración total de las cargas de CSV.",
+    (),
+    BUCKETS_INGESTA,
+)
+FILAS_INGERIDAS = Contador("ingesta_filas_total", "Filas leídas por las cargas de CSV terminadas.")
+FILAS_POR_SEGUNDO = Medidor("ingesta_filas_por_segundo", "Filas por segundo de la última carga de CSV terminada.")
+DURACION_VALIDACION = Histograma(
+    "validacion_completa_duracion_segundos",
+    "Tiempo de validar todo el almacén al consultarlo, cuando no hay veredictos de la carga.",
+    (),
+    BUCKETS_INGESTA,
+)
+CONSULTAS_CACHE = Contador(
+    "cache_validacion_consultas_total",
+    "Consultas a las cachés de validación por caché y resultado (acierto o fallo).",
+    ("cache", "resultado"),
+)
+FILAS_ALMACEN = Medidor(
+    "almacen_filas", "Filas en el almacén de estudiantes.", funcion=lambda: EstudianteStore().total_filas
+)
+BYTES_ALMACEN = Medidor(
+    "almacen_bytes_aproximados",
+    "Memoria aproximada de las filas del almacén, estimada con una muestra.",
+    funcion=lambda: EstudianteStore().tamano_aproximado()
+)
+RETRASO_BUCLE = Histograma(
+    "bucle_eventos_retraso_segundos",
+    "Retraso con que despierta una tarea que duerme a intervalos fijos: tiempo en que el bucle de eventos estuvo bloqueado.",
+    (),
+    BUCKETS_BUCLE,
+)
+
+class TiemposIngesta:
+    """
+    Acumula el tiempo de cada etapa de una carga y lo publica al terminar.
+
+    Las etapas se suman a lo largo de todos los bloques y lotes del archivo, así
+    cada carga aporta una sola observación por etapa.
+    """
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.segundos: Dict[str, float] = {}
+
+    def sumar(self, etapa: str, segundos: float) -> None:
+        self.segundos[etapa] = self.segundos.get(etapa, 0.0) + segundos
+
+    @contextmanager
+    def etapa(self, nombre: str):
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sumar(nombre, time.perf_counter() - inicio)
+
+    def publicar(self, filas: int) -> None:
+        duracion = time.perf_counter() - self.inicio
+        for etapa, segundos in self.segundos.items():
+            DURACION_ETAPA_INGESTA.observar(segundos, etapa)
+        DURACION_INGESTA.observar(duracion)
+        FILAS_INGERIDAS.incrementar(cantidad=filas)
+        if duracion > 0:
+            FILAS_POR_SEGUNDO.fijar(round(filas / duracion, 1))
+
+def _plantilla_ruta(scope) -> str:
+    # El router deja en el scope la ruta que atendió la petición. Con routers
+    # incluidos, algunas versiones de FastAPI guardan la ruta sin el prefijo del
+    # router: el prefijo se recupera quitando del path la ruta con sus parámetros
+    ruta = scope.get("route")
+    plantilla = getattr(ruta, "path_format", None) or getattr(ruta, "path", None)
+    if not plantilla:
+        return "sin_ruta"
+    try:
+        concreta = plantilla.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return plantilla
+    path = scope["path"]
+    if concreta and path.endswith(concreta):
+        return path[:len(path) - len(concreta)] + plantilla
+    return plantilla
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que registra la latencia de cada petición HTTP.
+
+    Se mide hasta el último fragmento del cuerpo, así las descargas por
+    streaming cuentan completas. La ruta es la plantilla del endpoint (por
+    ejemplo /api/estudiantes/{id_estudiante}) para no crear una serie por ID.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        inicio = time.perf_counter()
+        estado = 500
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            ruta = _plantilla_ruta(scope)
+            LATENCIA_PETICIONES.observar(time.perf_counter() - inicio, scope["method"], ruta, str(estado))
+
+async def vigilar_bucle_eventos(intervalo: float = INTERVALO_BUCLE) -> None:
+    """
+    Duerme `intervalo` segundos una y otra vez y registra cuánto tarde despierta.
+    """
+    while True:
+        esperado = time.perf_counter() + intervalo
+        await asyncio.sleep(intervalo)
+        RETRASO_BUCLE.observar(max(0.0, time.perf_counter() - esperado))
@@ -1,8 +1,163 @@
+import asyncio
+import gc
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional, List
+from operator import attrgetter
+from typing import Any, Callable, Optional, List, Dict, Tuple
 
-# Clase para almacenar los datos de estudiantes en memoria
+# Errores de validación codificados como bits. El orden es el mismo en que
+# EstudianteService aplica las reglas, así los mensajes se reconstruyen igual.
+# Cada entrada: (campo, tipo de error, texto para el resumen, mensaje del detalle)
+ERRORES_VALIDACION: List[Tuple[str, str, str, str]] = [
+    ("id_estudiante", "requerido", "Campo requerido", "ID de estudiante es requerido"),
+    ("nombres", "requerido", "Campo requerido", "Nombres es requerido"),
+    ("nombres", "solo_letras", "Solo letras permitidas", "Nombres debe contener solo letras"),
+    ("apellidos", "requerido", "Campo requerido", "Apellidos es requerido"),
+    ("apellidos", "solo_letras", "Solo letras permitidas", "Apellidos debe contener solo letras"),
+    ("correo", "requerido", "Campo requerido", "Correo es requerido"),
+    ("correo", "formato", "Formato inválido", "Formato de correo inválido"),
+    ("semestre", "requerido", "Campo requerido", "Semestre es requerido"),
+] + [
+    (campo, "no_permitido", "Valor no permitido: {valor}", campo + " tiene un valor no permitido: {valor}")
+    for campo in [
+        "tipo_vulnerabilidad", "riesgo_desercion", "tipo_participante", "riesgo_spadies",
+        "nivel_riesgo", "requiere_tutoria", "tipo_intervencion", "condicion_socioeconomica", "aprobado"
+    ]
+] + [
+    (campo, "fecha", "Formato de fecha inválido", campo + " tiene un formato de fecha inválido: {valor}")
+    for campo in ["fecha_ingreso_programa", "fecha_asignacion", "fecha_atencion", "fecha_solicitud"]
+] + [
+    ("id_estudiante", "duplicado", "Valor duplicado", "ID de estudiante duplicado: {valor}"),
+    ("correo", "duplicado", "Valor duplicado", "Correo electrónico duplicado: {valor}"),
+]
+
+# Bit asociado a cada (campo, tipo de error)
+CODIGO_ERROR: Dict[Tuple[str, str], int] = {
+    (campo, tipo): 1 << posicion
+    for posicion, (campo, tipo, _, _) in enumerate(ERRORES_VALIDACION)
+}
+
+def describir_errores(estudiante: "EstudianteModel", codigos: int) -> List[Tuple[str, str, str]]:
+    """
+    Traduce los códigos de error de un estudiante a (campo, error del resumen, mensaje).
+    """
+    errores = []
+    posicion = 0
+    while codigos:
+        if codigos & 1:
+            campo, _, resumen, mensaje = ERRORES_VALIDACION[posicion]
+            valor = getattr(estudiante, campo, None)
+            errores.append((campo, resumen.format(valor=valor), mensaje.format(valor=valor)))
+        codigos >>= 1
+        posicion += 1
+    return errores
+
+# Máximo de valores distintos que se codifican por campo; a partir de ahí se
+# guarda el texto tal cual para que datos sin repetición no inflen el diccionario
+MAX_CATEGORIAS = 4096
+
+class CampoCategorico:
+    """
+    Atributo de EstudianteModel guardado como un código entero pequeño.
+    
+    Los valores distintos de cada campo se guardan una sola vez en un diccionario
+    compartido por todas las filas; cada fila solo guarda el código (los enteros
+    pequeños son objetos únicos en CPython, así que no ocupan memoria por fila).
+    """
+    def __init__(self):
+        self.valores: List[Optional[str]] = []
+        self.codigos: Dict[Optional[str], int] = {}
+    
+    def __set_name__(self, owner, name):
+        self.nombre = name
+        self.slot = "_" + name
+    
+    def codificar(self, valor: Optional[str]):
+        codigo = self.codigos.get(valor)
+        if codigo is None:
+            if len(self.valores) >= MAX_CATEGORIAS:
+                return valor
+            codigo = len(self.valores)
+            self.valores.append(valor)
+            self.codigos[valor] = codigo
+        return codigo
+    
+    def codificar_columna(self, valores: List[Optional[str]]) -> list:
+        """
+        Codifica una columna completa: cada valor distinto se busca una sola vez.
+        """
+        codigos = {valor: self.codificar(valor) for valor in dict.fromkeys(valores)}
+        return list(map(codigos.__getitem__, valores))
+    
+    def decodificar(self, codigo):
+        if type(codigo) is int:
+            return self.valores[codigo]
+        return codigo
+    
+    def __get__(self, obj, tipo=None):
+        if obj is None:
+            return self
+        return self.decodificar(getattr(obj, self.slot))
+    
+    def __set__(self, obj, valor: Optional[str]):
+        setattr(obj, self.slot, self.codificar(valor))
+
+# Campos de EstudianteModel en el orden de su constructor (el de las columnas del CSV)
+CAMPOS_ESTUDIANTE = [
+    "id_estudiante", "nombres", "apellidos", "correo", "semestre",
+    "tipo_vulnerabilidad", "riesgo_desercion", "tipo_participante", "riesgo_spadies",
+    "fecha_ingreso_programa", "nivel_riesgo", "requiere_tutoria", "fecha_asignacion",
+    "tipo_intervencion", "fecha_atencion", "condicion_socioeconomica", "fecha_solicitud",
+    "aprobado"
+]
+
+# Campos que EstudianteModel guarda como texto
+CAMPOS_TEXTO = ["id_estudiante", "nombres", "apellidos", "correo"]
+
+# Campos de baja cardinalidad que se guardan con un diccionario de valores
+CAMPOS_CATEGORICOS = [
+    "semestre", "tipo_vulnerabilidad", "riesgo_desercion", "tipo_participante",
+    "riesgo_spadies", "fecha_ingreso_programa", "nivel_riesgo", "requiere_tutoria",
+    "fecha_asignacion", "tipo_intervencion", "fecha_atencion", "condicion_socioeconomica",
+    "fecha_solicitud", "aprobado"
+]
+
+# Campos por los que se pueden agrupar los conteos del almacén (ver EstudianteStore.contar_por)
+CAMPOS_AGREGABLES = [
+    "riesgo_desercion", "tipo_vulnerabilidad", "nivel_riesgo", "semestre", "tipo_participante", "aprobado"
+]
+
+# Estados de validación en el orden en que contar_por devuelve sus conteos
+ESTADOS_VALIDACION = {True: 0, False: 1, None: 2}
+
+# Clase para almacenar los datos de estudiantes en memoria.
+# Usa __slots__ y códigos para los campos categóricos para reducir la memoria por fila.
 class EstudianteModel:
+    __slots__ = (
+        CAMPOS_TEXTO + ["_valido", "_codigos_error"]
+        + ["_" + campo for campo in CAMPOS_CATEGORICOS]
+    )
+    
+    semestre = CampoCategorico()
+    tipo_vulnerabilidad = CampoCategorico()
+    riesgo_desercion = CampoCategorico()
+    tipo_participante = CampoCategorico()
+    riesgo_spadies = CampoCategorico()
+    fecha_ingreso_programa = CampoCategorico()
+    nivel_riesgo = CampoCategorico()
+    requiere_tutoria = CampoCategorico()
+    fecha_asignacion = CampoCategorico()
+    tipo_intervencion = CampoCategorico()
+    fecha_atencion = CampoCategorico()
+    condicion_socioeconomica = CampoCategorico()
+    fecha_solicitud = CampoCategorico()
+    aprobado = CampoCategorico()
+    
     def __init__(self, 
                  id_estudiante: str,
                  nombres: str,
@@ -40,6 +195,121 @@ class EstudianteModel:
         self.condicion_socioeconomica = condicion_socioeconomica
         self.fecha_solicitud = fecha_solicitud
         self.aprobado = aprobado
+        # Veredicto de validación calculado en la carga (None si no se validó)
+        self._valido = None
+        self._codigos_error = 0
+    
+    @classmethod
+    def desde_codigos(cls,
+                      id_estudiante, nombres, apellidos, correo, semestre,
+                      tipo_vulnerabilidad, riesgo_desercion, tipo_participante, riesgo_spadies,
+                      fecha_ingreso_programa, nivel_riesgo, requiere_tutoria, fecha_asignacion,
+                      tipo_intervencion, fecha_atencion, condicion_socioeconomica, fecha_solicitud,
+                      aprobado) -> "EstudianteModel":
+        """
+        Crea un estudiante con los campos categóricos ya codificados (ver crear_estudiantes).
+        
+        Asigna los códigos directamente a los slots, sin pasar por CampoCategorico.
+        """
+        estudiante = cls.__new__(cls)
+        estudiante.id_estudiante = id_estudiante
+        estudiante.nombres = nombres
+        estudiante.apellidos = apellidos
+        estudiante.correo = correo
+        estudiante._semestre = semestre
+        estudiante._tipo_vulnerabilidad = tipo_vulnerabilidad
+        estudiante._riesgo_desercion = riesgo_desercion
+        estudiante._tipo_participante = tipo_participante
+        estudiante._riesgo_spadies = riesgo_spadies
+        estudiante._fecha_ingreso_programa = fecha_ingreso_programa
+        estudiante._nivel_riesgo = nivel_riesgo
+        estudiante._requiere_tutoria = requiere_tutoria
+        estudiante._fecha_asignacion = fecha_asignacion
+        estudiante._tipo_intervencion = tipo_intervencion
+        estudiante._fecha_atencion = fecha_atencion
+        estudiante._condicion_socioeconomica = condicion_socioeconomica
+        estudiante._fecha_solicitud = fecha_solicitud
+        estudiante._aprobado = aprobado
+        estudiante._valido = None
+        estudiante._codigos_error = 0
+        return estudiante
+    
+    @property
+    def es_valido(self) -> Optional[bool]:
+        return self._valido
+    
+    @property
+    def codigos_error(self) -> int:
+        return self._codigos_error
+    
+    def asignar_veredicto(self, codigos_error: int):
+        self._codigos_error = codigos_error
+        self._valido = codigos_error == 0
+
+def crear_estudiantes(columnas: Dict[str, list]) -> List[EstudianteModel]:
+    """
+    Crea los estudiantes de un lote a partir de sus columnas (una lista por campo
+    de CAMPOS_ESTUDIANTE, sin veredicto).
+    
+    Equivale a llamar EstudianteModel(*fila) por cada fila, pero cada columna
+    categórica se codifica de una vez en lugar de valor por valor.
+    """
+    valores = [
+        getattr(EstudianteModel, campo).codificar_columna(columnas[campo]) if campo in CAMPOS_CATEGORICOS
+        else columnas[campo]
+        for campo in CAMPOS_ESTUDIANTE
+    ]
+    # Los estudiantes no forman ciclos: el recolector de ciclos, que se dispara
+    # por cada tantos objetos nuevos y recorre todo el almacén, no tiene nada
+    # que liberar y duplicaba el tiempo de construcción
+    recolector_activo = gc.isenabled()
+    gc.disable()
+    try:
+        return list(map(EstudianteModel.desde_codigos, *valores))
+    finally:
+        if recolector_activo:
+            gc.enable()
+
+def extraer_columnas(estudiantes: List[EstudianteModel]) -> Dict[str, list]:
+    """
+    Extrae las columnas de una lista de estudiantes.
+    
+    Los campos categóricos se devuelven sin decodificar (códigos del diccionario
+    del campo, o el texto si superó MAX_CATEGORIAS); se traducen con
+    `getattr(EstudianteModel, campo).decodificar`.
+    """
+    columnas = {campo: list(map(attrgetter(campo), estudiantes)) for campo in CAMPOS_TEXTO}
+    for campo in CAMPOS_CATEGORICOS:
+        columnas[campo] = list(map(attrgetter("_" + campo), estudiantes))
+    return columnas
+
+# Veredicto y códigos de los campos agregables de una fila: la clave de los contadores del almacén
+clave_agregados = attrgetter("_valido", *("_" + campo for campo in CAMPOS_AGREGABLES))
+
+def _escribir_agregados(agregados: Optional[Counter]) -> Optional[list]:
+    # Los códigos categóricos son propios de cada proceso: el snapshot guarda los valores
+    if agregados is None:
+        return None
+    decodificadores = [getattr(EstudianteModel, campo).decodificar for campo in CAMPOS_AGREGABLES]
+    return [
+        [combinacion[0]] + [decodificar(codigo) for decodificar, codigo in zip(decodificadores, combinacion[1:])] + [cantidad]
+        for combinacion, cantidad in agregados.items()
+    ]
+
+def _leer_agregados(filas: Optional[list]) -> Optional[Counter]:
+    if filas is None:
+        return None
+    codificadores = [getattr(EstudianteModel, campo).codificar for campo in CAMPOS_AGREGABLES]
+    agregados = Counter()
+    for fila in filas:
+        valido, valores, cantidad = fila[0], fila[1:-1], fila[-1]
+        agregados[(valido,) + tuple(codificar(valor) for codificar, valor in zip(codificadores, valores))] += cantidad
+    return agregados
+
+def _etiqueta_snapshot(identidad) -> str:
+    # Identidad de un snapshot publicado (ver app.snapshot.identidad_archivo)
+    inodo, modificado = identidad
+    return f"s{inodo}-{modificado}"
 
 # Almacén de datos en memoria
 class EstudianteStore:
@@ -48,20 +318,542 @@ class EstudianteStore:
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(EstudianteStore, cls).__new__(cls)
-            cls._instance.estudiantes = []
+            cls._instance._estudiantes = []
+            cls._instance._indice_id = {}
+            # Generación del almacén: aumenta con cada modificación
+            cls._instance.version = 0
+            # Identifica este proceso: la versión se cuenta por separado en cada worker
+            cls._instance.instancia = uuid.uuid4().hex[:12]
+            # Etiqueta del contenido compartida por los workers y la versión en que se fijó
+            cls._instance._etiqueta_compartida = None
+            cls._instance._version_etiqueta = None
+            cls._instance._reiniciar_totales()
+            # Persistencia opcional (BaseDatosEstudiantes); None mantiene todo solo en memoria
+            cls._instance.base_datos = None
+            # Ruta donde se guarda el snapshot tras cada carga (None lo desactiva)
+            cls._instance.ruta_snapshot = None
+            # Snapshot abierto cuyas filas todavía no se construyeron
+            cls._instance._snapshot = None
+            # Identidad del snapshot que refleja la memoria y si hay una carga en curso
+            cls._instance._identidad_snapshot = None
+            cls._instance._cargando = False
+            # Event loop que adopta los snapshots de otros workers y si hay uno preparándose
+            cls._instance._loop = None
+            cls._instance._sincronizando = False
+            # Ordena las cargas entre sí (ver escribir) y protege el contenido mientras
+            # otro hilo lo copia, lo materializa o adopta un snapshot
+            cls._instance._escritura = threading.Lock()
+            cls._instance._bloqueo = threading.RLock()
+            # Índice de búsqueda por nombres, apellidos y correo, y la versión que refleja
+            cls._instance._indice_busqueda = None
+            cls._instance._version_indice = None
         return cls._instance
     
+    @property
+    def estudiantes(self) -> List[EstudianteModel]:
+        self._materializar()
+        return self._estudiantes
+    
+    @estudiantes.setter
+    def estudiantes(self, estudiantes: List[EstudianteModel]):
+        self._estudiantes = estudiantes
+    
+    def conectar(self, base_datos=None, ruta_snapshot: Optional[str] = None):
+        """
+        Usa `base_datos` para persistir los cambios y recupera lo que ya tenía guardado.
+        
+        Si el snapshot de `ruta_snapshot` corresponde a la misma generación de la
+        base de datos, se usa en su lugar: solo se lee su encabezado y las filas
+        se construyen la primera vez que se consultan.
+        """
+        from app.snapshot import Snapshot
+        
+        self.base_datos = None
+        self.ruta_snapshot = None
+        self.clear_estudiantes()
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        
+        snapshot = Snapshot.abrir(ruta_snapshot) if ruta_snapshot else None
+        if snapshot is not None and base_datos is not None and snapshot.generacion != base_datos.generacion():
+            snapshot.cerrar()
+            snapshot = None
+        
+        if snapshot is not None:
+            self._usar_snapshot(snapshot)
+        elif base_datos is not None:
+            self.add_estudiantes(list(base_datos.leer_todos()))
+        
+        self.base_datos = base_datos
+        self.ruta_snapshot = ruta_snapshot
+        if snapshot is None and ruta_snapshot and base_datos is not None:
+            # El snapshot faltaba o estaba desactualizado: el próximo arranque ya lo tiene
+            self.guardar_snapshot()
+        if base_datos is not None:
+            self._fijar_etiqueta(f"g{base_datos.generacion()}")
+        elif snapshot is not None:
+            self._fijar_etiqueta(_etiqueta_snapshot(snapshot.identidad))
+    
+    def _usar_snapshot(self, snapshot):
+        # Reemplaza el contenido en memoria por el del snapshot, sin tocar la base de datos
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+        self._vaciar_memoria()
+        self._snapshot = snapshot
+        self._identidad_snapshot = snapshot.identidad
+        # Los totales se conocen sin construir las filas
+        self.validado_en_carga = snapshot.totales["validado_en_carga"]
+        self.total_validos = snapshot.totales["total_validos"]
+        self.total_invalidos = snapshot.totales["total_invalidos"]
+        self.errores_por_campo = snapshot.totales["errores_por_campo"]
+        # Los snapshots anteriores a los agregados no los traen: se cuentan al materializar
+        self.agregados = _leer_agregados(snapshot.totales.get("agregados"))
+        if snapshot.generacion is not None:
+            self._fijar_etiqueta(f"g{snapshot.generacion}")
+        else:
+            self._fijar_etiqueta(_etiqueta_snapshot(snapshot.identidad))
+    
+    def _fijar_etiqueta(self, etiqueta: str):
+        # La etiqueta vale mientras la versión no cambie
+        self._etiqueta_compartida = etiqueta
+        self._version_etiqueta = self.version
+    
+    @property
+    def etiqueta(self) -> str:
+        """
+        Identifica el contenido actual del almacén; cambia con cada modificación.
+        
+        Si el contenido es el de una generación de la base de datos (o, sin base
+        de datos, el de un snapshot publicado), la etiqueta sale de ella y es la
+        misma en todos los workers que lo tienen. Si no, se arma con la versión
+        y el identificador de este proceso, que ningún otro worker repite.
+        """
+        if self._etiqueta_compartida is not None and self._version_etiqueta == self.version:
+            return self._etiqueta_compartida
+        return f"{self.instancia}-{self.version}"
+    
+    def sincronizar(self):
+        """
+        Adopta el snapshot que otro proceso haya publicado desde la última consulta.
+        
+        Con varios workers, cada uno lo llama antes de atender una petición. Si el
+        snapshot cambió, sus filas, índices y agregados se construyen en un hilo
+        del executor mientras se sigue respondiendo con el contenido anterior, y
+        al terminar se adoptan en el event loop de una sola vez, igual que en
+        `escribir` (las peticiones en curso conservan las listas que ya
+        obtuvieron). Sin event loop (fuera de la aplicación) el snapshot se usa
+        en el momento y sus filas se construyen en la primera consulta.
+        """
+        from app.snapshot import Snapshot, identidad_archivo
+        
+        if not self.ruta_snapshot or self._cargando or self._sincronizando:
+            return
+        identidad = identidad_archivo(self.ruta_snapshot)
+        if identidad is None or identidad == self._identidad_snapshot:
+            return
+        with self._bloqueo:
+            # Una carga de este proceso pudo empezar mientras tanto: su contenido es más nuevo
+            if self._cargando or self._sincronizando:
+                return
+            snapshot = Snapshot.abrir(self.ruta_snapshot)
+            if snapshot is None:
+                return
+            if self._loop is None or self._loop.is_closed():
+                self._usar_snapshot(snapshot)
+                return
+            self._sincronizando = True
+            asyncio.run_coroutine_threadsafe(self._adoptar_snapshot(snapshot, self.version), self._loop)
+    
+    async def _adoptar_snapshot(self, snapshot, version: int):
+        # En el event loop: prepara la copia con el snapshot en el executor y la adopta
+        # si entretanto no hubo una carga en este proceso
+        try:
+            copia = await asyncio.get_running_loop().run_in_executor(None, self._preparar_snapshot, snapshot)
+            if self.version == version and not self._cargando:
+                await self._adoptar(copia)
+        finally:
+            self._sincronizando = False
+    
+    def _preparar_snapshot(self, snapshot) -> "EstudianteStore":
+        # Copia del almacén con todo el contenido de `snapshot` ya construido
+        try:
+            with self._bloqueo:
+                copia = self._copiar(vaciar=True)
+            copia._usar_snapshot(snapshot)
+            copia._snapshot = None
+            copia._construir_desde_snapshot(snapshot)
+            copia.indice_busqueda()
+        finally:
+            snapshot.cerrar()
+        return copia
+    
+    def _construir_desde_snapshot(self, snapshot):
+        # Filas, índices y agregados de `snapshot`; los totales ya vienen en su encabezado
+        estudiantes = snapshot.estudiantes()
+        if self.agregados is None:
+            self.agregados = Counter(map(clave_agregados, estudiantes))
+        self._estudiantes = estudiantes
+        self._reconstruir_indices()
+    
+    def _materializar(self):
+        # Construye las filas de un snapshot pendiente (el abierto al arrancar)
+        if self._snapshot is None:
+            return
+        with self._bloqueo:
+            snapshot = self._snapshot
+            if snapshot is None:
+                # Otro hilo lo materializó mientras se esperaba el bloqueo
+                return
+            self._construir_desde_snapshot(snapshot)
+            # Al final: mientras el snapshot sigue pendiente, las filas se piden con el bloqueo
+            self._snapshot = None
+            snapshot.cerrar()
+    
+    def guardar_snapshot(self):
+        """
+        Escribe el snapshot del contenido actual en `ruta_snapshot`.
+        
+        Un error al escribirlo no invalida la carga: se borra el snapshot anterior
+        para no recuperar datos viejos en el próximo arranque.
+        """
+        from app.snapshot import guardar_snapshot
+        
+        if not self.ruta_snapshot:
+            return
+        totales = {
+            "validado_en_carga": self.validado_en_carga,
+            "total_validos": self.total_validos,
+            "total_invalidos": self.total_invalidos,
+            "errores_por_campo": self.errores_por_campo,
+            "agregados": _escribir_agregados(self.agregados),
+        }
+        generacion = self.base_datos.generacion() if self.base_datos is not None else None
+        try:
+            identidad = guardar_snapshot(self.ruta_snapshot, self.estudiantes, totales, generacion)
+        except OSError:
+            if os.path.exists(self.ruta_snapshot):
+                os.remove(self.ruta_snapshot)
+            self._identidad_snapshot = None
+            return
+        # El snapshot recién escrito ya coincide con la memoria de este proceso
+        self._identidad_snapshot = identidad
+    
+    def desconectar(self):
+        if self.base_datos is not None:
+            self.base_datos.cerrar()
+            self.base_datos = None
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+            self._snapshot = None
+        self.ruta_snapshot = None
+    
+    async def escribir(self, cambio: Callable[["EstudianteStore"], Any], vaciar: bool = False) -> Any:
+        """
+        Aplica `cambio` al almacén sin bloquear el event loop y devuelve su resultado.
+        
+        `cambio` recibe una copia del contenido y la modifica dentro de
+        `carga()`: la transacción de la base de datos, el snapshot y el índice de
+        búsqueda se hacen en un hilo del executor. Después la copia se adopta en
+        el event loop de una sola vez, así las consultas ven el contenido anterior
+        o el nuevo, nunca uno a medias. Si `cambio` falla, la copia se descarta y
+        el almacén no cambia. Con `vaciar` la copia empieza vacía (una carga que
+        reemplaza todo no necesita las filas anteriores).
+        
+        Las cargas se ejecutan de a una: cada una parte del resultado de la anterior.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._escribir, loop, cambio, vaciar)
+    
+    def _escribir(self, loop, cambio, vaciar: bool):
+        with self._escritura:
+            with self._bloqueo:
+                # Mientras dura la carga no se adoptan snapshots de otros workers
+                self._cargando = True
+                if not vaciar:
+                    self._materializar()
+                copia = self._copiar(vaciar)
+            try:
+                resultado = cambio(copia)
+                if copia.version != self.version:
+                    asyncio.run_coroutine_threadsafe(self._adoptar(copia), loop).result()
+            finally:
+                self._cargando = False
+            return resultado
+    
+    def _copiar(self, vaciar: bool) -> "EstudianteStore":
+        # Copia que comparte las filas pero no los contenedores que una carga modifica
+        copia = object.__new__(EstudianteStore)
+        copia.__dict__.update(self.__dict__)
+        if vaciar:
+            # El snapshot pendiente sigue siendo del almacén: la copia no lo cierra
+            copia._snapshot = None
+            copia._vaciar_memoria()
+            return copia
+        copia._estudiantes = list(self._estudiantes)
+        copia._indice_id = dict(self._indice_id)
+        copia.errores_por_campo = {campo: dict(errores) for campo, errores in self.errores_por_campo.items()}
+        copia.agregados = Counter(self.agregados) if self.agregados is not None else None
+        copia._conteos = {}
+        return copia
+    
+    async def _adoptar(self, copia: "EstudianteStore"):
+        # En el event loop: las consultas no pueden ver el almacén a mitad del reemplazo
+        with self._bloqueo:
+            anterior = self._snapshot
+            self.__dict__.update(copia.__dict__)
+        if anterior is not None and anterior is not self._snapshot:
+            anterior.cerrar()
+    
+    @contextmanager
+    def carga(self):
+        """
+        Agrupa en una sola transacción de la base de datos los cambios de una carga
+        y al terminar guarda el snapshot y construye el índice de búsqueda.
+        
+        Se usa sobre la copia que recibe el cambio de `escribir`: si la carga
+        falla, la transacción se revierte y la copia se descarta.
+        """
+        if self.base_datos is None:
+            yield
+        else:
+            with self.base_datos.transaccion():
+                yield
+        self.guardar_snapshot()
+        if self.base_datos is not None:
+            self._fijar_etiqueta(f"g{self.base_datos.generacion()}")
+        elif self.ruta_snapshot and self._identidad_snapshot is not None:
+            self._fijar_etiqueta(_etiqueta_snapshot(self._identidad_snapshot))
+        # El índice se construye aquí, en el hilo de la escritura, y no en la primera consulta
+        self.indice_busqueda()
+    
     def add_estudiante(self, estudiante: EstudianteModel):
+        if self.base_datos is not None:
+            self.base_datos.insertar(len(self.estudiantes), [estudiante])
         self.estudiantes.append(estudiante)
+        self._indexar(estudiante)
+        self.agregados[clave_agregados(estudiante)] += 1
+        self.version += 1
+    
+    def add_estudiantes(self, estudiantes: List[EstudianteModel]):
+        """
+        Agrega varios estudiantes y construye los índices en bloque.
+        """
+        if self.base_datos is not None:
+            self.base_datos.insertar(len(self.estudiantes), estudiantes)
+        self.estudiantes.extend(estudiantes)
+        for estudiante in estudiantes:
+            self._indexar(estudiante)
+        self.agregados.update(map(clave_agregados, estudiantes))
+        self.version += 1
+    
+    def _indexar(self, estudiante: EstudianteModel):
+        # El índice conserva la primera aparición, igual que el recorrido lineal
+        if estudiante.id_estudiante not in self._indice_id:
+            self._indice_id[estudiante.id_estudiante] = estudiante
+        self._acumular_veredicto(estudiante)
+    
+    def _reconstruir_indices(self):
+        self._indice_id = {}
+        for estudiante in self._estudiantes:
+            if estudiante.id_estudiante not in self._indice_id:
+                self._indice_id[estudiante.id_estudiante] = estudiante
+    
+    def combinar(
+        self,
+        estudiantes: List[EstudianteModel],
+        salientes: List[EstudianteModel],
+        entrantes: List[EstudianteModel],
+        modificados: Dict[int, EstudianteModel],
+        agregados: int,
+        reescribir: bool
+    ):
+        """
+        Reemplaza el contenido por `estudiantes`, resultado de combinar una carga con los datos actuales.
+        
+        Los totales de validación y los agregados se ajustan restando los veredictos
+        de `salientes` (filas que dejan el almacén) y sumando los de `entrantes`,
+        sin recorrer el resto.
+        En la base de datos se actualizan las filas de `modificados` (por posición)
+        y se insertan las últimas `agregados`; si se eliminaron filas, las posiciones
+        cambian y con `reescribir` la tabla se escribe completa.
+        """
+        if self.base_datos is not None:
+            if reescribir:
+                self.base_datos.vaciar()
+                self.base_datos.insertar(0, estudiantes)
+            else:
+                self.base_datos.actualizar(modificados)
+                if agregados:
+                    self.base_datos.insertar(len(estudiantes) - agregados, estudiantes[-agregados:])
+        
+        self._materializar()
+        for estudiante in salientes:
+            self._descontar_veredicto(estudiante)
+        for estudiante in entrantes:
+            self._acumular_veredicto(estudiante)
+        self.agregados.subtract(map(clave_agregados, salientes))
+        self.agregados.update(map(clave_agregados, entrantes))
+        # Descartar las combinaciones que quedaron sin filas
+        self.agregados = +self.agregados
+        self.validado_en_carga = all(estudiante.es_valido is not None for estudiante in estudiantes)
+        self.estudiantes = estudiantes
+        self._reconstruir_indices()
+        self.version += 1
+    
+    def _reiniciar_totales(self):
+        # Totales de validación mantenidos a medida que se agregan estudiantes
+        self.validado_en_carga = True
+        self.total_validos = 0
+        self.total_invalidos = 0
+        self.errores_por_campo: Dict[str, Dict[str, int]] = {}
+        # Filas por veredicto y combinación de valores de CAMPOS_AGREGABLES (ver clave_agregados)
+        self.agregados: Optional[Counter] = Counter()
+        self._conteos: Dict[Tuple[str, ...], Dict[tuple, List[int]]] = {}
+        self._version_conteos = None
+    
+    def _acumular_veredicto(self, estudiante: EstudianteModel):
+        if estudiante.es_valido is None:
+            self.validado_en_carga = False
+            return
+        
+        if estudiante.es_valido:
+            self.total_validos += 1
+            return
+        
+        self.total_invalidos += 1
+        for campo, error, _ in describir_errores(estudiante, estudiante.codigos_error):
+            errores = self.errores_por_campo.setdefault(campo, {})
+            errores[error] = errores.get(error, 0) + 1
+    
+    def _descontar_veredicto(self, estudiante: EstudianteModel):
+        # Inverso de _acumular_veredicto para una fila que deja el almacén
+        if estudiante.es_valido is None:
+            return
+        
+        if estudiante.es_valido:
+            self.total_validos -= 1
+            return
+        
+        self.total_invalidos -= 1
+        for campo, error, _ in describir_errores(estudiante, estudiante.codigos_error):
+            errores = self.errores_por_campo[campo]
+            errores[error] -= 1
+            if not errores[error]:
+                del errores[error]
+                if not errores:
+                    del self.errores_por_campo[campo]
     
     def get_all_estudiantes(self) -> List[EstudianteModel]:
         return self.estudiantes
     
+    def contar_por(self, campos: List[str]) -> Dict[tuple, List[int]]:
+        """
+        Filas válidas, inválidas y sin validar por cada combinación de valores de `campos`.
+        
+        `campos` es una lista de CAMPOS_AGREGABLES. No se recorren las filas: se
+        suman los contadores por combinación que se mantienen al agregar, combinar
+        y vaciar, y el resultado se reutiliza hasta la próxima modificación.
+        """
+        if self.agregados is None:
+            self._materializar()
+        if self._version_conteos != self.version:
+            self._conteos = {}
+            self._version_conteos = self.version
+        clave = tuple(campos)
+        conteos = self._conteos.get(clave)
+        if conteos is not None:
+            return conteos
+        
+        # La posición 0 de cada clave es el veredicto
+        posiciones = [CAMPOS_AGREGABLES.index(campo) + 1 for campo in campos]
+        decodificadores = [getattr(EstudianteModel, campo).decodificar for campo in campos]
+        conteos = {}
+        for combinacion, cantidad in self.agregados.items():
+            grupo = tuple(decodificar(combinacion[posicion]) for posicion, decodificar in zip(posiciones, decodificadores))
+            fila = conteos.get(grupo)
+            if fila is None:
+                fila = conteos[grupo] = [0, 0, 0]
+            fila[ESTADOS_VALIDACION[combinacion[0]]] += cantidad
+        self._conteos[clave] = conteos
+        return conteos
+    
+    def indice_busqueda(self):
+        """
+        Índice de búsqueda (app.busqueda.IndiceBusqueda) de las filas actuales.
+        
+        `carga` lo construye sobre la copia que prepara `escribir`, en el hilo de
+        la escritura: el almacén adopta la copia con el índice listo y el event
+        loop no lo arma. Se reutiliza mientras el almacén no cambie; si cambió
+        por otra vía (o tras arrancar desde un snapshot) se construye en la
+        primera consulta.
+        """
+        from app.busqueda import IndiceBusqueda
+        
+        if self._version_indice != self.version:
+            self._indice_busqueda = IndiceBusqueda(self.estudiantes)
+            self._version_indice = self.version
+        return self._indice_busqueda
+    
+    @property
+    def total_filas(self) -> int:
+        # Con un snapshot pendiente el número de filas viene en su encabezado
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot.filas
+        return len(self._estudiantes)
+    
+    def tamano_aproximado(self, muestra: int = 256) -> int:
+        """
+        Bytes aproximados que ocupan las filas en memoria, estimados con una muestra.
+        
+        Se cuentan la lista, cada objeto y sus textos; los códigos categóricos son
+        enteros compartidos y no se cuentan. Con un snapshot pendiente se devuelve
+        el tamaño del archivo mapeado.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot.tamano
+        estudiantes = self._estudiantes
+        if not estudiantes:
+            return sys.getsizeof(estudiantes)
+        paso = max(1, len(estudiantes) // muestra)
+        elegidos = estudiantes[::paso]
+        bytes_muestra = 0
+        for estudiante in elegidos:
+            bytes_muestra += sys.getsizeof(estudiante)
+            for atributo in EstudianteModel.__slots__:
+                valor = getattr(estudiante, atributo, None)
+                if isinstance(valor, str):
+                    bytes_muestra += sys.getsizeof(valor)
+        return sys.getsizeof(estudiantes) + bytes_muestra * len(estudiantes) // len(elegidos)
+    
     def clear_estudiantes(self):
+        if self.base_datos is not None:
+            self.base_datos.vaciar()
+        self._vaciar_memoria()
+    
+    def _vaciar_memoria(self):
+        if self._snapshot is not None:
+            self._snapshot.cerrar()
+            self._snapshot = None
         self.estudiantes = []
+        self._indice_id = {}
+        self._indice_busqueda = None
+        self._version_indice = None
+        self._reiniciar_totales()
+        self.version += 1
     
     def get_estudiante_by_id(self, id_estudiante: str) -> Optional[EstudianteModel]:
-        for estudiante in self.estudiantes:
-            if estudiante.id_estudiante == id_estudiante:
-                return estudiante
-        return None
\ No newline at end of file
+        snapshot = self._snapshot
+        if (
+            snapshot is not None and self.base_datos is not None and not self._cargando
+            and snapshot.generacion == self.base_datos.generacion()
+        ):
+            # Con el snapshot de arranque pendiente, una consulta por ID usa el índice
+            # de la base en lugar de construir todas las filas
+            encontrados = self.base_datos.buscar("id_estudiante", id_estudiante)
+            return encontrados[0] if encontrados else None
+        self._materializar()
+        return self._indice_id.get(id_estudiante)
\ No newline at end of file
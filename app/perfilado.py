@@ -0,0 +1,246 @@
+# perfilado.py
+"""
+Responsabilidad: Perfilar peticiones individuales a pedido, con un profiler por muestreo.
+
+Una petición se perfila si trae el token de ESTUDIANTES_PERFILADO_TOKEN en el
+encabezado X-Perfilar o en el parámetro `perfilar` de la URL. Sin esa variable
+de entorno el perfilado queda desactivado y el parámetro se ignora.
+
+Mientras dura la petición, un hilo toma cada INTERVALO_MUESTREO las pilas del
+hilo que la atiende (el del event loop) y de los hilos que estén trabajando,
+por ejemplo los que generan una respuesta por streaming. Al terminar se escriben en
+ESTUDIANTES_PERFILES dos archivos con el mismo nombre base, que la respuesta
+informa en el encabezado X-Perfil:
+    <nombre>.collapsed   pilas colapsadas ("a;b;c muestras"), para flamegraph.pl o speedscope
+    <nombre>.txt         árbol de llamadas con muestras inclusivas y propias
+
+En el event loop solo cuenta lo que se ejecuta dentro de la llamada al
+middleware de esta petición; el resto, incluidas otras peticiones perfiladas
+a la vez, se cuenta como otras tareas. Los demás hilos son del proceso
+completo: si se atienden otras peticiones a la vez su trabajo en hilos aparece
+mezclado. El trabajo en otros procesos (cargas con paralelo=true) no se ve.
+Las peticiones sin el token solo pagan la revisión de un encabezado.
+"""
+import hmac
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+TOKEN_PERFILADO = os.getenv("ESTUDIANTES_PERFILADO_TOKEN") or None
+DIRECTORIO_PERFILES = os.getenv("ESTUDIANTES_PERFILES", os.path.join("data", "perfiles"))
+
+# Segundos entre muestras; en la práctica el hilo muestreador también espera el GIL
+INTERVALO_MUESTREO = 0.001
+
+# Nodos del árbol de llamadas con menos de esta fracción de las muestras se omiten
+FRACCION_MINIMA_ARBOL = 0.005
+
+ENCABEZADO_PERFILAR = b"x-perfilar"
+
+# Funciones en las que un hilo está esperando, no trabajando: (archivo, función)
+ESPERAS = {("threading.py", "wait"), ("queue.py", "get"), ("selectors.py", "select")}
+
+class Muestreador:
+    """
+    Toma muestras periódicas de las pilas de los hilos y las cuenta por pila completa.
+
+    Las pilas del hilo `hilo` (el event loop) empiezan en `raiz`, el marco de la
+    llamada al middleware que atiende esta petición. Se compara el marco y no su
+    código, que es el mismo en todas las peticiones: lo que el loop ejecute fuera
+    de ese marco, también otra petición perfilada, se cuenta como espera u otras
+    tareas. Los demás hilos (por ejemplo, los que iteran una respuesta por
+    streaming) se cuentan bajo su nombre si no están esperando.
+    """
+    def __init__(self, hilo: int, raiz, intervalo: float = INTERVALO_MUESTREO):
+        self.hilo = hilo
+        self.raiz = raiz
+        self.intervalo = intervalo
+        self.muestras: Counter = Counter()
+        self._nombres: Dict[object, str] = {}
+        self._detener = threading.Event()
+        self._hilo_muestreo = threading.Thread(target=self._muestrear, name="perfilado", daemon=True)
+
+    def iniciar(self) -> None:
+        self._hilo_muestreo.start()
+
+    def detener(self) -> None:
+        self._detener.set()
+        self._hilo_muestreo.join()
+        # El marco de la petición guarda al muestreador entre sus variables locales
+        self.raiz = None
+
+    def _nombre(self, codigo) -> str:
+        nombre = self._nombres.get(codigo)
+        if nombre is None:
+            # Los ';' separan marcos en el formato colapsado
+            nombre = f"{codigo.co_name} ({_ruta_corta(codigo.co_filename)}:{codigo.co_firstlineno})".replace(";", ":")
+            self._nombres[codigo] = nombre
+        return nombre
+
+    def _pila(self, marco, hasta=None) -> Tuple[list, bool]:
+        # Códigos desde el marco `hasta` (incluido) hasta el más interno; indica si se encontró `hasta`
+        codigos = []
+        while marco is not None:
+            codigos.append(marco.f_code)
+            if marco is hasta:
+                break
+            marco = marco.f_back
+        codigos.reverse()
+        return codigos, hasta is not None and marco is hasta
+
+    def _muestrear(self) -> None:
+        propio = threading.get_ident()
+        nombres_hilos: Dict[int, str] = {}
+        while not self._detener.wait(self.intervalo):
+            for ident, marco in sys._current_frames().items():
+                if ident == propio:
+                    continue
+                esperando = (os.path.basename(marco.f_code.co_filename), marco.f_code.co_name) in ESPERAS
+                if ident == self.hilo:
+                    codigos, en_peticion = self._pila(marco, self.raiz)
+                    if en_peticion:
+                        pila = tuple(self._nombre(codigo) for codigo in codigos)
+                    elif esperando:
+                        pila = ("event loop en espera",)
+                    else:
+                        pila = ("otras tareas del event loop", self._nombre(marco.f_code))
+                else:
+                    if esperando:
+                        continue
+                    if ident not in nombres_hilos:
+                        nombres_hilos.update((hilo.ident, hilo.name) for hilo in threading.enumerate())
+                    codigos, _ = self._pila(marco)
+                    pila = (f"hilo {nombres_hilos.get(ident, ident)}",) + tuple(self._nombre(codigo) for codigo in codigos)
+                self.muestras[pila] += 1
+
+def _ruta_corta(archivo: str) -> str:
+    # Las rutas de site-packages y de la biblioteca estándar se acortan al paquete
+    for directorio in sorted(sys.path, key=len, reverse=True):
+        if directorio and archivo.startswith(directorio + os.sep):
+            return archivo[len(directorio) + 1:]
+    return archivo
+
+def pilas_colapsadas(muestras: Counter) -> str:
+    """
+    Formato de pilas colapsadas: una línea por pila, marcos separados por ';' y el número de muestras.
+    """
+    return "".join(f"{';'.join(pila)} {cantidad}\n" for pila, cantidad in muestras.most_common())
+
+def arbol_llamadas(muestras: Counter, fraccion_minima: float = FRACCION_MINIMA_ARBOL) -> str:
+    """
+    Árbol de llamadas con las muestras inclusivas, su porcentaje y las muestras propias de cada marco.
+    """
+    # Cada nodo: [muestras inclusivas, muestras propias, hijos]
+    raiz = [0, 0, {}]
+    for pila, cantidad in muestras.items():
+        raiz[0] += cantidad
+        nodo = raiz
+        for marco in pila:
+            nodo = nodo[2].setdefault(marco, [0, 0, {}])
+            nodo[0] += cantidad
+        nodo[1] += cantidad
+
+    total = raiz[0]
+    if not total:
+        return "Sin muestras\n"
+    lineas = [f"{'incl':>7} {'%':>6} {'propias':>7}  marco"]
+
+    def recorrer(hijos: Dict[str, list], nivel: int) -> None:
+        for marco, (inclusivas, propias, nietos) in sorted(hijos.items(), key=lambda item: -item[1][0]):
+            if inclusivas < total * fraccion_minima:
+                continue
+            lineas.append(f"{inclusivas:>7} {100 * inclusivas / total:>5.1f}% {propias:>7}  {'  ' * nivel}{marco}")
+            recorrer(nietos, nivel + 1)
+
+    recorrer(raiz[2], 0)
+    return "\n".join(lineas) + "\n"
+
+def _nombre_perfil(metodo: str, path: str) -> str:
+    ruta = re.sub(r"[^A-Za-z0-9]+", "-", path).strip("-") or "raiz"
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{metodo.lower()}-{ruta[:60]}-{uuid.uuid4().hex[:6]}"
+
+def guardar_perfil(
+    muestreador: Muestreador,
+    nombre: str,
+    metodo: str,
+    path: str,
+    estado: Optional[int],
+    segundos: float,
+    directorio: str = DIRECTORIO_PERFILES
+) -> Tuple[str, str]:
+    """
+    Escribe las pilas colapsadas y el árbol de llamadas. Devuelve las rutas de ambos archivos.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    ruta_colapsadas = os.path.join(directorio, nombre + ".collapsed")
+    ruta_arbol = os.path.join(directorio, nombre + ".txt")
+    total = sum(muestreador.muestras.values())
+    with open(ruta_colapsadas, "w", encoding="utf-8") as archivo:
+        archivo.write(pilas_colapsadas(muestreador.muestras))
+    with open(ruta_arbol, "w", encoding="utf-8") as archivo:
+        archivo.write(
+            f"{metodo} {path} -> {estado}\n"
+            f"duración: {segundos:.3f} s, muestras: {total}, intervalo: {muestreador.intervalo * 1000:g} ms\n"
+            f"(se omiten los marcos con menos del {FRACCION_MINIMA_ARBOL:.1%} de las muestras)\n\n"
+        )
+        archivo.write(arbol_llamadas(muestreador.muestras))
+    return ruta_colapsadas, ruta_arbol
+
+def _token_solicitado(scope) -> Optional[str]:
+    for nombre, valor in scope["headers"]:
+        if nombre == ENCABEZADO_PERFILAR:
+            return valor.decode("latin-1")
+    consulta = scope.get("query_string", b"")
+    if b"perfilar=" in consulta:
+        valores = parse_qs(consulta.decode("latin-1")).get("perfilar")
+        if valores:
+            return valores[0]
+    return None
+
+class MiddlewarePerfilado:
+    """
+    Middleware ASGI que perfila las peticiones que traen el token de perfilado.
+    """
+    def __init__(self, app, token: Optional[str] = TOKEN_PERFILADO, directorio: str = DIRECTORIO_PERFILES):
+        self.app = app
+        self.token = token
+        self.directorio = directorio
+
+    async def __call__(self, scope, receive, send):
+        if self.token is None or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        solicitado = _token_solicitado(scope)
+        if solicitado is None or not hmac.compare_digest(solicitado.encode(), self.token.encode()):
+            await self.app(scope, receive, send)
+            return
+
+        nombre = _nombre_perfil(scope["method"], scope["path"])
+        estado = None
+
+        async def enviar(mensaje):
+            nonlocal estado
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                mensaje = dict(mensaje)
+                mensaje["headers"] = list(mensaje.get("headers", [])) + [(b"x-perfil", nombre.encode())]
+            await send(mensaje)
+
+        muestreador = Muestreador(threading.get_ident(), sys._getframe())
+        inicio = time.perf_counter()
+        muestreador.iniciar()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            muestreador.detener()
+            guardar_perfil(
+                muestreador, nombre, scope["method"], scope["path"], estado,
+                time.perf_counter() - inicio, self.directorio
+            )
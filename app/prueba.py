@@ -1,4 +1,4 @@
-from services.validation_service import ValidationService
+from app.services.validation_service import ValidationService
 
 # Datos de ejemplo para un estudiante
 estudiante_data = {
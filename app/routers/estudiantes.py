@@ -1,87 +1,233 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
-from typing import List, Dict, Any
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Request, Response
+from typing import List, Dict, Any, Optional, Union
 
-from app.services.estudiante_service import EstudianteService
-from app.schemas.estudiante import Estudiante, EstudianteList, CSVUploadResponse
+from app.services.estudiante_service import EstudianteService, EXPECTED_HEADERS
+from app.utils.csv_handler import iter_csv_export
+from app.utils.helpers import etag_coincide
+from app.schemas.estudiante import Estudiante, EstudianteList, CSVUploadResponse, CSVCombinacionResponse, TrabajoCargaResponse, AgregadosResponse, BusquedaResponse
 
-from fastapi.responses import StreamingResponse
-import io
+from fastapi.responses import JSONResponse, StreamingResponse
 
 router = APIRouter()
 
+# Tamaño máximo de página permitido en los listados
+MAX_LIMIT = 1000
+
 # Dependencia para obtener el servicio de estudiantes
 def get_estudiante_service():
     return EstudianteService()
 
-@router.post("/estudiantes/upload-csv", response_model=CSVUploadResponse)
+@router.post(
+    "/estudiantes/upload-csv",
+    response_model=Union[CSVCombinacionResponse, CSVUploadResponse],
+    responses={202: {"model": TrabajoCargaResponse, "description": "Carga iniciada en segundo plano"}}
+)
 async def upload_csv(
+    request: Request,
     file: UploadFile = File(...),
+    validar: bool = True,
+    paralelo: bool = False,
+    en_segundo_plano: bool = False,
+    combinar: bool = False,
+    eliminar_faltantes: bool = False,
     estudiante_service: EstudianteService = Depends(get_estudiante_service)
 ):
     """
     Carga un archivo CSV con datos de estudiantes.
+    
+    Con `validar=true` (por defecto) cada fila se valida una sola vez durante la carga.
+    Con `paralelo=true` el parseo y la validación se reparten entre varios procesos.
+    Con `en_segundo_plano=true` se responde de inmediato (202) con el id del trabajo;
+    el avance se consulta en GET /estudiantes/jobs/{job_id}.
+    Con `combinar=true` las filas se insertan o actualizan por id_estudiante en lugar
+    de reemplazar los datos; `eliminar_faltantes=true` borra los IDs que no vengan
+    en el archivo. La respuesta de una combinación cuenta además las filas sin
+    id_estudiante, que se agregan siempre (`sin_id`), y las filas descartadas
+    porque su ID se repite más adelante en el archivo (`ids_repetidos`).
     """
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="El archivo debe ser un CSV")
     
-    result = await estudiante_service.process_csv_file(file)
+    if eliminar_faltantes and not combinar:
+        raise HTTPException(status_code=400, detail="eliminar_faltantes solo se admite con combinar=true")
+    
+    if combinar and paralelo:
+        raise HTTPException(status_code=400, detail="combinar=true no admite paralelo=true")
+    
+    if en_segundo_plano:
+        trabajo = await estudiante_service.iniciar_carga_en_segundo_plano(
+            file, validar=validar, paralelo=paralelo, combinar=combinar, eliminar_faltantes=eliminar_faltantes
+        )
+        return JSONResponse(
+            status_code=202,
+            content=trabajo.resumen(),
+            headers={"Location": str(request.url_for("get_trabajo_carga", job_id=trabajo.id))}
+        )
+    
+    result = await estudiante_service.process_csv_file(
+        file, validar=validar, paralelo=paralelo, combinar=combinar, eliminar_faltantes=eliminar_faltantes
+    )
     return result
 
+@router.get("/estudiantes/jobs/{job_id}", response_model=TrabajoCargaResponse)
+async def get_trabajo_carga(
+    job_id: str,
+    estudiante_service: EstudianteService = Depends(get_estudiante_service)
+):
+    """
+    Obtiene el estado de una carga en segundo plano: filas procesadas, filas
+    por segundo, tiempo restante estimado y, al terminar, el resultado.
+    """
+    return estudiante_service.obtener_trabajo(job_id).resumen()
+
+def _no_modificado(request: Request, etag: str) -> Optional[Response]:
+    """
+    Respuesta 304 si el If-None-Match del cliente trae el ETag actual; si no, None.
+    
+    Se consulta antes de filtrar, validar o serializar, así una consulta
+    repetida sin cambios en el almacén casi no cuesta.
+    """
+    if etag_coincide(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+def _responder_pagina(
+    response: Response,
+    estudiante_service: EstudianteService,
+    estudiantes: List[Any],
+    limit: Optional[int],
+    offset: int,
+    cursor: Optional[str]
+) -> List[Any]:
+    """
+    Pagina la lista y agrega los encabezados de conteo y siguiente cursor.
+    """
+    pagina, siguiente = estudiante_service.paginar(estudiantes, limit, offset, cursor)
+    response.headers["X-Total-Count"] = str(len(estudiantes))
+    if siguiente is not None:
+        response.headers["X-Next-Cursor"] = siguiente
+    return pagina
+
 @router.get("/estudiantes", response_model=List[Estudiante])
 async def get_estudiantes(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     estudiante_service: EstudianteService = Depends(get_estudiante_service)
 ):
     """
-    Obtiene todos los estudiantes cargados.
+    Obtiene los estudiantes cargados.
+    
+    Admite paginación con `limit`/`offset` o con el cursor opaco del encabezado
+    `X-Next-Cursor`. El total se informa en `X-Total-Count`. Con el `ETag` de una
+    respuesta anterior en `If-None-Match` responde 304 si los datos no cambiaron.
     """
+    etag = estudiante_service.etag()
+    no_modificado = _no_modificado(request, etag)
+    if no_modificado is not None:
+        return no_modificado
+    response.headers["ETag"] = etag
     estudiantes = estudiante_service.get_all_estudiantes()
-    return estudiantes
+    return _responder_pagina(response, estudiante_service, estudiantes, limit, offset, cursor)
 
 @router.get("/estudiantes/validados", response_model=List[Estudiante])
 async def get_estudiantes_validados(
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_LIMIT),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
     estudiante_service: EstudianteService = Depends(get_estudiante_service)
 ):
     """
     Obtiene solo los estudiantes que pasan todas las validaciones.
+    
+    Admite la misma paginación y el mismo ETag que GET /estudiantes.
     """
+    etag = estudiante_service.etag()
+    no_modificado = _no_modificado(request, etag)
+    if no_modificado is not None:
+        return no_modificado
+    response.headers["ETag"] = etag
     estudiantes_validados = estudiante_service.get_estudiantes_validos()
-    return estudiantes_validados
+    return _responder_pagina(response, estudiante_service, estudiantes_validados, limit, offset, cursor)
 
 @router.get("/estudiantes/resumen-validacion")
 async def get_resumen_validacion(
+    request: Request,
+    response: Response,
     estudiante_service: EstudianteService = Depends(get_estudiante_service)
 ):
     """
     Obtiene un resumen de la validación de estudiantes.
+    
+    Admite el mismo ETag que GET /estudiantes.
     """
+    etag = estudiante_service.etag()
+    no_modificado = _no_modificado(request, etag)
+    if no_modificado is not None:
+        return no_modificado
+    response.headers["ETag"] = etag
     return estudiante_service.get_resumen_validacion()
 
+@router.get("/estudiantes/buscar", response_model=BusquedaResponse)
+async def buscar_estudiantes(
+    q: str = Query(..., min_length=1, description="Nombres, apellidos o correo, completos o su comienzo"),
+    limit: int = Query(20, ge=1, le=MAX_LIMIT),
+    difusa: bool = True,
+    estudiante_service: EstudianteService = Depends(get_estudiante_service)
+):
+    """
+    Busca estudiantes por nombres, apellidos o correo.
+    
+    No distingue tildes ni mayúsculas ("gomez" encuentra "Gómez") y cada palabra
+    puede ser el comienzo de una palabra ("mar gom"). Con `difusa=true` (por
+    defecto) también encuentra nombres y apellidos con errores de tipeo
+    ("rodriges"), con menos puntaje. Devuelve los `limit` mejores resultados y
+    en `total` el número de coincidencias.
+    """
+    return estudiante_service.buscar_estudiantes(q, limit, difusa)
+
+@router.get("/estudiantes/agregados", response_model=AgregadosResponse)
+async def get_agregados(
+    por: List[str] = Query(..., description="Campos por los que agrupar; con varios se obtiene la tabla cruzada"),
+    estudiante_service: EstudianteService = Depends(get_estudiante_service)
+):
+    """
+    Cuenta los estudiantes por los valores de uno o más campos.
+    
+    Campos admitidos: riesgo_desercion, tipo_vulnerabilidad, nivel_riesgo,
+    semestre, tipo_participante y aprobado. Por ejemplo
+    `?por=riesgo_desercion&por=semestre` devuelve la tabla cruzada de ambos.
+    Cada grupo trae por separado las filas válidas, inválidas y sin validar.
+    """
+    return estudiante_service.get_agregados(por)
+
 @router.get("/estudiantes/descargar-csv")
 async def descargar_csv_limpio(
+    request: Request,
     estudiante_service: EstudianteService = Depends(get_estudiante_service)
 ):
+    """
+    Descarga los estudiantes válidos como CSV, generado por fragmentos.
+    
+    Admite el mismo ETag que GET /estudiantes: sin cambios responde 304 sin generar el archivo.
+    """
+    etag = estudiante_service.etag()
+    no_modificado = _no_modificado(request, etag)
+    if no_modificado is not None:
+        return no_modificado
     estudiantes_limpios = estudiante_service.get_estudiantes_validos()
 
     if not estudiantes_limpios:
         raise HTTPException(status_code=404, detail="No hay estudiantes válidos para exportar.")
 
-    def modelo_a_dict(obj):
-        return {k: v for k, v in obj.__dict__.items() if not k.startswith('_')}
-
-    output = io.StringIO()
-    headers = list(modelo_a_dict(estudiantes_limpios[0]).keys())
-    output.write(','.join(headers) + '\n')
-
-    for estudiante in estudiantes_limpios:
-        data = modelo_a_dict(estudiante)
-        fila = [str(data[h]) for h in headers]
-        output.write(','.join(fila) + '\n')
-
-    output.seek(0)
     return StreamingResponse(
-        output,
+        iter_csv_export(estudiantes_limpios, EXPECTED_HEADERS),
         media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=estudiantes_limpios.csv"}
+        headers={"Content-Disposition": "attachment; filename=estudiantes_limpios.csv", "ETag": etag}
     )
 
 @router.get("/estudiantes/{id_estudiante}", response_model=Estudiante)
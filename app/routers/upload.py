@@ -1,6 +1,5 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
 from app.services.csv_service import leer_csv_temporal
-import pandas as pd
 
 router = APIRouter()
 
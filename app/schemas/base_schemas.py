@@ -1,12 +1,7 @@
 from pydantic import BaseModel, Field, validator, EmailStr
 from typing import Optional, List, Dict, Any
 from datetime import date
-import sys
-import os
-
-# Añadir el directorio raíz al path para importar utils
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.validators import *
+from app.utils.validators import *
 
 class EstudianteBase(BaseModel):
     """Esquema base para validación de datos de estudiante."""
@@ -132,5 +127,3 @@ class ServicioPermanenciaBase(BaseModel):
         if v is not None and not validate_length(v, max_length=255):
             raise ValueError('Las observaciones no deben exceder los 255 caracteres')
         return v
-
-print("Esquemas base cargados correctamente")
\ No newline at end of file
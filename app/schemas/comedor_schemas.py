@@ -1,12 +1,7 @@
 from pydantic import BaseModel, validator, Field
 from typing import Optional
-import sys
-import os
-
-# Añadir el directorio raíz al path para importar utils y base_schemas
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.validators import *
-from schemas.base_schemas import ServicioPermanenciaBase
+from app.utils.validators import *
+from app.schemas.base_schemas import ServicioPermanenciaBase
 
 class ComedorBase(BaseModel):
     """Esquema base para validación de datos del Comedor Universitario."""
@@ -180,5 +175,3 @@ class RegistroBeneficioUpdate(BaseModel):
             if not validate_enum(v, allowed_types):
                 raise ValueError(f'Tipo de comida inválido. Valores permitidos: {", ".join(allowed_types)}')
         return v
-
-print("Esquemas Comedor cargados correctamente")
\ No newline at end of file
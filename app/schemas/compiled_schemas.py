@@ -0,0 +1,202 @@
+# compiled_schemas.py
+"""
+Responsabilidad: Esquemas de los programas (base, POVAU, POA, POPS, Comedor)
+expresados como restricciones nativas de pydantic.
+
+Cada esquema acepta y rechaza los mismos datos que su equivalente con
+@validator en base_schemas.py, povau_schemas.py, poa_schemas.py,
+pops_schemas.py y comedor_schemas.py, pero la validación corre completa en
+pydantic-core: los valores permitidos son Literal, los formatos son patrones
+y las longitudes y rangos son límites de Field. Solo la comparación entre
+fechas de RegistroBeneficioBase necesita Python, una vez por registro.
+
+Diferencias deliberadas con los esquemas originales:
+- Las fechas se devuelven como date en lugar de texto, y solo se aceptan
+  dígitos ASCII sin salto de línea final (los originales aceptaban, por
+  ejemplo, "2023-01-02\\n" porque int() ignora los espacios).
+- El teléfono acepta dígitos decimales; str.isdigit() también aceptaba
+  superíndices como "²".
+- Los mensajes de error son los de pydantic, en inglés.
+
+Se usan con ValidationService.validate_many igual que los originales.
+"""
+from datetime import date
+from typing import Annotated, Literal, Optional
+
+from pydantic import BaseModel, EmailStr, Field, GetPydanticSchema, model_validator
+from pydantic_core import core_schema
+
+# Espacios según str.isspace(): \s de Python incluye \x1c-\x1f y el de pydantic-core no
+_ESPACIOS = r"\s\x1c-\x1f"
+_LETRAS = r"a-zA-ZáéíóúÁÉÍÓÚñÑ"
+
+# Texto con al menos un carácter que no sea espacio (validate_not_empty)
+_NO_VACIO = rf"[^{_ESPACIOS}]"
+
+def _fecha_iso():
+    # Primero se exige el formato YYYY-MM-DD como texto y después se convierte a date,
+    # que rechaza días y meses fuera de rango
+    return GetPydanticSchema(
+        lambda tipo, handler: core_schema.chain_schema([
+            core_schema.str_schema(pattern=r"^[0-9]{4}-[0-9]{2}-[0-9]{2}$"),
+            handler(tipo),
+        ])
+    )
+
+FechaISO = Annotated[date, _fecha_iso()]
+IdEstudiante = Annotated[int, Field(gt=0)]
+TextoNoVacio100 = Annotated[str, Field(max_length=100, pattern=_NO_VACIO)]
+Texto100 = Annotated[str, Field(max_length=100)]
+Texto255 = Annotated[str, Field(max_length=255)]
+NombreApellido = Annotated[
+    str,
+    Field(min_length=2, max_length=50, pattern=rf"^[{_LETRAS}{_ESPACIOS}]*[{_LETRAS}][{_LETRAS}{_ESPACIOS}]*$")
+]
+NumeroDocumento = Annotated[str, Field(min_length=5, max_length=20, pattern=_NO_VACIO)]
+Telefono = Annotated[str, Field(min_length=7, max_length=15, pattern=r"^\d+$")]
+# Como re.match con $, que también acepta un salto de línea al final
+PeriodoAcademico = Annotated[str, Field(pattern=r"^\d{4}-[1-2]\n?$")]
+
+TipoDocumento = Literal["CC", "TI", "CE", "Pasaporte"]
+NivelRiesgo = Literal["Muy bajo", "Bajo", "Medio", "Alto", "Muy alto"]
+TipoVulnerabilidad = Literal["Economica", "Academica", "Psicosocial", "Multiple"]
+Servicio = Literal["POVAU", "POA", "POPS", "Comedor"]
+EstadoParticipacion = Literal["Activo", "Inactivo", "Finalizado"]
+TipoParticipantePOVAU = Literal["Admitido", "Nuevo", "Media academica"]
+RiesgoSpadies = Literal["Bajo", "Medio", "Alto"]
+TipoIntervencionPOPS = Literal["Asesoria", "Taller", "Terapia individual", "Asesoria grupal"]
+FrecuenciaSemanal = Literal["diaria", "3 veces por semana", "2 veces por semana", "semanal"]
+TipoComida = Literal["Almuerzo", "Cena", "Desayuno"]
+
+class EstudianteBase(BaseModel):
+    """Esquema base para validación de datos de estudiante."""
+    tipo_documento: TipoDocumento
+    numero_documento: NumeroDocumento
+    nombres: NombreApellido
+    apellidos: NombreApellido
+    correo: EmailStr
+    telefono: Optional[Telefono] = None
+    direccion: Optional[Texto100] = None
+    programa_academico: Annotated[str, Field(pattern=_NO_VACIO)]
+    semestre: Annotated[int, Field(ge=1)]
+    riesgo_desercion: NivelRiesgo
+    estrato: Annotated[int, Field(ge=1, le=6)]
+    tipo_vulnerabilidad: Optional[TipoVulnerabilidad] = None
+
+class ServicioPermanenciaBase(BaseModel):
+    """Esquema base para validación de servicios de permanencia."""
+    id_estudiante: IdEstudiante
+    servicio: Servicio
+    fecha_registro: FechaISO
+    estado_participacion: EstadoParticipacion
+    observaciones: Optional[Texto255] = None
+
+class POVAUBase(BaseModel):
+    """Esquema base para validación de datos POVAU."""
+    id_estudiante: IdEstudiante
+    tipo_participante: TipoParticipantePOVAU
+    riesgo_spadies: RiesgoSpadies
+    fecha_ingreso_programa: FechaISO
+    observaciones: Optional[Texto255] = None
+
+class POVAUCreate(POVAUBase):
+    """Esquema para crear un nuevo registro POVAU."""
+    pass
+
+class POVAUUpdate(BaseModel):
+    """Esquema para actualizar un registro POVAU existente."""
+    tipo_participante: Optional[TipoParticipantePOVAU] = None
+    riesgo_spadies: Optional[RiesgoSpadies] = None
+    fecha_ingreso_programa: Optional[FechaISO] = None
+    observaciones: Optional[Texto255] = None
+
+class POABase(BaseModel):
+    """Esquema base para validación de datos POA."""
+    id_estudiante: IdEstudiante
+    nivel_riesgo: NivelRiesgo
+    requiere_tutoria: bool
+    fecha_asignacion: FechaISO
+    acciones_apoyo: Optional[Texto255] = None
+
+class POACreate(POABase):
+    """Esquema para crear un nuevo registro POA."""
+    pass
+
+class POAUpdate(BaseModel):
+    """Esquema para actualizar un registro POA existente."""
+    nivel_riesgo: Optional[NivelRiesgo] = None
+    requiere_tutoria: Optional[bool] = None
+    fecha_asignacion: Optional[FechaISO] = None
+    acciones_apoyo: Optional[Texto255] = None
+
+class POPSBase(BaseModel):
+    """Esquema base para validación de datos POPS."""
+    id_estudiante: IdEstudiante
+    motivo_intervencion: TextoNoVacio100
+    tipo_intervencion: TipoIntervencionPOPS
+    fecha_atencion: FechaISO
+    seguimiento: Optional[Texto255] = None
+
+class POPSCreate(POPSBase):
+    """Esquema para crear un nuevo registro POPS."""
+    pass
+
+class POPSUpdate(BaseModel):
+    """Esquema para actualizar un registro POPS existente."""
+    motivo_intervencion: Optional[TextoNoVacio100] = None
+    tipo_intervencion: Optional[TipoIntervencionPOPS] = None
+    fecha_atencion: Optional[FechaISO] = None
+    seguimiento: Optional[Texto255] = None
+
+class ComedorBase(BaseModel):
+    """Esquema base para validación de datos del Comedor Universitario."""
+    id_estudiante: IdEstudiante
+    condicion_socioeconomica: TextoNoVacio100
+    fecha_solicitud: FechaISO
+    aprobado: bool
+    observaciones: Optional[Texto255] = None
+
+class RegistroBeneficioBase(BaseModel):
+    """Esquema base para validación de datos del Registro de Beneficio."""
+    fecha_inscripcion: FechaISO
+    estado_solicitud: bool
+    periodo_academico: PeriodoAcademico
+    fecha_inicio_servicio: FechaISO
+    fecha_finalizacion_servicio: FechaISO
+    numero_raciones_asignadas: Annotated[int, Field(gt=0)]
+    frecuencia_semanal: Optional[FrecuenciaSemanal] = None
+    tipo_comida_recibida: TipoComida
+
+    @model_validator(mode="after")
+    def validate_orden_fechas(self):
+        if self.fecha_inicio_servicio < self.fecha_inscripcion:
+            raise ValueError('La fecha de inicio del servicio no puede ser anterior a la fecha de inscripción')
+        if self.fecha_finalizacion_servicio <= self.fecha_inicio_servicio:
+            raise ValueError('La fecha de finalización debe ser posterior a la fecha de inicio')
+        return self
+
+class ComedorCreate(ComedorBase):
+    """Esquema para crear un nuevo registro de Comedor."""
+    pass
+
+class ComedorUpdate(BaseModel):
+    """Esquema para actualizar un registro de Comedor existente."""
+    condicion_socioeconomica: Optional[TextoNoVacio100] = None
+    fecha_solicitud: Optional[FechaISO] = None
+    aprobado: Optional[bool] = None
+    observaciones: Optional[Texto255] = None
+
+class RegistroBeneficioCreate(RegistroBeneficioBase):
+    """Esquema para crear un nuevo registro de Beneficio."""
+    pass
+
+class RegistroBeneficioUpdate(BaseModel):
+    """Esquema para actualizar un registro de Beneficio existente."""
+    fecha_inscripcion: Optional[FechaISO] = None
+    estado_solicitud: Optional[bool] = None
+    periodo_academico: Optional[PeriodoAcademico] = None
+    fecha_inicio_servicio: Optional[FechaISO] = None
+    fecha_finalizacion_servicio: Optional[FechaISO] = None
+    numero_raciones_asignadas: Optional[Annotated[int, Field(gt=0)]] = None
+    frecuencia_semanal: Optional[FrecuenciaSemanal] = None
+    tipo_comida_recibida: Optional[TipoComida] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict, Union
 from datetime import datetime
 
 class EstudianteBase(BaseModel):
@@ -35,4 +35,50 @@ class EstudianteList(BaseModel):
 class CSVUploadResponse(BaseModel):
     filename: str
     estudiantes_cargados: int
-    mensaje: str
\ No newline at end of file
+    registros_validos: Optional[int] = None
+    registros_invalidos: Optional[int] = None
+    mensaje: str
+
+class CSVCombinacionResponse(CSVUploadResponse):
+    # Respuesta de una carga con combinar=true
+    insertados: int
+    actualizados: int
+    sin_cambios: int
+    eliminados: int
+    # Filas del archivo sin id_estudiante (se agregan siempre) y filas cuyo ID se repite más adelante
+    sin_id: int
+    ids_repetidos: int
+
+class TrabajoCargaResponse(BaseModel):
+    job_id: str
+    filename: str
+    estado: str
+    filas_procesadas: int
+    progreso: float
+    filas_por_segundo: Optional[float] = None
+    eta_segundos: Optional[float] = None
+    duracion_segundos: Optional[float] = None
+    resultado: Optional[Union[CSVCombinacionResponse, CSVUploadResponse]] = None
+    error: Optional[str] = None
+    codigo_error: Optional[int] = None
+
+class GrupoAgregado(BaseModel):
+    valores: Dict[str, Optional[str]]
+    validos: int
+    invalidos: int
+    sin_validar: int
+    total: int
+
+class AgregadosResponse(BaseModel):
+    por: List[str]
+    total_registros: int
+    grupos: List[GrupoAgregado]
+
+class CoincidenciaBusqueda(BaseModel):
+    puntaje: float
+    estudiante: Estudiante
+
+class BusquedaResponse(BaseModel):
+    consulta: str
+    total: int
+    resultados: List[CoincidenciaBusqueda]
@@ -1,12 +1,7 @@
 from pydantic import BaseModel, validator, Field
 from typing import Optional, List
-import sys
-import os
-
-# Añadir el directorio raíz al path para importar utils y base_schemas
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.validators import *
-from schemas.base_schemas import ServicioPermanenciaBase
+from app.utils.validators import *
+from app.schemas.base_schemas import ServicioPermanenciaBase
 
 class POABase(BaseModel):
     """Esquema base para validación de datos POA."""
@@ -68,5 +63,3 @@ class POAUpdate(BaseModel):
         if v is not None and not validate_length(v, max_length=255):
             raise ValueError('Las acciones de apoyo no deben exceder los 255 caracteres')
         return v
-
-print("Esquemas POA cargados correctamente")
\ No newline at end of file
@@ -1,12 +1,7 @@
 from pydantic import BaseModel, validator, Field
 from typing import Optional
-import sys
-import os
-
-# Añadir el directorio raíz al path para importar utils y base_schemas
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.validators import *
-from schemas.base_schemas import ServicioPermanenciaBase
+from app.utils.validators import *
+from app.schemas.base_schemas import ServicioPermanenciaBase
 
 class POPSBase(BaseModel):
     """Esquema base para validación de datos POPS."""
@@ -85,5 +80,3 @@ class POPSUpdate(BaseModel):
         if v is not None and not validate_length(v, max_length=255):
             raise ValueError('El seguimiento no debe exceder los 255 caracteres')
         return v
-
-print("Esquemas POPS cargados correctamente")
\ No newline at end of file
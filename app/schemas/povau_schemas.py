@@ -1,12 +1,7 @@
 from pydantic import BaseModel, validator, Field
 from typing import Optional
-import sys
-import os
-
-# Añadir el directorio raíz al path para importar utils y base_schemas
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.validators import *
-from schemas.base_schemas import ServicioPermanenciaBase
+from app.utils.validators import *
+from app.schemas.base_schemas import ServicioPermanenciaBase
 
 class POVAUBase(BaseModel):
     """Esquema base para validación de datos POVAU."""
@@ -83,5 +78,3 @@ class POVAUUpdate(BaseModel):
         if v is not None and not validate_length(v, max_length=255):
             raise ValueError('Las observaciones no deben exceder los 255 caracteres')
         return v
-
-print("Esquemas POVAU cargados correctamente")
\ No newline at end of file
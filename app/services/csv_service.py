@@ -6,13 +6,15 @@ Leer, escribir, actualizar y borrar registros.
 
 Funciones como cargar_datos(), guardar_datos(), agregar_usuario(), etc.
 """
-import pandas as pd
 from io import StringIO
 
 def leer_csv_temporal(contenido: bytes):
     """
     Lee un archivo CSV en memoria desde bytes y lo retorna como lista de dicts.
     """
+    # pandas solo se carga cuando se usa esta ruta
+    import pandas as pd
+    
     try:
         archivo_str = contenido.decode("utf-8")
         df = pd.read_csv(StringIO(archivo_str))
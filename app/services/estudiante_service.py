@@ -1,11 +1,26 @@
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Tuple
+import asyncio
+import functools
 import logging
+import os
 import re
-from datetime import datetime
+import tempfile
+import time
+from operator import attrgetter, itemgetter
 from fastapi import UploadFile, HTTPException
+import numpy as np
 
-from app.models.estudiante import EstudianteModel, EstudianteStore
-from app.utils.csv_handler import parse_csv, validate_csv_headers
+from app.busqueda import palabras_consulta
+from app.metricas import CONSULTAS_CACHE, DURACION_VALIDACION, TiemposIngesta
+from app.models.estudiante import (
+    EstudianteModel, EstudianteStore, CODIGO_ERROR, CAMPOS_AGREGABLES, CAMPOS_TEXTO, crear_estudiantes, describir_errores,
+    extraer_columnas
+)
+from app.services.ingesta_paralela import obtener_pool, leer_encabezados, dividir_en_fragmentos, procesar_fragmento
+from app.services.trabajos import RegistroTrabajos, TrabajoCarga
+from app.utils.csv_handler import iter_csv_archivo, iter_csv_upload, validate_csv_headers, TAMANO_BLOQUE
+from app.utils.fechas import ColumnaFechas
+from app.utils.helpers import codificar_cursor, decodificar_cursor
 from app.schemas.estudiante import Estudiante
 
 logger = logging.getLogger(__name__)
@@ -32,65 +47,81 @@ VALORES_PERMITIDOS = {
     "aprobado": ["true", "false", "True", "False", None, ""]
 }
 
+# Expresión regular que permite letras (incluyendo acentuadas), espacios y algunos caracteres especiales
+PATRON_SOLO_LETRAS = r'^[a-zA-ZáéíóúÁÉÍÓÚüÜñÑ\s\'\-\.]+$'
+
+# Expresión regular para validar correos electrónicos
+PATRON_CORREO = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+
+# Por debajo de este número de filas se valida fila por fila: el costo fijo
+# de armar las columnas con pandas no compensa
+MIN_FILAS_VECTORIZADO = 64
+
+# Bits de los errores que dependen de otras filas
+MASCARA_DUPLICADOS = CODIGO_ERROR[("id_estudiante", "duplicado")] | CODIGO_ERROR[("correo", "duplicado")]
+
+CAMPOS_FECHA = ["fecha_ingreso_programa", "fecha_asignacion", "fecha_atencion", "fecha_solicitud"]
+
+def columnas_fechas() -> Dict[str, ColumnaFechas]:
+    """
+    Fechas memorizadas y formato dominante de cada columna de fecha, propios de
+    una carga o una validación: lo que infiere una no afecta a otra que corra a la vez.
+    """
+    return {campo: ColumnaFechas() for campo in CAMPOS_FECHA}
+
+def _tiene_id(estudiante: EstudianteModel) -> bool:
+    # Un ID vacío o solo con espacios no identifica a la fila
+    return bool(estudiante.id_estudiante and estudiante.id_estudiante.strip())
+
 class EstudianteService:
+    # Resultado de la última validación junto con la versión del almacén que lo produjo
+    _cache_validacion: Optional[Tuple[int, Dict[str, Any]]] = None
+    # Lista de estudiantes válidos filtrada con los veredictos de la carga
+    _cache_validos: Optional[Tuple[int, List[EstudianteModel]]] = None
+    
     def __init__(self):
         self.store = EstudianteStore()
+        # Con varios workers, adoptar la última carga publicada por cualquiera de ellos
+        self.store.sincronizar()
     
-    async def process_csv_file(self, file: UploadFile) -> Dict[str, Any]:
+    async def process_csv_file(
+        self,
+        file: UploadFile,
+        validar: bool = True,
+        paralelo: bool = False,
+        combinar: bool = False,
+        eliminar_faltantes: bool = False
+    ) -> Dict[str, Any]:
         """
-        Procesa un archivo CSV y carga los datos en el almacén sin validación.
+        Procesa un archivo CSV y carga los datos en el almacén.
+        
+        El archivo se lee por bloques y las filas se construyen en lotes, así el
+        texto del archivo nunca está completo en memoria; el almacén se
+        reemplaza de una vez cuando todo el archivo se leyó sin errores. Con
+        `paralelo` el parseo y la validación se reparten entre varios procesos.
+        
+        Si `validar` es verdadero cada fila se valida una sola vez mientras se
+        construye su modelo y el veredicto queda guardado en el almacén; en caso
+        contrario los datos se cargan sin validación y se validan al consultarlos.
+        
+        Con `combinar` el archivo no reemplaza los datos: cada fila se inserta o
+        actualiza según su id_estudiante (ver _combinar_estudiantes).
         """
+        tiempos = TiemposIngesta()
         try:
-            # Leer el contenido del archivo
-            file_content = await file.read()
-            
-            # Parsear el CSV
-            rows = parse_csv(file_content)
-            
-            if not rows:
-                raise HTTPException(status_code=400, detail="El archivo CSV está vacío")
-            
-            # Validar solo que los encabezados existan
-            if not validate_csv_headers(rows[0].keys(), EXPECTED_HEADERS):
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Los encabezados del CSV no coinciden con los esperados. Esperados: {', '.join(EXPECTED_HEADERS)}"
-                )
+            if combinar:
+                entrantes = await self._leer_estudiantes(file, tiempos)
+                contadores = await self._combinar(entrantes, validar, eliminar_faltantes, tiempos)
+                tiempos.publicar(len(entrantes))
+                return self._resultado_carga(file.filename, len(entrantes), validar, contadores)
             
-            # Limpiar el almacén antes de cargar nuevos datos
-            self.store.clear_estudiantes()
-            
-            # Procesar cada fila y crear objetos EstudianteModel sin validación
-            for row in rows:
-                estudiante = EstudianteModel(
-                    id_estudiante=row.get("id_estudiante", ""),
-                    nombres=row.get("nombres", ""),
-                    apellidos=row.get("apellidos", ""),
-                    correo=row.get("correo", ""),  # Sin validación
-                    semestre=row.get("semestre", ""),
-                    tipo_vulnerabilidad=row.get("tipo_vulnerabilidad"),
-                    riesgo_desercion=row.get("riesgo_desercion"),
-                    tipo_participante=row.get("tipo_participante"),
-                    riesgo_spadies=row.get("riesgo_spadies"),
-                    fecha_ingreso_programa=row.get("fecha_ingreso_programa"),
-                    nivel_riesgo=row.get("nivel_riesgo"),
-                    requiere_tutoria=row.get("requiere_tutoria"),
-                    fecha_asignacion=row.get("fecha_asignacion"),
-                    tipo_intervencion=row.get("tipo_intervencion"),
-                    fecha_atencion=row.get("fecha_atencion"),
-                    condicion_socioeconomica=row.get("condicion_socioeconomica"),
-                    fecha_solicitud=row.get("fecha_solicitud"),
-                    aprobado=row.get("aprobado")
-                )
-                self.store.add_estudiante(estudiante)
-            
-            logger.info(f"CSV procesado correctamente. {len(rows)} estudiantes cargados sin validación.")
+            if paralelo:
+                total = await self._procesar_csv_paralelo(file, validar, tiempos)
+            else:
+                total = await self._procesar_csv_por_lotes(file, validar, tiempos)
             
-            return {
-                "filename": file.filename,
-                "estudiantes_cargados": len(rows),
-                "mensaje": "Archivo CSV procesado correctamente. Datos cargados sin validación."
-            }
+            tiempos.publicar(total)
+            return self._resultado_carga(file.filename, total, validar)
         
         except HTTPException:
             raise
@@ -98,6 +129,596 @@ class EstudianteService:
             logger.error(f"Error al procesar el archivo CSV: {str(e)}")
             raise HTTPException(status_code=500, detail=f"Error al procesar el archivo CSV: {str(e)}")
     
+    def obtener_trabajo(self, job_id: str) -> TrabajoCarga:
+        """
+        Obtiene un trabajo de carga en segundo plano por su id.
+        """
+        trabajo = RegistroTrabajos.obtener(job_id)
+        if trabajo is None:
+            raise HTTPException(status_code=404, detail=f"Trabajo de carga {job_id} no encontrado")
+        return trabajo
+    
+    def _resultado_carga(
+        self,
+        filename: str,
+        total: int,
+        validar: bool,
+        contadores: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        Arma la respuesta de una carga terminada. `contadores` son los de una combinación.
+        """
+        if not validar:
+            logger.info(f"CSV procesado correctamente. {total} estudiantes cargados sin validación.")
+            resultado = {
+                "filename": filename,
+                "estudiantes_cargados": total,
+                "mensaje": "Archivo CSV procesado correctamente. Datos cargados sin validación."
+            }
+        else:
+            logger.info(
+                f"CSV procesado correctamente. {total} estudiantes cargados: "
+                f"{self.store.total_validos} válidos, {self.store.total_invalidos} inválidos."
+            )
+            resultado = {
+                "filename": filename,
+                "estudiantes_cargados": total,
+                "registros_validos": self.store.total_validos,
+                "registros_invalidos": self.store.total_invalidos,
+                "mensaje": "Archivo CSV procesado correctamente. Datos validados durante la carga."
+            }
+        
+        if contadores is not None:
+            logger.info(f"CSV combinado con los datos actuales: {contadores}")
+            resultado.update(contadores)
+        return resultado
+    
+    async def iniciar_carga_en_segundo_plano(
+        self,
+        file: UploadFile,
+        validar: bool = True,
+        paralelo: bool = False,
+        combinar: bool = False,
+        eliminar_faltantes: bool = False
+    ) -> TrabajoCarga:
+        """
+        Copia el archivo subido y lo carga en segundo plano. Devuelve el trabajo creado.
+        
+        El parseo, la validación y la construcción de los modelos se hacen en un
+        hilo del executor (o en el pool de procesos con `paralelo`), igual que la
+        combinación y el guardado (ver EstudianteStore.escribir). Así el event
+        loop sigue atendiendo consultas, que ven los datos anteriores hasta que
+        la carga termina y el almacén se reemplaza de una vez.
+        """
+        ruta = await self._guardar_temporal(file)
+        trabajo = RegistroTrabajos.crear(file.filename, os.path.getsize(ruta))
+        trabajo.tarea = asyncio.create_task(
+            self._ejecutar_trabajo(trabajo, ruta, validar, paralelo, combinar, eliminar_faltantes)
+        )
+        return trabajo
+    
+    async def _ejecutar_trabajo(
+        self,
+        trabajo: TrabajoCarga,
+        ruta: str,
+        validar: bool,
+        paralelo: bool,
+        combinar: bool,
+        eliminar_faltantes: bool
+    ) -> None:
+        trabajo.iniciar()
+        tiempos = TiemposIngesta()
+        try:
+            if combinar:
+                loop = asyncio.get_running_loop()
+                # Las filas se leen sin validar: la combinación revalida solo lo que cambió
+                entrantes = await loop.run_in_executor(None, self._construir_desde_archivo, ruta, False, trabajo, tiempos)
+                trabajo.guardando()
+                contadores = await self._combinar(entrantes, validar, eliminar_faltantes, tiempos)
+                tiempos.publicar(len(entrantes))
+                trabajo.completar(self._resultado_carga(trabajo.filename, len(entrantes), validar, contadores))
+                return
+            if paralelo:
+                total = await self._cargar_archivo_paralelo(ruta, validar, tiempos, trabajo)
+            else:
+                loop = asyncio.get_running_loop()
+                estudiantes = await loop.run_in_executor(None, self._construir_desde_archivo, ruta, validar, trabajo, tiempos)
+                trabajo.guardando()
+                await self._reemplazar_almacen(estudiantes, tiempos)
+                total = len(estudiantes)
+            tiempos.publicar(total)
+            trabajo.completar(self._resultado_carga(trabajo.filename, total, validar))
+        except HTTPException as e:
+            trabajo.fallar(e.status_code, e.detail)
+        except Exception as e:
+            logger.error(f"Error al procesar el archivo CSV: {str(e)}")
+            trabajo.fallar(500, f"Error al procesar el archivo CSV: {str(e)}")
+        finally:
+            os.remove(ruta)
+    
+    def _construir_desde_archivo(
+        self,
+        ruta: str,
+        validar: bool,
+        trabajo: TrabajoCarga,
+        tiempos: TiemposIngesta
+    ) -> List[EstudianteModel]:
+        """
+        Parsea y valida un archivo lote por lote sin tocar el almacén.
+        
+        Se ejecuta en un hilo del executor; devuelve los estudiantes con sus veredictos.
+        """
+        fechas = columnas_fechas()
+        estudiantes = []
+        ids_validos = set()
+        correos_validos = set()
+        with open(ruta, "rb") as archivo:
+            lotes = iter_csv_archivo(archivo, tiempos=tiempos)
+            primer_lote = next(lotes, None)
+            
+            if not primer_lote:
+                raise HTTPException(status_code=400, detail="El archivo CSV está vacío")
+            
+            self._verificar_encabezados(primer_lote[0].keys())
+            
+            estudiantes.extend(self._construir_lote(primer_lote, validar, ids_validos, correos_validos, fechas, tiempos))
+            self._inferir_formatos_fecha(fechas)
+            trabajo.avanzar(len(primer_lote), archivo.tell())
+            for lote in lotes:
+                estudiantes.extend(self._construir_lote(lote, validar, ids_validos, correos_validos, fechas, tiempos))
+                trabajo.avanzar(len(lote), archivo.tell())
+        return estudiantes
+    
+    def _verificar_encabezados(self, encabezados) -> None:
+        """
+        Valida solo que los encabezados existan.
+        """
+        if not validate_csv_headers(encabezados, EXPECTED_HEADERS):
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Los encabezados del CSV no coinciden con los esperados. Esperados: {', '.join(EXPECTED_HEADERS)}"
+            )
+    
+    async def _procesar_csv_por_lotes(self, file: UploadFile, validar: bool, tiempos: TiemposIngesta) -> int:
+        """
+        Carga el archivo en un solo proceso, lote por lote. Devuelve el número de filas.
+        
+        Si el archivo falla a mitad de camino el almacén no cambia.
+        """
+        lotes = iter_csv_upload(file, tiempos=tiempos)
+        
+        # El primer lote permite revisar el archivo antes de tocar el almacén
+        primer_lote = await anext(lotes, None)
+        
+        if not primer_lote:
+            raise HTTPException(status_code=400, detail="El archivo CSV está vacío")
+        
+        self._verificar_encabezados(primer_lote[0].keys())
+        
+        # Los lotes se acumulan fuera del almacén: si una fila falla a mitad del
+        # archivo, el almacén conserva los datos anteriores y las consultas
+        # concurrentes nunca ven una carga a medias
+        fechas = columnas_fechas()
+        ids_validos = set()
+        correos_validos = set()
+        estudiantes = self._construir_lote(primer_lote, validar, ids_validos, correos_validos, fechas, tiempos)
+        self._inferir_formatos_fecha(fechas)
+        async for lote in lotes:
+            estudiantes.extend(self._construir_lote(lote, validar, ids_validos, correos_validos, fechas, tiempos))
+        
+        await self._reemplazar_almacen(estudiantes, tiempos)
+        return len(estudiantes)
+    
+    async def _reemplazar_almacen(self, estudiantes: List[EstudianteModel], tiempos: TiemposIngesta) -> None:
+        """
+        Reemplaza el contenido del almacén por `estudiantes` de una vez, en una sola
+        transacción si hay base de datos.
+        
+        La escritura, el snapshot y el índice de búsqueda se hacen fuera del event
+        loop (ver EstudianteStore.escribir).
+        """
+        def reemplazar(almacen: EstudianteStore):
+            with almacen.carga():
+                almacen.clear_estudiantes()
+                almacen.add_estudiantes(estudiantes)
+        
+        with tiempos.etapa("guardar"):
+            await self.store.escribir(reemplazar, vaciar=True)
+    
+    async def _procesar_csv_paralelo(self, file: UploadFile, validar: bool, tiempos: TiemposIngesta) -> int:
+        """
+        Carga el archivo repartiendo el parseo y la validación entre procesos.
+        
+        El archivo subido se copia a un temporal que los workers leen con mmap.
+        Devuelve el número de filas.
+        """
+        ruta = await self._guardar_temporal(file)
+        try:
+            return await self._cargar_archivo_paralelo(ruta, validar, tiempos)
+        finally:
+            os.remove(ruta)
+    
+    async def _cargar_archivo_paralelo(
+        self,
+        ruta: str,
+        validar: bool,
+        tiempos: TiemposIngesta,
+        trabajo: Optional[TrabajoCarga] = None
+    ) -> int:
+        """
+        Carga un archivo del disco con el pool de procesos.
+        
+        Cada worker devuelve columnas y códigos de error de su fragmento. Los
+        resultados se unen en el orden del archivo y los duplicados se resuelven
+        sobre el total, igual que en la carga por lotes. Devuelve el número de filas.
+        
+        Los workers parsean y validan juntos, así que su tiempo se registra como
+        la etapa "procesos".
+        """
+        encabezados, inicio_datos = leer_encabezados(ruta)
+        fragmentos = dividir_en_fragmentos(ruta, inicio_datos)
+        if not fragmentos:
+            raise HTTPException(status_code=400, detail="El archivo CSV está vacío")
+        
+        self._verificar_encabezados(encabezados)
+        
+        loop = asyncio.get_running_loop()
+        pool = obtener_pool()
+        
+        def registrar_avance(futuro, tamano):
+            if not futuro.cancelled() and futuro.exception() is None:
+                trabajo.avanzar(len(futuro.result()[0]["id_estudiante"]), trabajo.bytes_procesados + tamano)
+        
+        futuros = []
+        for inicio, fin in fragmentos:
+            futuro = loop.run_in_executor(pool, procesar_fragmento, ruta, inicio, fin, encabezados, EXPECTED_HEADERS, validar)
+            if trabajo is not None:
+                futuro.add_done_callback(functools.partial(registrar_avance, tamano=fin - inicio))
+            futuros.append(futuro)
+        with tiempos.etapa("procesos"):
+            resultados = await asyncio.gather(*futuros)
+        if trabajo is not None:
+            trabajo.guardando()
+        
+        # Unir los resultados y construir los modelos también fuera del event loop
+        estudiantes = await loop.run_in_executor(None, self._unir_fragmentos, resultados, validar, tiempos)
+        del resultados
+        await self._reemplazar_almacen(estudiantes, tiempos)
+        return len(estudiantes)
+    
+    def _unir_fragmentos(
+        self,
+        resultados: List[Tuple[Dict[str, list], Optional[list]]],
+        validar: bool,
+        tiempos: TiemposIngesta
+    ) -> List[EstudianteModel]:
+        """
+        Une las columnas y los códigos de los fragmentos en el orden del archivo,
+        marca los duplicados sobre el total y construye los estudiantes.
+        """
+        columnas = {campo: [] for campo in EXPECTED_HEADERS}
+        codigos = []
+        for columnas_fragmento, codigos_fragmento in resultados:
+            for campo in EXPECTED_HEADERS:
+                columnas[campo].extend(columnas_fragmento[campo])
+            if codigos_fragmento:
+                codigos.extend(codigos_fragmento)
+        
+        if not columnas["id_estudiante"]:
+            raise HTTPException(status_code=400, detail="El archivo CSV está vacío")
+        
+        if validar:
+            with tiempos.etapa("validar"):
+                codigos = self._marcar_duplicados(
+                    np.array(codigos, dtype=np.int64), columnas["id_estudiante"], columnas["correo"], set(), set()
+                ).tolist()
+        
+        with tiempos.etapa("construir"):
+            estudiantes = crear_estudiantes(columnas)
+            del columnas
+            if validar:
+                for estudiante, codigos_error in zip(estudiantes, codigos):
+                    estudiante.asignar_veredicto(codigos_error)
+        return estudiantes
+    
+    async def _leer_estudiantes(self, file: UploadFile, tiempos: TiemposIngesta) -> List[EstudianteModel]:
+        """
+        Lee todas las filas del archivo como estudiantes sin validar, sin tocar el almacén.
+        """
+        lotes = iter_csv_upload(file, tiempos=tiempos)
+        primer_lote = await anext(lotes, None)
+        
+        if not primer_lote:
+            raise HTTPException(status_code=400, detail="El archivo CSV está vacío")
+        
+        self._verificar_encabezados(primer_lote[0].keys())
+        
+        with tiempos.etapa("construir"):
+            estudiantes = self._crear_estudiantes(primer_lote)
+        async for lote in lotes:
+            with tiempos.etapa("construir"):
+                estudiantes.extend(self._crear_estudiantes(lote))
+        return estudiantes
+    
+    async def _combinar(
+        self,
+        entrantes: List[EstudianteModel],
+        validar: bool,
+        eliminar_faltantes: bool,
+        tiempos: TiemposIngesta
+    ) -> Dict[str, int]:
+        """
+        Combina `entrantes` con el almacén fuera del event loop (ver _combinar_estudiantes).
+        """
+        return await self.store.escribir(functools.partial(
+            self._combinar_estudiantes,
+            entrantes=entrantes, validar=validar, eliminar_faltantes=eliminar_faltantes, tiempos=tiempos
+        ))
+    
+    def _combinar_estudiantes(
+        self,
+        almacen: EstudianteStore,
+        entrantes: List[EstudianteModel],
+        validar: bool,
+        eliminar_faltantes: bool,
+        tiempos: TiemposIngesta
+    ) -> Dict[str, int]:
+        """
+        Combina estudiantes leídos de un archivo con los del almacén, por id_estudiante.
+        
+        Un ID nuevo se agrega al final; un ID existente reemplaza a su primera
+        aparición si algún campo cambió y se cuenta sin cambios si no. Si el
+        archivo repite un ID, vale su última fila y las anteriores se cuentan en
+        `ids_repetidos`. Una fila sin ID no se puede emparejar: se agrega
+        siempre al final y se cuenta en `sin_id`. Con `eliminar_faltantes` se
+        borran las filas cuyo ID no está en el archivo, incluidas las que no
+        tienen ID (las del archivo se vuelven a agregar).
+        
+        Solo se revalidan las filas que cambiaron y las que comparten con ellas
+        un ID o correo (directa o indirectamente), porque la regla de duplicados
+        depende del orden de las filas con el mismo valor; el resto conserva su
+        veredicto. Devuelve los contadores de insertados, actualizados, sin
+        cambios, eliminados, sin ID y repetidos.
+        
+        `almacen` es la copia que entrega EstudianteStore.escribir: se ejecuta en
+        un hilo del executor y el resultado se adopta al terminar.
+        """
+        actuales = almacen.get_all_estudiantes()
+        valores = attrgetter(*EXPECTED_HEADERS)
+        
+        # Última fila del archivo para cada ID, en el orden en que aparecen
+        por_id: Dict[str, EstudianteModel] = {}
+        sin_id: List[EstudianteModel] = []
+        ids_repetidos = 0
+        for estudiante in entrantes:
+            if not _tiene_id(estudiante):
+                sin_id.append(estudiante)
+                continue
+            if estudiante.id_estudiante in por_id:
+                ids_repetidos += 1
+            por_id[estudiante.id_estudiante] = estudiante
+        
+        posicion_actual: Dict[str, int] = {}
+        for posicion, estudiante in enumerate(actuales):
+            if _tiene_id(estudiante):
+                posicion_actual.setdefault(estudiante.id_estudiante, posicion)
+        
+        reemplazos: Dict[int, EstudianteModel] = {}
+        agregados: List[EstudianteModel] = []
+        sin_cambios = 0
+        for id_estudiante, nuevo in por_id.items():
+            posicion = posicion_actual.get(id_estudiante)
+            if posicion is None:
+                agregados.append(nuevo)
+            elif valores(actuales[posicion]) == valores(nuevo):
+                sin_cambios += 1
+            else:
+                reemplazos[posicion] = nuevo
+        
+        eliminados = []
+        if eliminar_faltantes:
+            eliminados = [
+                posicion for posicion, estudiante in enumerate(actuales)
+                if not _tiene_id(estudiante) or estudiante.id_estudiante not in por_id
+            ]
+        
+        contadores = {
+            "insertados": len(agregados),
+            "actualizados": len(reemplazos),
+            "sin_cambios": sin_cambios,
+            "eliminados": len(eliminados),
+            "sin_id": len(sin_id),
+            "ids_repetidos": ids_repetidos,
+        }
+        # Las filas sin ID van después de las nuevas, en el orden del archivo
+        agregados.extend(sin_id)
+        if not (agregados or reemplazos or eliminados):
+            return contadores
+        
+        # IDs y correos de las filas que entran o salen: sus duplicados pueden cambiar
+        salientes = [actuales[posicion] for posicion in reemplazos] + [actuales[posicion] for posicion in eliminados]
+        cambiados = list(reemplazos.values()) + agregados
+        claves_id = {estudiante.id_estudiante for estudiante in salientes + cambiados}
+        claves_correo = {estudiante.correo for estudiante in salientes + cambiados}
+        
+        estudiantes = list(actuales)
+        for posicion, nuevo in reemplazos.items():
+            estudiantes[posicion] = nuevo
+        if eliminados:
+            borrar = set(eliminados)
+            estudiantes = [estudiante for posicion, estudiante in enumerate(estudiantes) if posicion not in borrar]
+        estudiantes.extend(agregados)
+        
+        entrantes_validados = list(cambiados)
+        modificados = {} if eliminados else dict(reemplazos)
+        if validar:
+            nuevos = {id(estudiante) for estudiante in cambiados}
+            # Si el almacén no estaba validado no hay veredictos que reutilizar
+            revalidar_todo = not almacen.validado_en_carga
+            with tiempos.etapa("validar"):
+                revalidadas = self._revalidar_filas(
+                    estudiantes, nuevos, claves_id, claves_correo, columnas_fechas(), revalidar_todo
+                )
+            for posicion, codigos_error in revalidadas:
+                estudiante = estudiantes[posicion]
+                if id(estudiante) in nuevos:
+                    estudiante.asignar_veredicto(codigos_error)
+                    continue
+                if estudiante.es_valido is not None and estudiante.codigos_error == codigos_error:
+                    continue
+                # Fila sin cambios cuyo veredicto cambió: se reemplaza por una copia
+                # para que sus totales se descuenten con el veredicto anterior
+                copia = EstudianteModel(*valores(estudiante))
+                copia.asignar_veredicto(codigos_error)
+                estudiantes[posicion] = copia
+                salientes.append(estudiante)
+                entrantes_validados.append(copia)
+                if not eliminados:
+                    modificados[posicion] = copia
+        
+        with tiempos.etapa("guardar"), almacen.carga():
+            almacen.combinar(
+                estudiantes, salientes, entrantes_validados, modificados, len(agregados), reescribir=bool(eliminados)
+            )
+        return contadores
+    
+    def _revalidar_filas(
+        self,
+        estudiantes: List[EstudianteModel],
+        nuevos: Set[int],
+        claves_id: Set[Optional[str]],
+        claves_correo: Set[Optional[str]],
+        fechas: Dict[str, ColumnaFechas],
+        todas: bool = False
+    ) -> List[Tuple[int, int]]:
+        """
+        Recalcula los códigos de error de las filas afectadas por una combinación.
+        
+        `nuevos` son los id() de los estudiantes que entraron con la combinación;
+        `claves_id` y `claves_correo`, los valores que entraron o salieron. Las
+        filas sin cambios reutilizan sus errores propios y solo se recalcula la
+        regla de duplicados. Devuelve (posición, códigos) en orden de posición.
+        """
+        if todas:
+            afectadas = list(range(len(estudiantes)))
+        else:
+            afectadas = self._filas_afectadas(estudiantes, nuevos, claves_id, claves_correo)
+        filas = [estudiantes[posicion] for posicion in afectadas]
+        
+        por_calcular = [
+            indice for indice, estudiante in enumerate(filas)
+            if id(estudiante) in nuevos or estudiante.es_valido is None
+        ]
+        codigos = np.array([estudiante.codigos_error & ~MASCARA_DUPLICADOS for estudiante in filas], dtype=np.int64)
+        if por_calcular:
+            columnas = extraer_columnas([filas[indice] for indice in por_calcular])
+            codigos[por_calcular] = self._calcular_codigos_columnas(columnas, fechas, codificadas=True)
+        
+        # Las filas afectadas incluyen todas las que comparten un ID o correo con
+        # ellas, así que los duplicados se resuelven sin mirar el resto
+        codigos = self._marcar_duplicados(
+            codigos, [estudiante.id_estudiante for estudiante in filas], [estudiante.correo for estudiante in filas], set(), set()
+        )
+        return list(zip(afectadas, codigos.tolist()))
+    
+    def _filas_afectadas(
+        self,
+        estudiantes: List[EstudianteModel],
+        nuevos: Set[int],
+        claves_id: Set[Optional[str]],
+        claves_correo: Set[Optional[str]]
+    ) -> List[int]:
+        """
+        Posiciones de las filas nuevas y de las conectadas con ellas o con las
+        claves dadas por un ID o correo compartido, de forma transitiva.
+        """
+        por_id: Dict[str, List[int]] = {}
+        por_correo: Dict[str, List[int]] = {}
+        afectadas = set()
+        for posicion, estudiante in enumerate(estudiantes):
+            if id(estudiante) in nuevos:
+                afectadas.add(posicion)
+            if estudiante.id_estudiante:
+                por_id.setdefault(estudiante.id_estudiante, []).append(posicion)
+            if estudiante.correo:
+                por_correo.setdefault(estudiante.correo, []).append(posicion)
+        
+        # Los valores vacíos nunca cuentan como duplicados
+        pendientes_id = {clave for clave in claves_id if clave}
+        pendientes_correo = {clave for clave in claves_correo if clave}
+        while pendientes_id or pendientes_correo:
+            alcanzadas = []
+            for clave in pendientes_id:
+                alcanzadas.extend(por_id.pop(clave, ()))
+            for clave in pendientes_correo:
+                alcanzadas.extend(por_correo.pop(clave, ()))
+            pendientes_id = set()
+            pendientes_correo = set()
+            for posicion in alcanzadas:
+                afectadas.add(posicion)
+                estudiante = estudiantes[posicion]
+                if estudiante.id_estudiante in por_id:
+                    pendientes_id.add(estudiante.id_estudiante)
+                if estudiante.correo in por_correo:
+                    pendientes_correo.add(estudiante.correo)
+        return sorted(afectadas)
+    
+    async def _guardar_temporal(self, file: UploadFile) -> str:
+        """
+        Copia el archivo subido por bloques a un archivo temporal y devuelve su ruta.
+        """
+        with tempfile.NamedTemporaryFile(suffix=".csv", delete=False) as temporal:
+            while True:
+                bloque = await file.read(TAMANO_BLOQUE)
+                if not bloque:
+                    break
+                temporal.write(bloque)
+        return temporal.name
+    
+    def _construir_lote(
+        self,
+        rows: List[Dict[str, Any]],
+        validar: bool,
+        ids_validos: Set[str],
+        correos_validos: Set[str],
+        fechas: Dict[str, ColumnaFechas],
+        tiempos: TiemposIngesta
+    ) -> List[EstudianteModel]:
+        """
+        Crea los objetos EstudianteModel de un lote de filas y, si se pide, asigna sus veredictos.
+        
+        `fechas` son las de la carga (ver columnas_fechas), compartidas por todos sus lotes.
+        """
+        with tiempos.etapa("construir"):
+            estudiantes = self._crear_estudiantes(rows)
+        if validar:
+            with tiempos.etapa("validar"):
+                codigos = self._calcular_codigos_lote(estudiantes, ids_validos, correos_validos, fechas)
+                for estudiante, codigos_error in zip(estudiantes, codigos):
+                    estudiante.asignar_veredicto(codigos_error)
+        return estudiantes
+    
+    def _crear_estudiantes(self, rows: List[Dict[str, Any]]) -> List[EstudianteModel]:
+        """
+        Crea los EstudianteModel de un lote de filas del CSV, codificando cada columna de una vez.
+        
+        Los encabezados ya se verificaron: cada fila trae todos los campos esperados
+        (None si a la línea le faltaban valores).
+        """
+        return crear_estudiantes({campo: list(map(itemgetter(campo), rows)) for campo in EXPECTED_HEADERS})
+    
+    def etag(self) -> str:
+        """
+        ETag del contenido actual del almacén, para responder 304 a If-None-Match.
+        
+        Cambia con cada modificación del almacén. Sale de la etiqueta del
+        almacén: con el contenido de una generación de la base de datos (o de un
+        snapshot publicado) es el mismo en todos los workers y tras reiniciar,
+        así el 304 sirve detrás de un balanceador; si no, lleva el identificador
+        del proceso y nunca coincide por error con el de otro worker.
+        """
+        return f'"{self.store.etiqueta}"'
+    
     def get_all_estudiantes(self) -> List[EstudianteModel]:
         """
         Obtiene todos los estudiantes del almacén.
@@ -117,7 +738,20 @@ class EstudianteService:
         """
         Valida los estudiantes cargados según el diccionario de datos,
         elimina duplicados y devuelve solo los registros válidos.
+        
+        Si los datos se validaron durante la carga se usan los veredictos
+        guardados. El resultado se reutiliza mientras la versión del almacén
+        no cambie.
         """
+        cache = EstudianteService._cache_validacion
+        if cache is not None and cache[0] == self.store.version:
+            CONSULTAS_CACHE.incrementar("validacion", "acierto")
+            return dict(cache[1])
+        CONSULTAS_CACHE.incrementar("validacion", "fallo")
+        
+        inicio = time.perf_counter()
+        version = self.store.version
+        validado_en_carga = self.store.validado_en_carga
         estudiantes_validos = []
         estudiantes_invalidos = []
         errores_por_campo = {}
@@ -127,90 +761,32 @@ class EstudianteService:
         # Obtener todos los estudiantes cargados
         todos_estudiantes = self.store.get_all_estudiantes()
         
-        for estudiante in todos_estudiantes:
-            # Inicializar variables para el seguimiento de errores
-            es_valido = True
-            errores = []
-            
-            # 1. Validar campos requeridos
-            if not estudiante.id_estudiante:
-                es_valido = False
-                errores.append("ID de estudiante es requerido")
-                self._agregar_error_campo(errores_por_campo, "id_estudiante", "Campo requerido")
-            
-            if not estudiante.nombres:
-                es_valido = False
-                errores.append("Nombres es requerido")
-                self._agregar_error_campo(errores_por_campo, "nombres", "Campo requerido")
-            elif not self._validar_solo_letras(estudiante.nombres):
-                es_valido = False
-                errores.append("Nombres debe contener solo letras")
-                self._agregar_error_campo(errores_por_campo, "nombres", "Solo letras permitidas")
-            
-            if not estudiante.apellidos:
-                es_valido = False
-                errores.append("Apellidos es requerido")
-                self._agregar_error_campo(errores_por_campo, "apellidos", "Campo requerido")
-            elif not self._validar_solo_letras(estudiante.apellidos):
-                es_valido = False
-                errores.append("Apellidos debe contener solo letras")
-                self._agregar_error_campo(errores_por_campo, "apellidos", "Solo letras permitidas")
-            
-            if not estudiante.correo:
-                es_valido = False
-                errores.append("Correo es requerido")
-                self._agregar_error_campo(errores_por_campo, "correo", "Campo requerido")
-            elif not self._validar_correo(estudiante.correo):
-                es_valido = False
-                errores.append("Formato de correo inválido")
-                self._agregar_error_campo(errores_por_campo, "correo", "Formato inválido")
-            
-            if not estudiante.semestre:
-                es_valido = False
-                errores.append("Semestre es requerido")
-                self._agregar_error_campo(errores_por_campo, "semestre", "Campo requerido")
-            
-            # 2. Validar valores permitidos según el diccionario de datos
-            for campo, valores_permitidos in VALORES_PERMITIDOS.items():
-                valor = getattr(estudiante, campo, None)
-                if valor is not None and valor not in valores_permitidos:
-                    es_valido = False
-                    errores.append(f"{campo} tiene un valor no permitido: {valor}")
-                    self._agregar_error_campo(errores_por_campo, campo, f"Valor no permitido: {valor}")
-            
-            # 3. Validar fechas
-            campos_fecha = ["fecha_ingreso_programa", "fecha_asignacion", "fecha_atencion", "fecha_solicitud"]
-            for campo in campos_fecha:
-                valor = getattr(estudiante, campo, None)
-                if valor and not self._validar_fecha(valor):
-                    es_valido = False
-                    errores.append(f"{campo} tiene un formato de fecha inválido: {valor}")
-                    self._agregar_error_campo(errores_por_campo, campo, "Formato de fecha inválido")
-            
-            # 4. Verificar duplicados
-            if estudiante.id_estudiante in ids_procesados:
-                es_valido = False
-                errores.append(f"ID de estudiante duplicado: {estudiante.id_estudiante}")
-                self._agregar_error_campo(errores_por_campo, "id_estudiante", "Valor duplicado")
-            
-            if estudiante.correo and estudiante.correo in correos_procesados:
-                es_valido = False
-                errores.append(f"Correo electrónico duplicado: {estudiante.correo}")
-                self._agregar_error_campo(errores_por_campo, "correo", "Valor duplicado")
-            
-            # Si el registro es válido, añadirlo a la lista de válidos y registrar IDs procesados
-            if es_valido:
+        if validado_en_carga:
+            codigos_por_estudiante = [estudiante.codigos_error for estudiante in todos_estudiantes]
+        else:
+            codigos_por_estudiante = self._calcular_codigos_lote(
+                todos_estudiantes, ids_procesados, correos_procesados, columnas_fechas()
+            )
+        
+        for estudiante, codigos in zip(todos_estudiantes, codigos_por_estudiante):
+            # Si el registro es válido, añadirlo a la lista de válidos
+            if not codigos:
                 estudiantes_validos.append(estudiante)
-                if estudiante.id_estudiante:
-                    ids_procesados.add(estudiante.id_estudiante)
-                if estudiante.correo:
-                    correos_procesados.add(estudiante.correo)
-            else:
-                # Guardar el estudiante inválido junto con sus errores
-                estudiantes_invalidos.append({
-                    "estudiante": estudiante,
-                    "errores": errores
-                })
+                continue
+            
+            # Guardar el estudiante inválido junto con sus errores
+            errores = []
+            for campo, error, mensaje in describir_errores(estudiante, codigos):
+                errores.append(mensaje)
+                if not validado_en_carga:
+                    self._agregar_error_campo(errores_por_campo, campo, error)
+            estudiantes_invalidos.append({
+                "estudiante": estudiante,
+                "errores": errores
+            })
+        
+        if validado_en_carga:
+            errores_por_campo = self._copiar_errores_por_campo()
         
         # Registrar resultados en el log
         total = len(todos_estudiantes)
@@ -220,7 +796,7 @@ class EstudianteService:
         logger.info(f"Validación completada: {validos} válidos, {invalidos} inválidos de un total de {total}")
         
         # Devolver resultados detallados
-        return {
+        resultado = {
             "estudiantes_validos": estudiantes_validos,
             "total_registros": total,
             "registros_validos": validos,
@@ -228,6 +804,230 @@ class EstudianteService:
             "errores_por_campo": errores_por_campo,
             "detalle_invalidos": estudiantes_invalidos
         }
+        EstudianteService._cache_validacion = (version, resultado)
+        if not validado_en_carga:
+            DURACION_VALIDACION.observar(time.perf_counter() - inicio)
+        return dict(resultado)
+    
+    def _calcular_codigos_error(
+        self,
+        estudiante: EstudianteModel,
+        ids_procesados: Set[str],
+        correos_procesados: Set[str],
+        fechas: Dict[str, ColumnaFechas]
+    ) -> int:
+        """
+        Aplica las reglas del diccionario de datos a un estudiante y devuelve
+        sus errores codificados como bits (0 si el registro es válido).
+        
+        Los conjuntos de IDs y correos ya aceptados se actualizan cuando el
+        registro resulta válido, para detectar duplicados en las filas siguientes.
+        """
+        codigos = 0
+        
+        # 1. Validar campos requeridos
+        if not estudiante.id_estudiante:
+            codigos |= CODIGO_ERROR[("id_estudiante", "requerido")]
+        
+        if not estudiante.nombres:
+            codigos |= CODIGO_ERROR[("nombres", "requerido")]
+        elif not self._validar_solo_letras(estudiante.nombres):
+            codigos |= CODIGO_ERROR[("nombres", "solo_letras")]
+        
+        if not estudiante.apellidos:
+            codigos |= CODIGO_ERROR[("apellidos", "requerido")]
+        elif not self._validar_solo_letras(estudiante.apellidos):
+            codigos |= CODIGO_ERROR[("apellidos", "solo_letras")]
+        
+        if not estudiante.correo:
+            codigos |= CODIGO_ERROR[("correo", "requerido")]
+        elif not self._validar_correo(estudiante.correo):
+            codigos |= CODIGO_ERROR[("correo", "formato")]
+        
+        if not estudiante.semestre:
+            codigos |= CODIGO_ERROR[("semestre", "requerido")]
+        
+        # 2. Validar valores permitidos según el diccionario de datos
+        for campo, valores_permitidos in VALORES_PERMITIDOS.items():
+            valor = getattr(estudiante, campo, None)
+            if valor is not None and valor not in valores_permitidos:
+                codigos |= CODIGO_ERROR[(campo, "no_permitido")]
+        
+        # 3. Validar fechas
+        for campo in CAMPOS_FECHA:
+            valor = getattr(estudiante, campo, None)
+            if valor and not fechas[campo].es_valida(valor):
+                codigos |= CODIGO_ERROR[(campo, "fecha")]
+        
+        # 4. Verificar duplicados
+        if estudiante.id_estudiante in ids_procesados:
+            codigos |= CODIGO_ERROR[("id_estudiante", "duplicado")]
+        
+        if estudiante.correo and estudiante.correo in correos_procesados:
+            codigos |= CODIGO_ERROR[("correo", "duplicado")]
+        
+        # Registrar IDs y correos de los registros válidos
+        if not codigos:
+            if estudiante.id_estudiante:
+                ids_procesados.add(estudiante.id_estudiante)
+            if estudiante.correo:
+                correos_procesados.add(estudiante.correo)
+        
+        return codigos
+    
+    def _calcular_codigos_lote(
+        self,
+        estudiantes: List[EstudianteModel],
+        ids_procesados: Set[str],
+        correos_procesados: Set[str],
+        fechas: Dict[str, ColumnaFechas]
+    ) -> List[int]:
+        """
+        Calcula los códigos de error de muchos estudiantes a la vez, por columnas.
+        
+        Da el mismo resultado que aplicar _calcular_codigos_error a cada
+        estudiante en orden (incluida la actualización de los conjuntos de IDs
+        y correos), pero las expresiones regulares, los valores permitidos y
+        los duplicados se resuelven con pandas y cada fecha distinta se valida
+        una sola vez.
+        """
+        if len(estudiantes) < MIN_FILAS_VECTORIZADO:
+            return [
+                self._calcular_codigos_error(estudiante, ids_procesados, correos_procesados, fechas)
+                for estudiante in estudiantes
+            ]
+        
+        columnas = extraer_columnas(estudiantes)
+        codigos = self._calcular_codigos_columnas(columnas, fechas, codificadas=True)
+        codigos = self._marcar_duplicados(
+            codigos, columnas["id_estudiante"], columnas["correo"], ids_procesados, correos_procesados
+        )
+        return codigos.tolist()
+    
+    def _calcular_codigos_columnas(
+        self,
+        columnas: Dict[str, list],
+        fechas: Dict[str, ColumnaFechas],
+        codificadas: bool = False
+    ) -> np.ndarray:
+        """
+        Aplica por columnas todas las reglas salvo la de duplicados.
+        
+        Con `codificadas` los campos categóricos vienen como los códigos que
+        guarda EstudianteModel (ver extraer_columnas); si no, vienen como texto.
+        """
+        # pandas se importa en la primera validación por columnas, no al arrancar
+        import pandas as pd
+        
+        total = len(columnas["id_estudiante"])
+        codigos = np.zeros(total, dtype=np.int64)
+        
+        def marcar(mascara, campo: str, tipo: str):
+            codigos[np.asarray(mascara, dtype=bool)] |= CODIGO_ERROR[(campo, tipo)]
+        
+        def marcar_por_valor(campo: str, tipo: str, es_error):
+            # Los campos categóricos se evalúan una vez por valor distinto
+            posiciones, distintos = pd.factorize(pd.Series(columnas[campo], dtype=object))
+            if codificadas:
+                distintos = [getattr(EstudianteModel, campo).decodificar(codigo) for codigo in distintos]
+            errores = np.array([es_error(valor) for valor in distintos] + [es_error(None)], dtype=bool)
+            # Los nulos reciben la posición -1, que apunta al None agregado al final
+            marcar(errores[posiciones], campo, tipo)
+        
+        texto = {campo: pd.Series(columnas[campo], dtype=object) for campo in CAMPOS_TEXTO}
+        vacios = {campo: (serie.isna() | (serie == "")).to_numpy() for campo, serie in texto.items()}
+        
+        # 1. Validar campos requeridos
+        marcar(vacios["id_estudiante"], "id_estudiante", "requerido")
+        for campo in ["nombres", "apellidos"]:
+            marcar(vacios[campo], campo, "requerido")
+            # Los nombres se repiten mucho: la expresión regular se aplica a cada valor distinto
+            posiciones, distintos = pd.factorize(texto[campo])
+            letras = np.append(pd.Series(distintos, dtype=object).str.match(PATRON_SOLO_LETRAS, na=False).to_numpy(dtype=bool), True)
+            marcar(~vacios[campo] & ~letras[posiciones], campo, "solo_letras")
+        marcar(vacios["correo"], "correo", "requerido")
+        marcar(~vacios["correo"] & ~texto["correo"].str.match(PATRON_CORREO, na=False).to_numpy(dtype=bool), "correo", "formato")
+        marcar_por_valor("semestre", "requerido", lambda valor: not valor)
+        
+        # 2. Validar valores permitidos según el diccionario de datos
+        for campo, valores_permitidos in VALORES_PERMITIDOS.items():
+            marcar_por_valor(campo, "no_permitido", lambda valor: valor is not None and valor not in valores_permitidos)
+        
+        # 3. Validar fechas
+        for campo in CAMPOS_FECHA:
+            columna = fechas[campo]
+            marcar_por_valor(campo, "fecha", lambda valor: bool(valor) and not columna.es_valida(valor))
+        
+        return codigos
+    
+    def _marcar_duplicados(
+        self,
+        codigos: np.ndarray,
+        ids: List[Optional[str]],
+        correos: List[Optional[str]],
+        ids_procesados: Set[str],
+        correos_procesados: Set[str]
+    ) -> np.ndarray:
+        """
+        Agrega los errores de ID y correo duplicados a códigos ya calculados.
+        
+        Conserva la semántica de la validación por filas: un valor es duplicado
+        si un registro válido anterior ya lo usó. Los conjuntos de IDs y correos
+        procesados se consultan y se actualizan con los registros válidos.
+        """
+        import pandas as pd
+        
+        total = len(codigos)
+        # Los conjuntos procesados crecen con toda la carga: se consultan fila por
+        # fila en lugar de convertirlos para isin, que costaría su tamaño en cada lote
+        previo_id = np.fromiter((valor in ids_procesados for valor in ids), dtype=bool, count=total)
+        previo_correo = np.fromiter((valor in correos_procesados for valor in correos), dtype=bool, count=total)
+        ids = pd.Series(ids, dtype=object)
+        correos = pd.Series(correos, dtype=object)
+        tiene_correo = (correos.notna() & (correos != "")).to_numpy()
+        previo_correo &= tiene_correo
+        
+        # Candidatos a válidos: sin errores y sin choque con registros de lotes anteriores
+        validos = (codigos == 0) & ~previo_id & ~previo_correo
+        
+        # Los candidatos que no comparten ID ni correo con otro candidato son válidos;
+        # los que sí comparten se resuelven en orden, como en la validación por filas
+        conflicto = np.zeros(total, dtype=bool)
+        conflicto[validos] = (
+            ids[validos].duplicated(keep=False).to_numpy()
+            | correos[validos].duplicated(keep=False).to_numpy()
+        )
+        vistos_id = set()
+        vistos_correo = set()
+        for posicion in np.flatnonzero(conflicto):
+            id_estudiante = ids.iat[posicion]
+            correo = correos.iat[posicion]
+            if id_estudiante in vistos_id or correo in vistos_correo:
+                validos[posicion] = False
+            else:
+                vistos_id.add(id_estudiante)
+                vistos_correo.add(correo)
+        
+        # Un ID (o correo) es duplicado si un registro válido anterior ya lo usó
+        posiciones = np.arange(total)
+        primera_id = pd.Series(posiciones[validos], index=ids[validos].to_numpy())
+        primera_correo = pd.Series(posiciones[validos], index=correos[validos].to_numpy())
+        duplicado_id = previo_id | (ids.map(primera_id).to_numpy(dtype=float, na_value=np.inf) < posiciones)
+        duplicado_correo = previo_correo | (tiene_correo & (correos.map(primera_correo).to_numpy(dtype=float, na_value=np.inf) < posiciones))
+        codigos[duplicado_id] |= CODIGO_ERROR[("id_estudiante", "duplicado")]
+        codigos[duplicado_correo] |= CODIGO_ERROR[("correo", "duplicado")]
+        
+        # Registrar IDs y correos de los registros válidos
+        ids_procesados.update(ids[validos])
+        correos_procesados.update(correos[validos])
+        
+        return codigos
+    
+    def _copiar_errores_por_campo(self) -> Dict[str, Dict[str, int]]:
+        """
+        Copia los totales de errores que el almacén mantiene durante la carga.
+        """
+        return {campo: dict(errores) for campo, errores in self.store.errores_por_campo.items()}
     
     def _agregar_error_campo(self, errores_por_campo: Dict[str, Dict[str, int]], campo: str, error: str) -> None:
         """
@@ -248,9 +1048,7 @@ class EstudianteService:
         if not texto:
             return False
         
-        # Expresión regular que permite letras (incluyendo acentuadas), espacios y algunos caracteres especiales
-        patron = r'^[a-zA-ZáéíóúÁÉÍÓÚüÜñÑ\s\'\-\.]+$'
-        return bool(re.match(patron, texto))
+        return bool(re.match(PATRON_SOLO_LETRAS, texto))
     
     def _validar_correo(self, correo: str) -> bool:
         """
@@ -259,33 +1057,29 @@ class EstudianteService:
         if not correo:
             return False
         
-        # Expresión regular para validar correos electrónicos
-        patron = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return bool(re.match(patron, correo))
+        return bool(re.match(PATRON_CORREO, correo))
     
-    def _validar_fecha(self, fecha_str: str) -> bool:
+    def _inferir_formatos_fecha(self, fechas: Dict[str, ColumnaFechas]) -> None:
         """
-        Valida que un texto tenga formato de fecha válido.
+        Fija el formato dominante de cada columna de fecha con lo visto hasta ahora.
         """
-        if not fecha_str:
-            return False
-        
-        # Intentar varios formatos de fecha comunes
-        formatos = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%Y/%m/%d']
-        
-        for formato in formatos:
-            try:
-                datetime.strptime(fecha_str, formato)
-                return True
-            except ValueError:
-                continue
-        
-        return False
+        for columna in fechas.values():
+            columna.inferir_formato()
     
     def get_estudiantes_validos(self) -> List[EstudianteModel]:
         """
         Obtiene solo los estudiantes que pasan todas las validaciones.
         """
+        if self.store.validado_en_carga:
+            cache = EstudianteService._cache_validos
+            if cache is not None and cache[0] == self.store.version:
+                CONSULTAS_CACHE.incrementar("validos", "acierto")
+            else:
+                CONSULTAS_CACHE.incrementar("validos", "fallo")
+                validos = [estudiante for estudiante in self.store.get_all_estudiantes() if estudiante.es_valido]
+                cache = EstudianteService._cache_validos = (self.store.version, validos)
+            return cache[1]
+        
         resultado = self.validate_estudiantes()
         return resultado["estudiantes_validos"]
     
@@ -293,10 +1087,108 @@ class EstudianteService:
         """
         Obtiene un resumen de la validación sin incluir los datos completos.
         """
+        if self.store.validado_en_carga:
+            # Los totales se mantienen durante la carga, no hace falta recorrer los datos
+            validos = self.store.total_validos
+            invalidos = self.store.total_invalidos
+            return {
+                "total_registros": validos + invalidos,
+                "registros_validos": validos,
+                "registros_invalidos": invalidos,
+                "errores_por_campo": self._copiar_errores_por_campo()
+            }
+        
         resultado = self.validate_estudiantes()
         
         # Excluir los datos completos para hacer el resumen más ligero
-        del resultado["estudiantes_validos"]
-        del resultado["detalle_invalidos"]
+        return {
+            clave: valor for clave, valor in resultado.items()
+            if clave not in ("estudiantes_validos", "detalle_invalidos")
+        }
+    
+    def get_agregados(self, por: List[str]) -> Dict[str, Any]:
+        """
+        Cuenta los estudiantes por cada combinación de valores de los campos `por`.
         
-        return resultado
+        Cada grupo separa las filas válidas, las inválidas y las que no se
+        validaron en la carga (con `validar=false` todas quedan sin validar). Los
+        conteos salen de los contadores del almacén, sin recorrer las filas.
+        """
+        desconocidos = [campo for campo in por if campo not in CAMPOS_AGREGABLES]
+        if desconocidos:
+            raise HTTPException(
+                status_code=400,
+                detail=f"No se puede agrupar por {', '.join(desconocidos)}. Campos permitidos: {', '.join(CAMPOS_AGREGABLES)}"
+            )
+        if len(set(por)) != len(por):
+            raise HTTPException(status_code=400, detail="Los campos de agrupación no se pueden repetir")
+        
+        grupos = [
+            {
+                "valores": dict(zip(por, grupo)),
+                "validos": validos,
+                "invalidos": invalidos,
+                "sin_validar": sin_validar,
+                "total": validos + invalidos + sin_validar
+            }
+            for grupo, (validos, invalidos, sin_validar) in self.store.contar_por(por).items()
+        ]
+        grupos.sort(key=lambda grupo: grupo["total"], reverse=True)
+        return {
+            "por": por,
+            "total_registros": sum(grupo["total"] for grupo in grupos),
+            "grupos": grupos
+        }
+    
+    def buscar_estudiantes(self, consulta: str, limite: int, difusa: bool = True) -> Dict[str, Any]:
+        """
+        Busca estudiantes por nombres, apellidos o correo, sin distinguir tildes ni mayúsculas.
+        
+        Cada palabra de la consulta debe coincidir con el comienzo de una palabra
+        de la fila (o del correo); con `difusa` también cuentan las palabras de
+        nombres y apellidos parecidas, con menos puntaje. Los resultados salen del
+        índice del almacén (ver app/busqueda.py), de mayor a menor puntaje.
+        """
+        if not palabras_consulta(consulta):
+            raise HTTPException(status_code=400, detail="La búsqueda debe tener al menos una letra o número")
+        
+        indice = self.store.indice_busqueda()
+        estudiantes = self.store.get_all_estudiantes()
+        coincidencias, total = indice.buscar(consulta, limite, difusa)
+        return {
+            "consulta": consulta,
+            "total": total,
+            "resultados": [
+                {"puntaje": round(puntaje, 4), "estudiante": estudiantes[fila]}
+                for fila, puntaje in coincidencias
+            ]
+        }
+    
+    def paginar(
+        self,
+        estudiantes: List[EstudianteModel],
+        limit: Optional[int] = None,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[EstudianteModel], Optional[str]]:
+        """
+        Devuelve una página de estudiantes y el cursor de la página siguiente.
+        
+        El cursor tiene prioridad sobre `offset`. Sin `limit` se devuelve todo
+        desde la posición indicada. Si los datos cambiaron desde que se generó
+        el cursor se responde con 409.
+        """
+        if cursor is not None:
+            decodificado = decodificar_cursor(cursor)
+            if decodificado is None:
+                raise HTTPException(status_code=400, detail="Cursor inválido")
+            version, offset = decodificado
+            if version != self.store.etiqueta:
+                raise HTTPException(status_code=409, detail="Los datos cambiaron desde que se generó el cursor")
+        
+        if limit is None:
+            return estudiantes[offset:], None
+        
+        fin = offset + limit
+        siguiente = codificar_cursor(self.store.etiqueta, fin) if fin < len(estudiantes) else None
+        return estudiantes[offset:fin], siguiente
\ No newline at end of file
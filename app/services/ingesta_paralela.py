@@ -0,0 +1,120 @@
+# ingesta_paralela.py
+"""
+Responsabilidad: Carga de archivos CSV grandes usando varios procesos.
+
+El archivo se divide en fragmentos que terminan en un salto de línea y cada
+proceso del pool lee su fragmento con mmap, lo parsea y aplica las reglas de
+validación que no dependen de otras filas. La detección de duplicados y la
+creación de los modelos se hacen después, en orden, en el proceso principal.
+"""
+import csv
+import io
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+# Tamaño objetivo de cada fragmento que procesa un worker
+TAMANO_FRAGMENTO = 8 * 1024 * 1024
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def obtener_pool() -> ProcessPoolExecutor:
+    """
+    Devuelve el pool de procesos compartido, creándolo en el primer uso.
+
+    Se usa "spawn" para no heredar hilos ni locks del servidor al crear los
+    workers. Si un worker murió, el pool queda inutilizable y se crea otro.
+    """
+    global _pool
+    if _pool is None or getattr(_pool, "_broken", False):
+        _pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count() or 1,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+def leer_encabezados(ruta: str) -> Tuple[List[str], int]:
+    """
+    Lee la primera línea del archivo y devuelve los encabezados y el byte
+    donde empiezan los datos.
+    """
+    with open(ruta, "rb") as archivo:
+        primera_linea = archivo.readline()
+    if not primera_linea:
+        return [], 0
+    encabezados = next(csv.reader([primera_linea.decode("utf-8")]), [])
+    return encabezados, len(primera_linea)
+
+def dividir_en_fragmentos(ruta: str, inicio: int, tamano: int = TAMANO_FRAGMENTO) -> List[Tuple[int, int]]:
+    """
+    Divide el archivo desde `inicio` en rangos de bytes que terminan en un salto de línea.
+
+    Un salto de línea solo es un corte válido si hay un número par de comillas
+    antes de él dentro del fragmento; si no, está dentro de un campo citado
+    (RFC 4180) y se busca el siguiente.
+    """
+    fragmentos = []
+    with open(ruta, "rb") as archivo:
+        fin_archivo = os.fstat(archivo.fileno()).st_size
+        if fin_archivo <= inicio:
+            return fragmentos
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            while inicio < fin_archivo:
+                corte = min(inicio + tamano, fin_archivo)
+                comillas = datos[inicio:corte].count(b'"')
+                while corte < fin_archivo:
+                    salto = datos.find(b"\n", corte)
+                    if salto == -1:
+                        comillas += datos[corte:fin_archivo].count(b'"')
+                        corte = fin_archivo
+                        break
+                    comillas += datos[corte:salto + 1].count(b'"')
+                    corte = salto + 1
+                    if comillas % 2 == 0:
+                        break
+                fragmentos.append((inicio, corte))
+                inicio = corte
+    return fragmentos
+
+def procesar_fragmento(
+    ruta: str,
+    inicio: int,
+    fin: int,
+    encabezados: List[str],
+    campos: List[str],
+    validar: bool
+) -> Tuple[Dict[str, list], Optional[list]]:
+    """
+    Parsea un fragmento del archivo en columnas y, si se pide, calcula sus
+    códigos de error sin la regla de duplicados.
+
+    Las filas son las mismas que produciría csv.DictReader: se omiten las
+    líneas vacías y los campos que faltan quedan en None.
+    """
+    # Importación diferida: este módulo lo importa estudiante_service
+    from app.services.estudiante_service import EstudianteService, columnas_fechas
+
+    with open(ruta, "rb") as archivo:
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            texto = datos[inicio:fin].decode("utf-8")
+
+    # Si un encabezado se repite, DictReader se queda con la última columna
+    indices = {encabezado: posicion for posicion, encabezado in enumerate(encabezados)}
+    posiciones = [indices[campo] for campo in campos]
+    columnas = {campo: [] for campo in campos}
+    destinos = [(posicion, columnas[campo].append) for campo, posicion in zip(campos, posiciones)]
+
+    for fila in csv.reader(io.StringIO(texto)):
+        if not fila:
+            continue
+        largo = len(fila)
+        for posicion, agregar in destinos:
+            agregar(fila[posicion] if posicion < largo else None)
+
+    if not validar:
+        return columnas, None
+
+    codigos = EstudianteService()._calcular_codigos_columnas(columnas, columnas_fechas())
+    return columnas, codigos.tolist()
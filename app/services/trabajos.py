@@ -0,0 +1,228 @@
+# trabajos.py
+"""
+Responsabilidad: Seguimiento de las cargas de CSV que se ejecutan en segundo plano.
+
+Cada carga en segundo plano tiene un TrabajoCarga con su estado y su avance;
+RegistroTrabajos los guarda en memoria para consultarlos por id.
+
+La carga se ejecuta en el worker que recibió el archivo, pero con varios
+workers de uvicorn la consulta del estado puede llegar a cualquiera. Por eso
+cada trabajo publica su estado en un archivo JSON de DIRECTORIO_TRABAJOS y los
+demás workers lo leen de ahí. Si el worker que ejecutaba la carga muere, su
+archivo queda con el último estado publicado.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Cantidad de trabajos que se recuerdan; los más antiguos ya terminados se descartan
+MAX_TRABAJOS = 100
+
+# Directorio compartido por los workers con el estado de cada trabajo; vacío lo deja solo en memoria
+DIRECTORIO_TRABAJOS = os.getenv("ESTUDIANTES_TRABAJOS", os.path.join("data", "trabajos"))
+
+# Segundos mínimos entre dos publicaciones del avance de un trabajo en curso
+INTERVALO_PUBLICACION = 0.5
+
+# Los ids son uuid4 en hexadecimal: cualquier otro texto no es un nombre de archivo válido
+_PATRON_ID = re.compile(r"[0-9a-f]{32}")
+
+# Campos del estado que se publican; el resto (la tarea de asyncio) es propio del proceso
+_CAMPOS_PUBLICADOS = [
+    "id", "filename", "estado", "bytes_totales", "bytes_procesados", "filas_procesadas",
+    "inicio", "fin", "resultado", "error", "codigo_error",
+]
+
+class TrabajoCarga:
+    """
+    Estado y avance de una carga de CSV.
+
+    El avance se mide en bytes leídos del archivo, que se conocen desde el
+    principio; con eso se estima el tiempo restante. Los tiempos son de reloj
+    (time.time) para que otro worker pueda calcular la duración.
+    """
+    def __init__(self, filename: str, bytes_totales: int):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.estado = "pendiente"
+        self.bytes_totales = bytes_totales
+        self.bytes_procesados = 0
+        self.filas_procesadas = 0
+        self.inicio: Optional[float] = None
+        self.fin: Optional[float] = None
+        self.resultado: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.codigo_error: Optional[int] = None
+        # Tarea de asyncio que ejecuta la carga; se guarda para que no se pierda la referencia
+        self.tarea: Optional[asyncio.Task] = None
+        # Directorio donde se publica el estado (None: solo en memoria) y cuándo se publicó
+        self.directorio: Optional[str] = None
+        self._publicado = 0.0
+
+    @property
+    def terminado(self) -> bool:
+        return self.estado in ("completado", "error")
+
+    def iniciar(self) -> None:
+        self.estado = "procesando"
+        self.inicio = time.time()
+        self.publicar()
+
+    def avanzar(self, filas: int, bytes_procesados: int) -> None:
+        self.filas_procesadas += filas
+        self.bytes_procesados = bytes_procesados
+        if time.monotonic() - self._publicado >= INTERVALO_PUBLICACION:
+            self.publicar()
+
+    def guardando(self) -> None:
+        # Las filas ya están construidas; falta reemplazar el almacén y persistirlo
+        self.estado = "guardando"
+        self.bytes_procesados = self.bytes_totales
+        self.publicar()
+
+    def completar(self, resultado: Dict[str, Any]) -> None:
+        self.estado = "completado"
+        self.resultado = resultado
+        self.fin = time.time()
+        self.publicar()
+
+    def fallar(self, codigo_error: int, error: str) -> None:
+        self.estado = "error"
+        self.codigo_error = codigo_error
+        self.error = error
+        self.fin = time.time()
+        self.publicar()
+
+    def publicar(self) -> None:
+        """
+        Escribe el estado en `directorio` para los demás workers.
+
+        El archivo se reemplaza de una vez: un lector nunca ve uno a medio escribir.
+        Un error al escribirlo no afecta la carga, solo deja el estado sin publicar.
+        """
+        self._publicado = time.monotonic()
+        if not self.directorio:
+            return
+        estado = {campo: getattr(self, campo) for campo in _CAMPOS_PUBLICADOS}
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", dir=self.directorio, suffix=".tmp", delete=False, encoding="utf-8"
+            ) as temporal:
+                json.dump(estado, temporal)
+            os.replace(temporal.name, os.path.join(self.directorio, self.id + ".json"))
+        except OSError as e:
+            logger.warning(f"No se pudo publicar el estado del trabajo {self.id}: {e}")
+
+    @classmethod
+    def leer(cls, directorio: str, trabajo_id: str) -> Optional["TrabajoCarga"]:
+        """
+        Estado publicado de un trabajo (de este u otro worker), o None si no existe.
+        """
+        if not _PATRON_ID.fullmatch(trabajo_id):
+            return None
+        try:
+            with open(os.path.join(directorio, trabajo_id + ".json"), encoding="utf-8") as archivo:
+                estado = json.load(archivo)
+        except (OSError, ValueError):
+            return None
+        trabajo = cls(estado["filename"], estado["bytes_totales"])
+        for campo in _CAMPOS_PUBLICADOS:
+            setattr(trabajo, campo, estado[campo])
+        return trabajo
+
+    def resumen(self) -> Dict[str, Any]:
+        """
+        Estado del trabajo con filas por segundo y tiempo restante estimado.
+        """
+        transcurrido = None
+        if self.inicio is not None:
+            transcurrido = (self.fin if self.fin is not None else time.time()) - self.inicio
+
+        progreso = self.bytes_procesados / self.bytes_totales if self.bytes_totales else 0.0
+        if self.terminado:
+            progreso = 1.0
+
+        filas_por_segundo = None
+        if transcurrido:
+            filas_por_segundo = round(self.filas_procesadas / transcurrido, 1)
+
+        eta_segundos = None
+        if self.terminado:
+            eta_segundos = 0.0
+        elif transcurrido and progreso > 0:
+            eta_segundos = round(transcurrido * (1 - progreso) / progreso, 1)
+
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "estado": self.estado,
+            "filas_procesadas": self.filas_procesadas,
+            "progreso": round(progreso, 4),
+            "filas_por_segundo": filas_por_segundo,
+            "eta_segundos": eta_segundos,
+            "duracion_segundos": round(transcurrido, 3) if transcurrido is not None else None,
+            "resultado": self.resultado,
+            "error": self.error,
+            "codigo_error": self.codigo_error,
+        }
+
+class RegistroTrabajos:
+    """
+    Trabajos de carga de este proceso, del más antiguo al más reciente, más los
+    publicados por los demás workers en `directorio`.
+    """
+    _trabajos: "OrderedDict[str, TrabajoCarga]" = OrderedDict()
+    directorio: Optional[str] = DIRECTORIO_TRABAJOS or None
+
+    @classmethod
+    def crear(cls, filename: str, bytes_totales: int) -> TrabajoCarga:
+        trabajo = TrabajoCarga(filename, bytes_totales)
+        trabajo.directorio = cls.directorio
+        cls._trabajos[trabajo.id] = trabajo
+        trabajo.publicar()
+        # Descartar los trabajos terminados más antiguos si se supera el máximo
+        for trabajo_id in list(cls._trabajos):
+            if len(cls._trabajos) <= MAX_TRABAJOS:
+                break
+            if cls._trabajos[trabajo_id].terminado:
+                del cls._trabajos[trabajo_id]
+        cls._podar_directorio()
+        return trabajo
+
+    @classmethod
+    def obtener(cls, trabajo_id: str) -> Optional[TrabajoCarga]:
+        trabajo = cls._trabajos.get(trabajo_id)
+        if trabajo is None and cls.directorio:
+            # Quizás lo ejecuta (o lo ejecutó) otro worker
+            trabajo = TrabajoCarga.leer(cls.directorio, trabajo_id)
+        return trabajo
+
+    @classmethod
+    def _podar_directorio(cls) -> None:
+        # Conserva los MAX_TRABAJOS archivos modificados más recientemente; los
+        # trabajos en curso publican su avance, así que no quedan entre los viejos
+        if not cls.directorio:
+            return
+        try:
+            with os.scandir(cls.directorio) as entradas:
+                archivos = [
+                    (entrada.stat().st_mtime, entrada.path) for entrada in entradas if entrada.name.endswith(".json")
+                ]
+        except OSError:
+            return
+        archivos.sort(reverse=True)
+        for _, ruta in archivos[MAX_TRABAJOS:]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
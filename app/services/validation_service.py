@@ -1,19 +1,33 @@
-from typing import Dict, Any, List, Optional, Union, Type
-from pydantic import BaseModel, ValidationError
-import sys
-import os
+from typing import Annotated, Dict, Any, List, Optional, Union, Type
+from pydantic import BaseModel, TypeAdapter, ValidationError, WrapValidator
 
-# Añadir el directorio raíz al path para importar schemas
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from schemas.base_schemas import EstudianteBase, ServicioPermanenciaBase
-from schemas.povau_schemas import POVAUCreate, POVAUUpdate
-from schemas.poa_schemas import POACreate, POAUpdate
-from schemas.pops_schemas import POPSCreate, POPSUpdate
-from schemas.comedor_schemas import ComedorCreate, ComedorUpdate, RegistroBeneficioCreate, RegistroBeneficioUpdate
+from app.schemas.base_schemas import EstudianteBase, ServicioPermanenciaBase
+from app.schemas.povau_schemas import POVAUCreate, POVAUUpdate
+from app.schemas.poa_schemas import POACreate, POAUpdate
+from app.schemas.pops_schemas import POPSCreate, POPSUpdate
+from app.schemas.comedor_schemas import ComedorCreate, ComedorUpdate, RegistroBeneficioCreate, RegistroBeneficioUpdate
+
+class _FilaInvalida:
+    """Errores de una fila que no pasó la validación dentro de validate_many."""
+    __slots__ = ("errores",)
+    
+    def __init__(self, errores: List[str]):
+        self.errores = errores
+
+def _capturar_errores(valor: Any, handler) -> Any:
+    # Los errores de la fila se guardan en su lugar para que la lista siga validándose
+    try:
+        return handler(valor)
+    except ValidationError as e:
+        # Solo se guardan los mensajes: los errores retienen la excepción de cada validador
+        return _FilaInvalida([ValidationService._mensaje_error(error["loc"], error["msg"]) for error in e.errors()])
 
 class ValidationService:
     """Servicio para validar datos antes de enviarlos a la base de datos."""
     
+    # Adaptadores de listas por esquema; construir uno compila el validador
+    _adaptadores: Dict[Type[BaseModel], TypeAdapter] = {}
+    
     @staticmethod
     def validate_data(data: Dict[str, Any], schema_class: Type[BaseModel]) -> Dict[str, Any]:
         """
@@ -36,14 +50,73 @@ class ValidationService:
             return schema_instance.dict()
         except ValidationError as e:
             # Capturar errores de validación y lanzar una excepción con mensaje claro
-            error_messages = []
-            for error in e.errors():
-                field = error["loc"][0]
-                message = error["msg"]
-                error_messages.append(f"Error en campo '{field}': {message}")
-            
+            error_messages = [ValidationService._mensaje_error(error["loc"], error["msg"]) for error in e.errors()]
             raise ValueError("\n".join(error_messages))
     
+    @staticmethod
+    def _mensaje_error(loc: tuple, message: str) -> str:
+        field = loc[0] if loc else "registro"
+        return f"Error en campo '{field}': {message}"
+    
+    @classmethod
+    def _adaptador(cls, schema_class: Type[BaseModel]) -> TypeAdapter:
+        adaptador = cls._adaptadores.get(schema_class)
+        if adaptador is None:
+            adaptador = cls._adaptadores[schema_class] = TypeAdapter(
+                List[Annotated[schema_class, WrapValidator(_capturar_errores)]]
+            )
+        return adaptador
+    
+    @classmethod
+    def validate_many(
+        cls,
+        records: List[Dict[str, Any]],
+        schema_class: Type[BaseModel],
+        particionar: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Valida una lista de registros con el esquema proporcionado, sin lanzar excepciones.
+        
+        Toda la lista se valida en una sola llamada a pydantic; los errores de
+        cada fila se capturan sin interrumpir la validación de las demás.
+        
+        Args:
+            records: Lista de diccionarios con los datos a validar
+            schema_class: Clase del esquema Pydantic a utilizar
+            particionar: Si es verdadero, separa los registros en válidos e inválidos
+            
+        Returns:
+            Diccionario con "errores" (mensajes por índice de fila) y, según
+            `particionar`:
+            - False: "resultados", con los datos validados de cada fila o None si falló
+            - True: "validos", con los datos validados, e "invalidos", con los
+              registros originales que fallaron
+        """
+        adaptador = cls._adaptador(schema_class)
+        filas = adaptador.validate_python(records)
+        
+        errores: Dict[int, List[str]] = {}
+        instancias = []
+        for indice, fila in enumerate(filas):
+            if isinstance(fila, _FilaInvalida):
+                errores[indice] = fila.errores
+            else:
+                instancias.append(fila)
+        validados = adaptador.dump_python(instancias)
+        
+        if particionar:
+            return {
+                "validos": validados,
+                "invalidos": [records[indice] for indice in sorted(errores)],
+                "errores": errores,
+            }
+        
+        datos_validados = iter(validados)
+        return {
+            "resultados": [None if indice in errores else next(datos_validados) for indice in range(len(records))],
+            "errores": errores,
+        }
+    
     @staticmethod
     def validate_estudiante(data: Dict[str, Any]) -> Dict[str, Any]:
         """Valida datos de estudiante."""
@@ -124,5 +197,3 @@ class ValidationService:
         value = data[field]
         query = db_session.query(model).filter(getattr(model, field) == value).first()
         return query is None
-
-print("Servicio de validacion cargado correctamente")
\ No newline at end of file
@@ -0,0 +1,218 @@
+# snapshot.py
+"""
+Responsabilidad: Copia binaria del almacén de estudiantes para arrancar rápido.
+
+Después de cada carga se escribe un archivo con las columnas codificadas con
+diccionario y los veredictos de validación. Al arrancar, el archivo se abre con
+mmap y solo se lee su encabezado; las filas se construyen la primera vez que se
+necesitan.
+
+Formato del archivo:
+    MAGIA (8 bytes) | largo del encabezado (uint32) | encabezado JSON | arreglos
+
+El encabezado guarda los totales de validación y, para cada arreglo, su
+posición, tipo y largo. Cada columna se guarda como un diccionario de textos
+(bytes UTF-8 + posiciones) y un arreglo int32 con el código de cada fila
+(-1 para None).
+
+Con varios workers de uvicorn el snapshot también es el medio para compartir
+los datos: el worker que recibe la carga lo publica y los demás lo abren con
+mmap (las páginas del archivo se comparten entre procesos). Las columnas del
+archivo no se comparten como filas: cada worker construye sus propios
+EstudianteModel (del orden de 1 s cada 100.000 filas) en un hilo del executor,
+mientras sigue respondiendo con el contenido anterior, y los adopta de una vez
+al terminar (ver EstudianteStore.sincronizar). Al arrancar no hay contenido
+anterior: las filas se construyen la primera vez que una consulta las
+necesita, y las que solo usan los totales del encabezado no las construyen.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.estudiante import CAMPOS_ESTUDIANTE, EstudianteModel, crear_estudiantes
+
+# Ruta del archivo de snapshot; una cadena vacía lo desactiva
+RUTA_SNAPSHOT = os.getenv("ESTUDIANTES_SNAPSHOT", os.path.join("data", "estudiantes.snapshot"))
+
+MAGIA = b"ESTSNAP1"
+_LARGO_ENCABEZADO = struct.Struct("<I")
+
+# Los arreglos empiezan en múltiplos de 8 bytes para poder leerlos sin copiarlos
+_ALINEACION = 8
+
+def _codificar_columna(valores: List[Optional[str]]):
+    codigos_por_valor: Dict[str, int] = {}
+    codigos = np.fromiter(
+        (-1 if valor is None else codigos_por_valor.setdefault(valor, len(codigos_por_valor)) for valor in valores),
+        dtype=np.int32,
+        count=len(valores)
+    )
+    textos = [valor.encode("utf-8") for valor in codigos_por_valor]
+    posiciones = np.zeros(len(textos) + 1, dtype=np.int64)
+    np.cumsum([len(texto) for texto in textos], out=posiciones[1:])
+    return codigos, posiciones, b"".join(textos)
+
+def guardar_snapshot(
+    ruta: str,
+    estudiantes: List[EstudianteModel],
+    totales: Dict[str, Any],
+    generacion: Optional[int] = None
+) -> Optional[Tuple[int, int]]:
+    """
+    Escribe el snapshot de `estudiantes` en `ruta` y devuelve su identidad.
+
+    Se escribe primero a un archivo temporal propio, en el mismo directorio, que
+    luego reemplaza al anterior: nunca queda a medio escribir un snapshot que se
+    pueda abrir, y dos escrituras simultáneas (otro worker u otra carga) no se
+    mezclan; queda publicada la última en reemplazar. La identidad se toma del
+    archivo temporal, así no se confunde con la de un snapshot que otro proceso
+    publique justo después.
+    """
+    arreglos = []
+    for campo in CAMPOS_ESTUDIANTE:
+        codigos, posiciones, textos = _codificar_columna([getattr(estudiante, campo) for estudiante in estudiantes])
+        arreglos += [(campo + ".codigos", codigos), (campo + ".posiciones", posiciones), (campo + ".textos", textos)]
+    validos = np.fromiter(
+        (-1 if estudiante.es_valido is None else int(estudiante.es_valido) for estudiante in estudiantes),
+        dtype=np.int8,
+        count=len(estudiantes)
+    )
+    codigos_error = np.fromiter(
+        (estudiante.codigos_error for estudiante in estudiantes), dtype=np.int64, count=len(estudiantes)
+    )
+    arreglos += [("valido", validos), ("codigos_error", codigos_error)]
+
+    # Posición de cada arreglo relativa al inicio de la zona de datos
+    descripcion = {}
+    posicion = 0
+    for nombre, arreglo in arreglos:
+        posicion += -posicion % _ALINEACION
+        if isinstance(arreglo, bytes):
+            descripcion[nombre] = {"posicion": posicion, "tipo": "bytes", "largo": len(arreglo)}
+            posicion += len(arreglo)
+        else:
+            descripcion[nombre] = {"posicion": posicion, "tipo": arreglo.dtype.str, "largo": len(arreglo)}
+            posicion += arreglo.nbytes
+
+    encabezado = json.dumps({
+        "filas": len(estudiantes),
+        "generacion": generacion,
+        "totales": totales,
+        "arreglos": descripcion,
+    }, ensure_ascii=False).encode("utf-8")
+    inicio_datos = len(MAGIA) + _LARGO_ENCABEZADO.size + len(encabezado)
+    relleno_inicial = -inicio_datos % _ALINEACION
+
+    directorio = os.path.dirname(ruta)
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+    archivo = tempfile.NamedTemporaryFile(
+        "wb", dir=directorio or ".", prefix=os.path.basename(ruta) + ".", suffix=".tmp", delete=False
+    )
+    temporal = archivo.name
+    try:
+        with archivo:
+            archivo.write(MAGIA)
+            archivo.write(_LARGO_ENCABEZADO.pack(len(encabezado) + relleno_inicial))
+            archivo.write(encabezado)
+            archivo.write(b" " * relleno_inicial)
+            escrito = 0
+            for nombre, arreglo in arreglos:
+                relleno = descripcion[nombre]["posicion"] - escrito
+                archivo.write(b"\0" * relleno)
+                datos = arreglo if isinstance(arreglo, bytes) else arreglo.tobytes()
+                archivo.write(datos)
+                escrito += relleno + len(datos)
+        identidad = identidad_archivo(temporal)
+        os.replace(temporal, ruta)
+        return identidad
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+def identidad_archivo(archivo) -> Optional[Tuple[int, int]]:
+    """
+    Identifica la versión publicada de un snapshot (ruta o descriptor abierto).
+
+    Cada snapshot nuevo reemplaza al anterior con os.replace, así que cambia de
+    inodo: comparar la identidad basta para saber si otro proceso publicó otro.
+    Devuelve None si el archivo no existe.
+    """
+    try:
+        estado = os.fstat(archivo) if isinstance(archivo, int) else os.stat(archivo)
+    except OSError:
+        return None
+    return estado.st_ino, estado.st_mtime_ns
+
+class Snapshot:
+    """
+    Snapshot abierto con mmap. Los arreglos se leen sin copiarlos del archivo.
+    """
+    def __init__(self, ruta: str):
+        with open(ruta, "rb") as archivo:
+            self.identidad = identidad_archivo(archivo.fileno())
+            self._datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._datos[:len(MAGIA)] != MAGIA:
+                raise ValueError(f"{ruta} no es un snapshot de estudiantes")
+            largo, = _LARGO_ENCABEZADO.unpack_from(self._datos, len(MAGIA))
+            inicio = len(MAGIA) + _LARGO_ENCABEZADO.size
+            encabezado = json.loads(self._datos[inicio:inicio + largo])
+        except BaseException:
+            self._datos.close()
+            raise
+        self._inicio_datos = inicio + largo
+        self._arreglos = encabezado["arreglos"]
+        self.filas: int = encabezado["filas"]
+        self.tamano: int = len(self._datos)
+        self.generacion: Optional[int] = encabezado["generacion"]
+        self.totales: Dict[str, Any] = encabezado["totales"]
+
+    @classmethod
+    def abrir(cls, ruta: str) -> Optional["Snapshot"]:
+        """
+        Abre el snapshot de `ruta`; devuelve None si no existe o no se puede leer.
+        """
+        try:
+            return cls(ruta)
+        except (OSError, ValueError, KeyError, struct.error):
+            return None
+
+    def _arreglo(self, nombre: str):
+        descripcion = self._arreglos[nombre]
+        inicio = self._inicio_datos + descripcion["posicion"]
+        if descripcion["tipo"] == "bytes":
+            return self._datos[inicio:inicio + descripcion["largo"]]
+        return np.frombuffer(self._datos, dtype=descripcion["tipo"], count=descripcion["largo"], offset=inicio)
+
+    def columna(self, campo: str) -> List[Optional[str]]:
+        """
+        Decodifica una columna completa. Cada texto distinto se decodifica una sola vez.
+        """
+        posiciones = self._arreglo(campo + ".posiciones").tolist()
+        textos = self._arreglo(campo + ".textos")
+        # El código -1 (None) toma el último elemento del diccionario
+        diccionario = [textos[inicio:fin].decode("utf-8") for inicio, fin in zip(posiciones, posiciones[1:])]
+        diccionario.append(None)
+        return [diccionario[codigo] for codigo in self._arreglo(campo + ".codigos").tolist()]
+
+    def estudiantes(self) -> List[EstudianteModel]:
+        """
+        Construye los estudiantes del snapshot con sus veredictos.
+        """
+        estudiantes = crear_estudiantes({campo: self.columna(campo) for campo in CAMPOS_ESTUDIANTE})
+        validos = self._arreglo("valido").tolist()
+        codigos_error = self._arreglo("codigos_error").tolist()
+        for estudiante, valido, codigos in zip(estudiantes, validos, codigos_error):
+            if valido != -1:
+                estudiante.asignar_veredicto(codigos)
+        return estudiantes
+
+    def cerrar(self) -> None:
+        self._datos.close()
@@ -1,10 +1,25 @@
+import asyncio
+import codecs
 import csv
 import io
-from typing import List, Dict, Any
+from collections import deque
+from functools import partial
+from itertools import chain
+from typing import List, Dict, Any, AsyncIterator, BinaryIO, Iterable, Iterator
 import logging
+import time
+
+from fastapi import UploadFile
 
 logger = logging.getLogger(__name__)
 
+# Tamaño de cada lectura del archivo subido y número de filas por lote
+TAMANO_BLOQUE = 1024 * 1024
+TAMANO_LOTE = 1000
+
+# Tamaño aproximado de cada fragmento enviado al exportar un CSV
+TAMANO_BLOQUE_EXPORTACION = 64 * 1024
+
 def parse_csv(file_content: bytes) -> List[Dict[str, Any]]:
     """
     Parsea el contenido de un archivo CSV y devuelve una lista de diccionarios.
@@ -30,6 +45,220 @@ def parse_csv(file_content: bytes) -> List[Dict[str, Any]]:
         logger.error(f"Error al parsear el CSV: {str(e)}")
         raise ValueError(f"Error al parsear el CSV: {str(e)}")
 
+class _FaltanLineas(Exception):
+    """El registro en curso continúa en un bloque que aún no se ha leído."""
+
+class _LineasPendientes:
+    """
+    Iterador de líneas que alimenta al lector CSV a medida que llegan los bloques.
+    
+    Si el lector pide una línea que todavía no se ha leído, se lanza _FaltanLineas
+    y las líneas del registro incompleto se devuelven a la cola para reintentarlo
+    cuando llegue el siguiente bloque.
+    """
+    def __init__(self):
+        self.lineas = deque()
+        self.consumidas = []
+        self.final = False
+    
+    def __iter__(self):
+        return self
+    
+    def __next__(self) -> str:
+        if not self.lineas:
+            if self.final:
+                raise StopIteration
+            raise _FaltanLineas()
+        linea = self.lineas.popleft()
+        self.consumidas.append(linea)
+        return linea
+    
+    def extraer_filas(self, lector) -> List[List[str]]:
+        filas = []
+        while self.lineas:
+            self.consumidas = []
+            try:
+                filas.append(next(lector))
+            except _FaltanLineas:
+                self.lineas.extendleft(reversed(self.consumidas))
+                break
+            except StopIteration:
+                break
+        return filas
+
+def _dividir_lineas(texto: str) -> List[str]:
+    # Igual que al iterar un StringIO: solo '\n' termina una línea
+    lineas = texto.split('\n')
+    ultima = lineas.pop()
+    lineas = [linea + '\n' for linea in lineas]
+    if ultima:
+        lineas.append(ultima)
+    return lineas
+
+class _LectorPorBloques:
+    """
+    Parser incremental: recibe el archivo por bloques de bytes y devuelve los
+    registros completos, con el mismo comportamiento que csv.DictReader.
+    """
+    def __init__(self):
+        self.decodificador = codecs.getincrementaldecoder('utf-8')()
+        self.pendientes = _LineasPendientes()
+        self.lector = csv.reader(self.pendientes)
+        self.encabezados = None
+        self.resto = ''
+        # Tiempo acumulado de decodificar el texto y de separar los registros
+        self.segundos_decodificacion = 0.0
+        self.segundos_parseo = 0.0
+    
+    @property
+    def terminado(self) -> bool:
+        return self.pendientes.final
+    
+    def agregar(self, bloque: bytes) -> List[Dict[str, Any]]:
+        """
+        Procesa un bloque; un bloque vacío indica el final del archivo.
+        """
+        inicio = time.perf_counter()
+        texto = self.resto + self.decodificador.decode(bloque, final=not bloque)
+        decodificado = time.perf_counter()
+        self.segundos_decodificacion += decodificado - inicio
+        
+        # Solo se entregan líneas completas; la última puede seguir en el próximo bloque
+        if bloque:
+            corte = texto.rfind('\n') + 1
+            texto, self.resto = texto[:corte], texto[corte:]
+        else:
+            self.pendientes.final = True
+        
+        if texto:
+            self.pendientes.lineas.extend(_dividir_lineas(texto))
+        
+        registros = []
+        for fila in self.pendientes.extraer_filas(self.lector):
+            # Mismo comportamiento que csv.DictReader
+            if self.encabezados is None:
+                self.encabezados = fila
+                continue
+            if not fila:
+                continue
+            registro = dict(zip(self.encabezados, fila))
+            if len(fila) > len(self.encabezados):
+                registro[None] = fila[len(self.encabezados):]
+            else:
+                for encabezado in self.encabezados[len(fila):]:
+                    registro[encabezado] = None
+            registros.append(registro)
+        self.segundos_parseo += time.perf_counter() - decodificado
+        return registros
+
+def _sumar_tiempos(lector: _LectorPorBloques, tiempos) -> None:
+    if tiempos is not None:
+        tiempos.sumar("decodificar", lector.segundos_decodificacion)
+        tiempos.sumar("parsear", lector.segundos_parseo)
+
+def _lotes_por_bloques(
+    bloques: Iterable[bytes],
+    tamano_lote: int = TAMANO_LOTE,
+    tiempos=None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Parsea los bloques de bytes de un archivo CSV y entrega sus filas en lotes de diccionarios.
+    
+    Si se pasa `tiempos` (TiemposIngesta), al terminar se le suman los segundos
+    de decodificación y de parseo.
+    """
+    lector = _LectorPorBloques()
+    lote = []
+    total = 0
+    
+    try:
+        # El bloque vacío del final le indica al lector que el archivo terminó
+        for bloque in chain(bloques, [b""]):
+            lote.extend(lector.agregar(bloque))
+            while len(lote) >= tamano_lote:
+                total += tamano_lote
+                yield lote[:tamano_lote]
+                lote = lote[tamano_lote:]
+        
+        if lote:
+            total += len(lote)
+            yield lote
+        
+        _sumar_tiempos(lector, tiempos)
+        logger.info(f"CSV leído por bloques correctamente. {total} filas encontradas.")
+    
+    except Exception as e:
+        logger.error(f"Error al parsear el CSV: {str(e)}")
+        raise ValueError(f"Error al parsear el CSV: {str(e)}")
+
+def _bloques(archivo: BinaryIO, tamano_bloque: int) -> Iterator[bytes]:
+    return iter(partial(archivo.read, tamano_bloque), b"")
+
+async def iter_csv_upload(
+    file: UploadFile,
+    tamano_bloque: int = TAMANO_BLOQUE,
+    tamano_lote: int = TAMANO_LOTE,
+    tiempos=None
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Lee un archivo CSV subido por bloques y entrega sus filas en lotes de diccionarios.
+    
+    El contenido se decodifica de forma incremental, de modo que en memoria solo
+    hay un bloque del archivo y un lote de filas a la vez. Las filas son las mismas
+    que devolvería parse_csv sobre el archivo completo.
+    
+    Los bloques se leen del archivo temporal donde ya quedó la subida (en memoria
+    o en disco local). Si se pasa `tiempos` (TiemposIngesta), al terminar se le
+    suman los segundos de decodificación y de parseo.
+    """
+    for lote in _lotes_por_bloques(_bloques(file.file, tamano_bloque), tamano_lote, tiempos):
+        yield lote
+        # Entre lotes se cede el event loop a las demás peticiones
+        await asyncio.sleep(0)
+
+def iter_csv_archivo(
+    archivo: BinaryIO,
+    tamano_bloque: int = TAMANO_BLOQUE,
+    tamano_lote: int = TAMANO_LOTE,
+    tiempos=None
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Versión sincrónica de iter_csv_upload para un archivo abierto en modo binario.
+    
+    Permite parsear fuera del event loop, por ejemplo en un hilo del executor.
+    """
+    return _lotes_por_bloques(_bloques(archivo, tamano_bloque), tamano_lote, tiempos)
+
+def iter_csv_export(
+    registros: Iterable[Any],
+    encabezados: List[str],
+    tamano_bloque: int = TAMANO_BLOQUE_EXPORTACION
+) -> Iterator[str]:
+    """
+    Genera un CSV por fragmentos a partir de objetos con un atributo por encabezado.
+    
+    Los encabezados se entregan de inmediato y luego se emiten fragmentos de
+    aproximadamente `tamano_bloque` caracteres, con los valores citados según
+    las reglas de csv.writer. La memoria usada no depende del número de registros.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    
+    writer.writerow(encabezados)
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    
+    for registro in registros:
+        writer.writerow([getattr(registro, encabezado) for encabezado in encabezados])
+        if buffer.tell() >= tamano_bloque:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
 def validate_csv_headers(headers: List[str], expected_headers: List[str]) -> bool:
     """
     Valida que los encabezados del CSV coincidan con los esperados.
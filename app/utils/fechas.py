@@ -0,0 +1,119 @@
+# fechas.py
+"""
+Responsabilidad: Validación y normalización de fechas de una columna del CSV.
+
+Las fechas se repiten mucho (una cohorte comparte la misma fecha de ingreso),
+así que cada texto distinto se analiza una sola vez y el resultado se guarda.
+El formato dominante de la columna se infiere de una muestra y se prueba primero.
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+# Formatos de fecha aceptados, en el orden en que se prueban por defecto
+FORMATOS_FECHA = ['%d/%m/%Y', '%Y-%m-%d', '%d-%m-%Y', '%m/%d/%Y', '%Y/%m/%d']
+
+# Cantidad de valores distintos que se usan para inferir el formato dominante
+TAMANO_MUESTRA = 100
+
+# Límite de valores guardados; datos sin repetición no deben crecer sin control
+MAX_VALORES_CACHE = 100_000
+
+class ColumnaFechas:
+    """
+    Fechas de una columna: formato dominante inferido y resultados memorizados.
+
+    Una fecha es válida si algún formato de FORMATOS_FECHA la reconoce, sin
+    importar el orden; el orden solo decide cómo se interpreta una fecha ambigua
+    (por ejemplo 02/03/2023) al normalizarla.
+    """
+    def __init__(self, formatos: Optional[List[str]] = None):
+        self.formatos_base = list(formatos or FORMATOS_FECHA)
+        self.reiniciar()
+
+    def reiniciar(self) -> None:
+        """
+        Olvida el formato inferido y los valores memorizados (por ejemplo, al cargar otro archivo).
+        """
+        self.formatos = list(self.formatos_base)
+        self.formato_dominante: Optional[str] = None
+        self._fechas: Dict[str, Optional[date]] = {}
+        self._conteo_formatos = {formato: 0 for formato in self.formatos_base}
+        self._muestras = 0
+
+    def parsear(self, valor: str) -> Optional[date]:
+        """
+        Devuelve la fecha representada por el texto, o None si ningún formato la reconoce.
+        """
+        try:
+            return self._fechas[valor]
+        except KeyError:
+            pass
+
+        if self.formato_dominante is None:
+            fecha = self._muestrear(valor)
+        else:
+            fecha = self._parsear_con(self.formatos, valor)
+
+        if len(self._fechas) >= MAX_VALORES_CACHE:
+            self._fechas.clear()
+        self._fechas[valor] = fecha
+        return fecha
+
+    def es_valida(self, valor: str) -> bool:
+        """
+        Indica si el texto es una fecha válida en alguno de los formatos aceptados.
+        """
+        if not valor:
+            return False
+        return self.parsear(valor) is not None
+
+    def normalizar(self, valor: str) -> Optional[str]:
+        """
+        Devuelve la fecha en formato YYYY-MM-DD, o None si no es válida.
+        """
+        if not valor:
+            return None
+        fecha = self.parsear(valor)
+        return fecha.isoformat() if fecha is not None else None
+
+    def _parsear_con(self, formatos: List[str], valor: str) -> Optional[date]:
+        for formato in formatos:
+            try:
+                return datetime.strptime(valor, formato).date()
+            except ValueError:
+                continue
+        return None
+
+    def _muestrear(self, valor: str) -> Optional[date]:
+        # Durante la muestra se prueban todos los formatos para contar cuáles encajan
+        fecha = None
+        for formato in self.formatos_base:
+            try:
+                reconocida = datetime.strptime(valor, formato).date()
+            except ValueError:
+                continue
+            self._conteo_formatos[formato] += 1
+            if fecha is None:
+                fecha = reconocida
+
+        self._muestras += 1
+        if self._muestras >= TAMANO_MUESTRA:
+            self.inferir_formato()
+        return fecha
+
+    def inferir_formato(self) -> Optional[str]:
+        """
+        Fija como dominante el formato que más valores de la muestra reconoció.
+
+        Se llama sola al completar TAMANO_MUESTRA valores distintos; también
+        puede llamarse antes, por ejemplo al terminar el primer lote de una carga.
+        """
+        if self.formato_dominante is not None or not self._muestras:
+            return self.formato_dominante
+        # En caso de empate se respeta el orden original de los formatos
+        dominante = max(self.formatos_base, key=lambda formato: self._conteo_formatos[formato])
+        self.formato_dominante = dominante
+        self.formatos = [dominante] + [formato for formato in self.formatos_base if formato != dominante]
+        # Las fechas ambiguas ya memorizadas pudieron interpretarse con otro orden
+        self._fechas.clear()
+        return dominante
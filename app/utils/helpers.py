@@ -6,4 +6,46 @@ Validaciones personalizadas (por ejemplo: correo válido, unicidad de ID).
 
 Logging, manejo de errores, funciones reutilizables.
 
-"""
\ No newline at end of file
+"""
+import base64
+from typing import Optional, Tuple
+
+def codificar_cursor(version: str, posicion: int) -> str:
+    """
+    Codifica una posición de paginación como un cursor opaco.
+    
+    El cursor incluye la versión de los datos (EstudianteStore.etiqueta) para
+    detectar si cambiaron entre páginas.
+    """
+    texto = f"{version}:{posicion}".encode("ascii")
+    return base64.urlsafe_b64encode(texto).decode("ascii").rstrip("=")
+
+def decodificar_cursor(cursor: str) -> Optional[Tuple[str, int]]:
+    """
+    Decodifica un cursor generado por codificar_cursor.
+    
+    Devuelve (versión, posición) o None si el cursor no es válido.
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        texto = base64.urlsafe_b64decode(cursor + relleno).decode("ascii")
+        version, posicion = texto.rsplit(":", 1)
+        posicion = int(posicion)
+    except (ValueError, UnicodeDecodeError):
+        return None
+    if posicion < 0:
+        return None
+    return version, posicion
+
+def etag_coincide(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Indica si el encabezado If-None-Match incluye `etag`.
+    
+    La comparación es débil (se ignora el prefijo W/) y "*" coincide con cualquiera.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    propio = etag.removeprefix("W/")
+    return any(candidato.strip().removeprefix("W/") == propio for candidato in if_none_match.split(","))
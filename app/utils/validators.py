@@ -118,5 +118,3 @@ def validate_unique_in_database(value: Any, field: str, model, db_session) -> bo
     """Valida que un valor sea único en la base de datos."""
     query = db_session.query(model).filter(getattr(model, field) == value).first()
     return query is None
-
-print("Modulo de validacion cargado correctamente")
\ No newline at end of file
@@ -0,0 +1,115 @@
+# arranque.py
+"""
+Responsabilidad: Medir cuánto tarda y cuánta memoria ocupa importar la aplicación.
+
+Cada repetición importa el módulo en un intérprete nuevo, así que se mide un
+arranque en frío (con los .pyc ya compilados). Se informa la mediana del tiempo
+de importación, la memoria residente al terminar, los módulos pesados que se
+cargaron y los módulos del repositorio cargados dos veces con nombres distintos.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.arranque [--modulo app.main] [--repeticiones 5] [--detalle] [--salida arranque.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Dependencias que no deberían cargarse al arrancar si la ruta que las usa no se ejecutó
+MODULOS_PESADOS = ["pandas", "numpy", "multiprocessing", "sqlite3", "email_validator"]
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Se ejecuta en el intérprete nuevo; imprime una línea JSON con las mediciones
+_MEDICION = """
+import json, os, resource, sys, time
+inicio = time.perf_counter()
+import {modulo}
+segundos = time.perf_counter() - inicio
+
+rss_kb = None
+try:
+    with open("/proc/self/statm") as statm:
+        rss_kb = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+except OSError:
+    pass
+maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+# ru_maxrss está en KB en Linux y en bytes en macOS
+maximo_kb = maximo // 1024 if sys.platform == "darwin" else maximo
+
+nombres_por_archivo = {{}}
+for nombre, modulo in list(sys.modules.items()):
+    archivo = getattr(modulo, "__file__", None)
+    if archivo and os.path.abspath(archivo).startswith({raiz!r}):
+        nombres_por_archivo.setdefault(os.path.abspath(archivo), []).append(nombre)
+
+print(json.dumps({{
+    "segundos": segundos,
+    "rss_kb": rss_kb,
+    "rss_maximo_kb": maximo_kb,
+    "modulos": len(sys.modules),
+    "pesados": [nombre for nombre in {pesados!r} if nombre in sys.modules],
+    "duplicados": [sorted(nombres) for nombres in nombres_por_archivo.values() if len(nombres) > 1],
+}}))
+"""
+
+def medir_arranque(modulo: str, detalle: bool = False) -> dict:
+    """
+    Importa `modulo` en un intérprete nuevo y devuelve sus mediciones.
+
+    Con `detalle` también devuelve los módulos que más tardaron según -X importtime.
+    """
+    codigo = _MEDICION.format(modulo=modulo, raiz=RAIZ, pesados=MODULOS_PESADOS)
+    comando = [sys.executable] + (["-X", "importtime"] if detalle else []) + ["-c", codigo]
+    proceso = subprocess.run(comando, cwd=RAIZ, capture_output=True, text=True, check=True)
+    medicion = json.loads(proceso.stdout.strip().splitlines()[-1])
+    if detalle:
+        medicion["importaciones_mas_lentas"] = _importaciones_mas_lentas(proceso.stderr)
+    return medicion
+
+def _importaciones_mas_lentas(salida: str, cantidad: int = 15) -> list:
+    # Formato de -X importtime: "import time: propio | acumulado | módulo"
+    tiempos = []
+    for linea in salida.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        _, acumulado, nombre = linea[len("import time:"):].split("|")
+        tiempos.append({"modulo": nombre.strip(), "acumulado_ms": int(acumulado) / 1000})
+    return sorted(tiempos, key=lambda tiempo: tiempo["acumulado_ms"], reverse=True)[:cantidad]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--modulo", default="app.main")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--detalle", action="store_true", help="incluir las importaciones más lentas")
+    parser.add_argument("--salida", help="archivo JSON donde guardar el resultado")
+    args = parser.parse_args()
+
+    # La primera importación compila los .pyc y no se cuenta
+    medir_arranque(args.modulo)
+    mediciones = [medir_arranque(args.modulo) for _ in range(args.repeticiones)]
+    resultado = {
+        "modulo": args.modulo,
+        "python": sys.version.split()[0],
+        "repeticiones": args.repeticiones,
+        "segundos_mediana": round(statistics.median(medicion["segundos"] for medicion in mediciones), 4),
+        "segundos_min": round(min(medicion["segundos"] for medicion in mediciones), 4),
+        "rss_mb": round(statistics.median(medicion["rss_kb"] or medicion["rss_maximo_kb"] for medicion in mediciones) / 1024, 1),
+        "modulos_cargados": mediciones[-1]["modulos"],
+        "modulos_pesados": mediciones[-1]["pesados"],
+        "modulos_duplicados": mediciones[-1]["duplicados"],
+    }
+    if args.detalle:
+        resultado["importaciones_mas_lentas"] = medir_arranque(args.modulo, detalle=True)["importaciones_mas_lentas"]
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    print(texto)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            archivo.write(texto + "\n")
+    return 1 if resultado["modulos_duplicados"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+# carga_concurrente.py
+"""
+Responsabilidad: Medir la API bajo clientes concurrentes, sin servidor ni infraestructura externa.
+
+Se carga un CSV sintético (ver datos_sinteticos.py) y luego varios clientes
+llaman a app.main:app a través de un cliente ASGI en el mismo proceso durante
+un tiempo fijo. Cada cliente elige el endpoint según una mezcla de pesos:
+    estudiante   GET /api/estudiantes/{id} con un ID al azar
+    validados    GET /api/estudiantes/validados paginado
+    resumen      GET /api/estudiantes/resumen-validacion
+    descargar    GET /api/estudiantes/descargar-csv completo
+    carga        POST /api/estudiantes/upload-csv (combinando o reemplazando)
+
+Por endpoint se informan las peticiones por segundo, la latencia p50/p95/p99 y
+máxima, y los códigos de estado. Una tarea aparte duerme intervalos cortos y
+mide cuánto se retrasa al despertar: ese retraso es el tiempo en que el bucle
+de eventos estuvo bloqueado. Repetir con varios niveles de concurrencia
+muestra dónde deja de escalar la API.
+
+El almacén trabaja solo en memoria (sin SQLite ni snapshot).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.carga_concurrente [--concurrencia 1 8 32] [--duracion 10] [--filas 100000]
+        [--mezcla estudiante=60,validados=15,resumen=15,descargar=5,carga=5] [--salida resultado.json]
+"""
+import os
+
+# Antes de importar la aplicación: sin persistencia en disco
+os.environ["ESTUDIANTES_DB"] = ""
+os.environ["ESTUDIANTES_SNAPSHOT"] = ""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+from app.main import app
+from benchmarks.datos_sinteticos import agregar_argumentos, generar_csv, parametros_generacion
+
+ENDPOINTS = ["estudiante", "validados", "resumen", "descargar", "carga"]
+
+MEZCLA_POR_DEFECTO = "estudiante=60,validados=15,resumen=15,descargar=5,carga=5"
+
+# Intervalo con que la sonda despierta para medir el retraso del bucle de eventos
+INTERVALO_SONDA = 0.01
+
+def leer_mezcla(texto: str) -> Dict[str, float]:
+    """
+    Convierte "estudiante=60,carga=5" en pesos por endpoint.
+    """
+    mezcla = {}
+    for parte in texto.split(","):
+        nombre, _, peso = parte.partition("=")
+        nombre = nombre.strip()
+        if nombre not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Endpoint desconocido '{nombre}'. Opciones: {', '.join(ENDPOINTS)}")
+        try:
+            mezcla[nombre] = float(peso)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Peso inválido para '{nombre}': '{peso}'")
+    if not any(peso > 0 for peso in mezcla.values()):
+        raise argparse.ArgumentTypeError("La mezcla necesita al menos un peso positivo")
+    return mezcla
+
+def percentil(ordenados: List[float], p: float) -> float:
+    """Percentil por rango más cercano de una lista ya ordenada."""
+    if not ordenados:
+        return 0.0
+    posicion = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[posicion]
+
+def resumir_latencias(latencias: List[float], segundos: float) -> Dict[str, float]:
+    """Peticiones por segundo y percentiles (en milisegundos) de una lista de latencias."""
+    ordenadas = sorted(latencias)
+    return {
+        "peticiones": len(ordenadas),
+        "peticiones_por_segundo": round(len(ordenadas) / segundos, 1) if segundos else 0.0,
+        "p50_ms": round(percentil(ordenadas, 50) * 1000, 2),
+        "p95_ms": round(percentil(ordenadas, 95) * 1000, 2),
+        "p99_ms": round(percentil(ordenadas, 99) * 1000, 2),
+        "max_ms": round(ordenadas[-1] * 1000, 2) if ordenadas else 0.0,
+    }
+
+class Escenario:
+    """
+    Construye las peticiones de cada endpoint a partir de los datos cargados.
+    """
+    def __init__(self, filas: int, contenido_carga: bytes, modo_carga: str, tamano_pagina: int):
+        self.filas = filas
+        self.contenido_carga = contenido_carga
+        self.modo_carga = modo_carga
+        self.tamano_pagina = tamano_pagina
+
+    async def ejecutar(self, cliente: httpx.AsyncClient, endpoint: str, rng: random.Random) -> httpx.Response:
+        if endpoint == "estudiante":
+            # Los IDs sintéticos son consecutivos desde 1_000_000
+            return await cliente.get(f"/api/estudiantes/{1_000_000 + rng.randrange(self.filas)}")
+        if endpoint == "validados":
+            offset = rng.randrange(max(1, self.filas - self.tamano_pagina))
+            return await cliente.get("/api/estudiantes/validados", params={"limit": self.tamano_pagina, "offset": offset})
+        if endpoint == "resumen":
+            return await cliente.get("/api/estudiantes/resumen-validacion")
+        if endpoint == "descargar":
+            return await cliente.get("/api/estudiantes/descargar-csv")
+        return await cliente.post(
+            "/api/estudiantes/upload-csv",
+            params={"combinar": self.modo_carga == "combinar"},
+            files={"file": ("carga.csv", self.contenido_carga, "text/csv")},
+        )
+
+async def _sonda_bucle(retrasos: List[float], fin: float) -> None:
+    # Cada despertar tardío es tiempo en que otra tarea retuvo el bucle de eventos
+    while time.perf_counter() < fin:
+        esperado = time.perf_counter() + INTERVALO_SONDA
+        await asyncio.sleep(INTERVALO_SONDA)
+        retrasos.append(max(0.0, time.perf_counter() - esperado))
+
+async def _cliente(
+    cliente: httpx.AsyncClient,
+    escenario: Escenario,
+    mezcla: Dict[str, float],
+    rng: random.Random,
+    fin: float,
+    latencias: Dict[str, List[float]],
+    estados: Dict[str, Dict[str, int]]
+) -> None:
+    nombres = list(mezcla)
+    pesos = list(mezcla.values())
+    while time.perf_counter() < fin:
+        endpoint = rng.choices(nombres, weights=pesos)[0]
+        inicio = time.perf_counter()
+        try:
+            respuesta = await escenario.ejecutar(cliente, endpoint, rng)
+            estado = str(respuesta.status_code)
+        except Exception as e:
+            estado = type(e).__name__
+        latencias[endpoint].append(time.perf_counter() - inicio)
+        estados[endpoint][estado] = estados[endpoint].get(estado, 0) + 1
+
+async def medir_concurrencia(
+    cliente: httpx.AsyncClient,
+    escenario: Escenario,
+    mezcla: Dict[str, float],
+    concurrencia: int,
+    duracion: float,
+    semilla: int
+) -> Dict[str, object]:
+    """
+    Ejecuta `concurrencia` clientes durante `duracion` segundos y resume las latencias.
+    """
+    latencias = {endpoint: [] for endpoint in mezcla}
+    estados = {endpoint: {} for endpoint in mezcla}
+    retrasos = []
+    inicio = time.perf_counter()
+    fin = inicio + duracion
+    await asyncio.gather(
+        _sonda_bucle(retrasos, fin),
+        *(
+            _cliente(cliente, escenario, mezcla, random.Random(semilla * 1000 + numero), fin, latencias, estados)
+            for numero in range(concurrencia)
+        )
+    )
+    # Las peticiones en curso al vencer el plazo alargan la ventana medida
+    segundos = time.perf_counter() - inicio
+    todas = [latencia for valores in latencias.values() for latencia in valores]
+    retrasos.sort()
+    return {
+        "concurrencia": concurrencia,
+        "segundos": round(segundos, 3),
+        "total": resumir_latencias(todas, segundos),
+        "endpoints": {
+            endpoint: {**resumir_latencias(latencias[endpoint], segundos), "estados": estados[endpoint]}
+            for endpoint in mezcla if latencias[endpoint]
+        },
+        "bucle_eventos": {
+            "retraso_p99_ms": round(percentil(retrasos, 99) * 1000, 2),
+            "retraso_max_ms": round(retrasos[-1] * 1000, 2) if retrasos else 0.0,
+            "bloqueado_total_s": round(sum(retrasos), 3),
+        },
+    }
+
+def _imprimir(resultado: Dict[str, object]) -> None:
+    bucle = resultado["bucle_eventos"]
+    print(
+        f"\nconcurrencia {resultado['concurrencia']}  ({resultado['segundos']} s)  "
+        f"bucle bloqueado {bucle['bloqueado_total_s']} s, retraso máximo {bucle['retraso_max_ms']} ms"
+    )
+    print(f"  {'endpoint':<12}{'peticiones':>11}{'pet/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'máx ms':>10}  estados")
+    filas = list(resultado["endpoints"].items()) + [("total", resultado["total"])]
+    for nombre, datos in filas:
+        estados = " ".join(f"{codigo}:{cantidad}" for codigo, cantidad in sorted(datos.get("estados", {}).items()))
+        print(
+            f"  {nombre:<12}{datos['peticiones']:>11}{datos['peticiones_por_segundo']:>9.1f}"
+            f"{datos['p50_ms']:>10.1f}{datos['p95_ms']:>10.1f}{datos['p99_ms']:>10.1f}{datos['max_ms']:>10.1f}  {estados}",
+            flush=True
+        )
+
+async def ejecutar(args: argparse.Namespace) -> Dict[str, object]:
+    parametros = parametros_generacion(args)
+    contenido = generar_csv(args.filas, **parametros)
+    # La carga concurrente reescribe los primeros IDs con otros valores
+    contenido_carga = generar_csv(args.filas_carga, **{**parametros, "semilla": parametros["semilla"] + 1})
+    escenario = Escenario(args.filas, contenido_carga, args.modo_carga, args.tamano_pagina)
+
+    resultados = []
+    transporte = httpx.ASGITransport(app=app)
+    # ASGITransport no ejecuta el lifespan de la aplicación
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transporte, base_url="http://carga", timeout=None) as cliente:
+            for concurrencia in args.concurrencia:
+                # Cada nivel parte de los mismos datos
+                respuesta = await cliente.post(
+                    "/api/estudiantes/upload-csv", files={"file": ("datos.csv", contenido, "text/csv")}
+                )
+                respuesta.raise_for_status()
+                resultado = await medir_concurrencia(
+                    cliente, escenario, args.mezcla, concurrencia, args.duracion, parametros["semilla"]
+                )
+                _imprimir(resultado)
+                resultados.append(resultado)
+
+    return {
+        "filas": args.filas,
+        "filas_carga": args.filas_carga,
+        "modo_carga": args.modo_carga,
+        "duracion": args.duracion,
+        "mezcla": args.mezcla,
+        "parametros": parametros,
+        "resultados": resultados,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--duracion", type=float, default=10.0, help="segundos por nivel de concurrencia")
+    parser.add_argument("--filas", type=int, default=100_000, help="filas cargadas antes de medir")
+    parser.add_argument("--filas-carga", type=int, default=5_000, help="filas de cada carga concurrente")
+    parser.add_argument("--modo-carga", choices=["combinar", "reemplazar"], default="combinar")
+    parser.add_argument("--tamano-pagina", type=int, default=100, help="limit de GET /validados")
+    parser.add_argument("--mezcla", type=leer_mezcla, default=leer_mezcla(MEZCLA_POR_DEFECTO))
+    parser.add_argument("--salida", help="archivo JSON donde guardar el resultado")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    documento = asyncio.run(ejecutar(args))
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as archivo:
+            json.dump(documento, archivo, indent=2, ensure_ascii=False)
+        print(f"\nResultados guardados en {args.salida}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
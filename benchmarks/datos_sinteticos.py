@@ -0,0 +1,137 @@
+# datos_sinteticos.py
+"""
+Responsabilidad: Generar archivos CSV de estudiantes sintéticos para las pruebas de rendimiento.
+
+Los valores categóricos se toman de VALORES_PERMITIDOS y las fechas se escriben
+en formato YYYY-MM-DD. Una fracción configurable de filas se vuelve inválida
+(nombre con dígitos, correo mal formado, valor fuera del diccionario o campo
+requerido vacío), repite el ID o el correo de una fila anterior, o trae una
+fecha imposible. El resultado depende solo de los parámetros y la semilla.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.datos_sinteticos FILAS [--salida archivo.csv] [--tasa-invalidos 0.05] ...
+"""
+import argparse
+import csv
+import io
+import random
+import sys
+from datetime import date, timedelta
+
+from app.services.estudiante_service import EXPECTED_HEADERS, VALORES_PERMITIDOS
+
+NOMBRES = ["Juan", "María José", "Andrés", "Valentina", "Sofía", "Luis Ángel", "Camila", "José", "Daniela", "Nicolás"]
+APELLIDOS = ["Pérez", "Gómez", "Rodríguez", "Martínez", "Núñez", "De la Hoz", "Ospina", "Quintero", "Fernández", "Ruiz"]
+
+# Fechas imposibles en cualquiera de los formatos aceptados
+FECHAS_INVALIDAS = ["2023-02-30", "31/13/2023", "2023-00-10", "fecha"]
+
+CAMPOS_FECHA = ["fecha_ingreso_programa", "fecha_asignacion", "fecha_atencion", "fecha_solicitud"]
+
+# Valores categóricos válidos y no vacíos de cada campo
+_CATEGORICOS = {
+    campo: [valor for valor in valores if valor]
+    for campo, valores in VALORES_PERMITIDOS.items()
+}
+
+def _fila_valida(rng: random.Random, numero: int, fechas: list) -> dict:
+    id_estudiante = str(1_000_000 + numero)
+    fila = {
+        "id_estudiante": id_estudiante,
+        "nombres": rng.choice(NOMBRES),
+        "apellidos": f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}",
+        "correo": f"est{id_estudiante}@unicesar.edu.co",
+        "semestre": str(rng.randint(1, 10)),
+    }
+    for campo, valores in _CATEGORICOS.items():
+        fila[campo] = rng.choice(valores)
+    for campo in CAMPOS_FECHA:
+        fila[campo] = rng.choice(fechas)
+    return fila
+
+def _invalidar(rng: random.Random, fila: dict) -> None:
+    error = rng.randrange(5)
+    if error == 0:
+        fila["nombres"] += str(rng.randint(1, 9))
+    elif error == 1:
+        fila["correo"] = fila["correo"].replace("@", "")
+    elif error == 2:
+        fila[rng.choice(list(_CATEGORICOS))] = "Desconocido"
+    elif error == 3:
+        fila["id_estudiante"] = ""
+    else:
+        fila["semestre"] = ""
+
+def generar_filas(
+    filas: int,
+    tasa_invalidos: float = 0.05,
+    tasa_duplicados: float = 0.02,
+    tasa_fechas_invalidas: float = 0.02,
+    semilla: int = 1
+):
+    """
+    Genera `filas` diccionarios con las columnas de EXPECTED_HEADERS.
+    """
+    rng = random.Random(semilla)
+    inicio = date(2018, 1, 1)
+    # Pocas fechas distintas, como en los datos reales (una cohorte comparte fechas)
+    fechas = [(inicio + timedelta(days=rng.randrange(7 * 365))).isoformat() for _ in range(500)]
+    anteriores = []
+    for numero in range(filas):
+        fila = _fila_valida(rng, numero, fechas)
+        if anteriores and rng.random() < tasa_duplicados:
+            anterior = rng.choice(anteriores)
+            fila["id_estudiante"] = anterior["id_estudiante"]
+            if rng.random() < 0.5:
+                fila["correo"] = anterior["correo"]
+        if rng.random() < tasa_invalidos:
+            _invalidar(rng, fila)
+        if rng.random() < tasa_fechas_invalidas:
+            fila[rng.choice(CAMPOS_FECHA)] = rng.choice(FECHAS_INVALIDAS)
+        # Basta una muestra de filas anteriores para elegir duplicados
+        if len(anteriores) < 10_000:
+            anteriores.append(fila)
+        yield fila
+
+def generar_csv(filas: int, **parametros) -> bytes:
+    """
+    Devuelve un CSV completo en UTF-8 con `filas` estudiantes (ver generar_filas).
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPECTED_HEADERS, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(generar_filas(filas, **parametros))
+    return buffer.getvalue().encode("utf-8")
+
+def agregar_argumentos(parser: argparse.ArgumentParser) -> None:
+    """Opciones de generación compartidas por las pruebas de rendimiento."""
+    parser.add_argument("--tasa-invalidos", type=float, default=0.05)
+    parser.add_argument("--tasa-duplicados", type=float, default=0.02)
+    parser.add_argument("--tasa-fechas-invalidas", type=float, default=0.02)
+    parser.add_argument("--semilla", type=int, default=1)
+
+def parametros_generacion(args: argparse.Namespace) -> dict:
+    return {
+        "tasa_invalidos": args.tasa_invalidos,
+        "tasa_duplicados": args.tasa_duplicados,
+        "tasa_fechas_invalidas": args.tasa_fechas_invalidas,
+        "semilla": args.semilla,
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("filas", type=int)
+    parser.add_argument("--salida", help="archivo de salida (por defecto, la salida estándar)")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    contenido = generar_csv(args.filas, **parametros_generacion(args))
+    if args.salida:
+        with open(args.salida, "wb") as archivo:
+            archivo.write(contenido)
+    else:
+        sys.stdout.buffer.write(contenido)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
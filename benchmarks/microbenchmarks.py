@@ -0,0 +1,198 @@
+# microbenchmarks.py
+"""
+Responsabilidad: Medir las rutas críticas de carga, validación y exportación.
+
+Para cada tamaño de archivo se genera un CSV sintético (ver datos_sinteticos.py)
+y se mide:
+    parse_csv                       csv_handler.parse_csv sobre el archivo completo
+    carga_validada                  process_csv_file con validación durante la carga
+    carga_sin_validar               process_csv_file sin validación
+    validate_estudiantes            validación completa de datos cargados sin validar
+    resumen_validacion_en_carga     get_resumen_validacion con veredictos de la carga
+    resumen_validacion_sin_validar  get_resumen_validacion que valida todo
+    descargar_csv_limpio            estudiantes válidos exportados con iter_csv_export
+
+De cada medición se informa el mejor tiempo, las filas por segundo y el pico de
+memoria de Python (tracemalloc, en una ejecución aparte para no alterar el
+tiempo). Los resultados se guardan en JSON y se pueden comparar con una
+ejecución anterior.
+
+El almacén trabaja solo en memoria (sin SQLite ni snapshot).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.microbenchmarks [--filas 1000 100000 1000000] [--comparar anterior.json]
+"""
+import os
+
+# Antes de importar la aplicación: sin persistencia en disco
+os.environ["ESTUDIANTES_DB"] = ""
+os.environ["ESTUDIANTES_SNAPSHOT"] = ""
+
+import argparse
+import asyncio
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from fastapi import UploadFile
+
+from app.services.estudiante_service import EXPECTED_HEADERS, EstudianteService
+from app.utils.csv_handler import iter_csv_export, parse_csv
+from benchmarks.datos_sinteticos import agregar_argumentos, generar_csv, parametros_generacion
+
+DIRECTORIO_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados")
+
+# Repeticiones por tamaño: los archivos pequeños se miden varias veces
+def repeticiones_para(filas: int) -> int:
+    if filas <= 10_000:
+        return 5
+    if filas <= 200_000:
+        return 2
+    return 1
+
+class Medicion:
+    """
+    Una ruta medida: `preparar` deja el estado necesario y `ejecutar` es lo que se cronometra.
+    """
+    def __init__(self, nombre: str, ejecutar: Callable[[], object], preparar: Optional[Callable[[], None]] = None):
+        self.nombre = nombre
+        self.ejecutar = ejecutar
+        self.preparar = preparar or (lambda: None)
+
+    def medir(self, repeticiones: int, memoria: bool) -> Dict[str, float]:
+        mejor = float("inf")
+        for _ in range(repeticiones):
+            self.preparar()
+            inicio = time.perf_counter()
+            self.ejecutar()
+            mejor = min(mejor, time.perf_counter() - inicio)
+
+        resultado = {"segundos": mejor}
+        if memoria:
+            self.preparar()
+            tracemalloc.start()
+            try:
+                antes = tracemalloc.get_traced_memory()[0]
+                self.ejecutar()
+                resultado["pico_memoria_mb"] = (tracemalloc.get_traced_memory()[1] - antes) / 2**20
+            finally:
+                tracemalloc.stop()
+        return resultado
+
+def _subir(servicio: EstudianteService, contenido: bytes, validar: bool) -> None:
+    archivo = UploadFile(file=io.BytesIO(contenido), filename="benchmark.csv")
+    asyncio.run(servicio.process_csv_file(archivo, validar=validar))
+
+def _olvidar_validacion() -> None:
+    # Los resultados de validación se reutilizan mientras no cambie el almacén
+    EstudianteService._cache_validacion = None
+    EstudianteService._cache_validos = None
+
+def _exportar(servicio: EstudianteService) -> int:
+    return sum(len(fragmento) for fragmento in iter_csv_export(servicio.get_estudiantes_validos(), EXPECTED_HEADERS))
+
+def mediciones(contenido: bytes) -> List[Medicion]:
+    servicio = EstudianteService()
+    estado = {"validado": None}
+
+    def cargar(validar: bool) -> Callable[[], None]:
+        def preparar():
+            if estado["validado"] is not validar:
+                _subir(servicio, contenido, validar)
+                estado["validado"] = validar
+            _olvidar_validacion()
+        return preparar
+
+    def subir(validar: bool) -> Callable[[], None]:
+        def ejecutar():
+            _subir(servicio, contenido, validar)
+            estado["validado"] = validar
+        return ejecutar
+
+    return [
+        Medicion("parse_csv", lambda: parse_csv(contenido)),
+        Medicion("carga_validada", subir(True), _olvidar_validacion),
+        Medicion("carga_sin_validar", subir(False), _olvidar_validacion),
+        Medicion("validate_estudiantes", servicio.validate_estudiantes, cargar(False)),
+        Medicion("resumen_validacion_en_carga", servicio.get_resumen_validacion, cargar(True)),
+        Medicion("resumen_validacion_sin_validar", servicio.get_resumen_validacion, cargar(False)),
+        Medicion("descargar_csv_limpio", lambda: _exportar(servicio), cargar(True)),
+    ]
+
+def _entorno() -> Dict[str, object]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(DIRECTORIO_RESULTADOS)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+def _imprimir_comparacion(resultados: List[Dict], anterior: Dict) -> None:
+    previos = {(r["benchmark"], r["filas"]): r for r in anterior["resultados"]}
+    print(f"\nComparación con {anterior['entorno'].get('commit')} ({anterior['entorno'].get('fecha')}):")
+    for resultado in resultados:
+        previo = previos.get((resultado["benchmark"], resultado["filas"]))
+        if previo:
+            cambio = previo["segundos"] / resultado["segundos"] if resultado["segundos"] else float("inf")
+            print(f"  {resultado['benchmark']:<32}{resultado['filas']:>10,}  {cambio:6.2f}x {'más rápido' if cambio >= 1 else 'más lento'}")
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filas", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--solo", nargs="+", help="nombres de las mediciones a ejecutar")
+    parser.add_argument("--sin-memoria", action="store_true", help="no medir el pico de memoria")
+    parser.add_argument("--salida", help="archivo JSON de resultados (por defecto, en benchmarks/resultados/)")
+    parser.add_argument("--comparar", help="archivo JSON de una ejecución anterior")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    resultados = []
+    print(f"{'medición':<32}{'filas':>10}{'segundos':>11}{'filas/s':>14}{'pico MB':>10}")
+    for filas in args.filas:
+        contenido = generar_csv(filas, **parametros_generacion(args))
+        for medicion in mediciones(contenido):
+            if args.solo and medicion.nombre not in args.solo:
+                continue
+            resultado = medicion.medir(repeticiones_para(filas), memoria=not args.sin_memoria)
+            resultado = {
+                "benchmark": medicion.nombre,
+                "filas": filas,
+                "bytes": len(contenido),
+                "segundos": round(resultado["segundos"], 6),
+                "filas_por_segundo": round(filas / resultado["segundos"], 1) if resultado["segundos"] else None,
+                "pico_memoria_mb": round(resultado["pico_memoria_mb"], 2) if "pico_memoria_mb" in resultado else None,
+            }
+            resultados.append(resultado)
+            pico = f"{resultado['pico_memoria_mb']:10.1f}" if resultado["pico_memoria_mb"] is not None else f"{'-':>10}"
+            print(f"{medicion.nombre:<32}{filas:>10,}{resultado['segundos']:>11.4f}{resultado['filas_por_segundo'] or 0:>14,.0f}{pico}", flush=True)
+
+    salida = args.salida
+    if not salida:
+        os.makedirs(DIRECTORIO_RESULTADOS, exist_ok=True)
+        salida = os.path.join(DIRECTORIO_RESULTADOS, f"micro-{datetime.now():%Y%m%d-%H%M%S}.json")
+    documento = {"entorno": _entorno(), "parametros": parametros_generacion(args), "resultados": resultados}
+    with open(salida, "w", encoding="utf-8") as archivo:
+        json.dump(documento, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            _imprimir_comparacion(resultados, json.load(archivo))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+# validacion_esquemas.py
+"""
+Responsabilidad: Medir cuánto más rápido validan los esquemas de
+app/schemas/compiled_schemas.py que los esquemas con @validator.
+
+Usa los registros sintéticos de tests/test_esquemas.py, que mezclan valores
+válidos e inválidos para cada campo; la paridad entre ambos juegos de
+esquemas la comprueban esas pruebas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.validacion_esquemas [--registros N] [--semilla S]
+"""
+import argparse
+import random
+import sys
+import time
+from typing import Any, Dict, List, Type
+
+from pydantic import BaseModel
+
+from app.schemas import compiled_schemas
+from app.services.validation_service import ValidationService
+from tests.test_esquemas import ESQUEMAS, generar_registros
+
+def medir(esquema: Type[BaseModel], registros: List[Dict[str, Any]], repeticiones: int = 3) -> float:
+    """Mejor tiempo de ValidationService.validate_many sobre `registros`."""
+    ValidationService.validate_many(registros[:10], esquema)
+    mejor = float("inf")
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        ValidationService.validate_many(registros, esquema)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--registros", type=int, default=20000, help="registros por esquema")
+    parser.add_argument("--semilla", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semilla)
+    print(f"{'esquema':<26}{'aceptados':>10}{'original r/s':>15}{'compilado r/s':>15}{'aceleración':>13}")
+    for nombre, original in ESQUEMAS.items():
+        compilado = getattr(compiled_schemas, nombre)
+        # Mitad de registros casi limpios y mitad con muchos errores
+        registros = (
+            generar_registros(original, args.registros // 2, rng, 0.01)
+            + generar_registros(original, args.registros - args.registros // 2, rng, 0.2)
+        )
+        aceptados = len(ValidationService.validate_many(registros, compilado, particionar=True)["validos"])
+        tiempo_original = medir(original, registros)
+        tiempo_compilado = medir(compilado, registros)
+        print(
+            f"{nombre:<26}{aceptados:>10}{len(registros) / tiempo_original:>15,.0f}"
+            f"{len(registros) / tiempo_compilado:>15,.0f}{tiempo_original / tiempo_compilado:>12.1f}x"
+        )
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
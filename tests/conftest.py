@@ -0,0 +1,91 @@
+# conftest.py
+"""
+Responsabilidad: Configuración y fixtures compartidas por las pruebas.
+
+La aplicación se importa sin persistencia en disco (ESTUDIANTES_DB,
+ESTUDIANTES_SNAPSHOT y ESTUDIANTES_TRABAJOS vacías); las pruebas de persistencia conectan el almacén
+a archivos en un directorio temporal.
+"""
+import csv
+import io
+import os
+
+# Antes de importar la aplicación: sin persistencia en disco
+os.environ["ESTUDIANTES_DB"] = ""
+os.environ["ESTUDIANTES_SNAPSHOT"] = ""
+os.environ["ESTUDIANTES_TRABAJOS"] = ""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.estudiante_service import EXPECTED_HEADERS
+
+def fila_estudiante(numero: int, **valores) -> dict:
+    """Fila válida del CSV para el estudiante `numero`; `valores` reemplaza campos."""
+    fila = {
+        "id_estudiante": str(1000 + numero),
+        "nombres": "Ana",
+        "apellidos": "Pérez",
+        "correo": f"est{1000 + numero}@unicesar.edu.co",
+        "semestre": "3",
+        "tipo_vulnerabilidad": "Económica",
+        "riesgo_desercion": "Bajo",
+        "tipo_participante": "Nuevo",
+        "riesgo_spadies": "Bajo",
+        "fecha_ingreso_programa": "2023-02-01",
+        "nivel_riesgo": "Bajo",
+        "requiere_tutoria": "false",
+        "fecha_asignacion": "2023-02-10",
+        "tipo_intervencion": "Taller",
+        "fecha_atencion": "2023-03-01",
+        "condicion_socioeconomica": "Económica",
+        "fecha_solicitud": "2023-01-20",
+        "aprobado": "true",
+    }
+    fila.update(valores)
+    return fila
+
+def csv_estudiantes(filas, terminador: str = "\n") -> bytes:
+    """CSV en UTF-8 con los encabezados esperados y las `filas` dadas."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPECTED_HEADERS, lineterminator=terminador)
+    writer.writeheader()
+    writer.writerows(filas)
+    return buffer.getvalue().encode("utf-8")
+
+def subir_csv(cliente: TestClient, contenido, **parametros):
+    """Sube con `cliente` un CSV (bytes o lista de filas) con los parámetros dados."""
+    if not isinstance(contenido, bytes):
+        contenido = csv_estudiantes(contenido)
+    return cliente.post(
+        "/api/estudiantes/upload-csv",
+        params=parametros,
+        files={"file": ("estudiantes.csv", contenido, "text/csv")}
+    )
+
+@pytest.fixture
+def cliente():
+    # El lifespan vacía el almacén: cada prueba empieza sin datos
+    with TestClient(app) as cliente:
+        yield cliente
+
+@pytest.fixture
+def subir(cliente):
+    """Sube un CSV (bytes o lista de filas) con los parámetros dados y devuelve la respuesta."""
+    def subir(contenido, **parametros):
+        return subir_csv(cliente, contenido, **parametros)
+    return subir
+
+@pytest.fixture
+def persistencia(tmp_path, monkeypatch):
+    """
+    Hace que la aplicación use SQLite y snapshot en `tmp_path`. Devuelve las rutas;
+    cada `TestClient(app)` abierto después es un arranque con esos archivos.
+    """
+    import app.main as principal
+
+    rutas = {"base_datos": str(tmp_path / "estudiantes.db"), "snapshot": str(tmp_path / "estudiantes.snapshot")}
+    monkeypatch.setattr(principal, "RUTA_BASE_DATOS", rutas["base_datos"])
+    monkeypatch.setattr(principal, "RUTA_SNAPSHOT", rutas["snapshot"])
+    return rutas
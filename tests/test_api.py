@@ -1,8 +1,346 @@
 # test_api.py
 """
-Responsabilidad: Pruebas automáticas usando pytest o httpx.
+Responsabilidad: Pruebas automáticas de los endpoints de estudiantes, con pytest y TestClient.
 
 Se testean los endpoints para verificar que se comporten como se espera.
+"""
+import re
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from conftest import fila_estudiante, subir_csv
+
+def _ids(estudiantes):
+    return [estudiante["id_estudiante"] for estudiante in estudiantes]
+
+# Paginación
+
+def test_paginacion_limit_offset(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(25)]).status_code == 200
+
+    respuesta = cliente.get("/api/estudiantes", params={"limit": 10, "offset": 20})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["X-Total-Count"] == "25"
+    assert _ids(respuesta.json()) == [str(1000 + numero) for numero in range(20, 25)]
+    assert "X-Next-Cursor" not in respuesta.headers
+
+    # Sin limit se devuelve todo
+    todos = cliente.get("/api/estudiantes")
+    assert todos.headers["X-Total-Count"] == "25"
+    assert len(todos.json()) == 25
+
+def test_paginacion_con_cursor(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(25)]).status_code == 200
+
+    vistos = []
+    respuesta = cliente.get("/api/estudiantes", params={"limit": 10})
+    while True:
+        assert respuesta.headers["X-Total-Count"] == "25"
+        vistos += _ids(respuesta.json())
+        cursor = respuesta.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        respuesta = cliente.get("/api/estudiantes", params={"limit": 10, "cursor": cursor})
+    assert vistos == [str(1000 + numero) for numero in range(25)]
+
+def test_paginacion_validados(cliente, subir):
+    filas = [fila_estudiante(numero) for numero in range(6)]
+    filas[2]["correo"] = "sin-arroba"
+    assert subir(filas).status_code == 200
+
+    respuesta = cliente.get("/api/estudiantes/validados", params={"limit": 2})
+    assert respuesta.headers["X-Total-Count"] == "5"
+    siguiente = cliente.get(
+        "/api/estudiantes/validados", params={"limit": 10, "cursor": respuesta.headers["X-Next-Cursor"]}
+    )
+    assert _ids(respuesta.json()) + _ids(siguiente.json()) == ["1000", "1001", "1003", "1004", "1005"]
+
+def test_cursor_invalido_o_desactualizado(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(5)]).status_code == 200
+    assert cliente.get("/api/estudiantes", params={"cursor": "no-es-un-cursor"}).status_code == 400
+
+    cursor = cliente.get("/api/estudiantes", params={"limit": 2}).headers["X-Next-Cursor"]
+    assert subir([fila_estudiante(numero) for numero in range(4)]).status_code == 200
+    assert cliente.get("/api/estudiantes", params={"cursor": cursor}).status_code == 409
+
+def test_cursor_vale_en_otro_arranque(persistencia):
+    # Con base de datos, el cursor se arma con su generación: sirve en otro worker o tras reiniciar
+    with TestClient(app) as cliente:
+        assert subir_csv(cliente, [fila_estudiante(numero) for numero in range(5)]).status_code == 200
+        respuesta = cliente.get("/api/estudiantes", params={"limit": 2})
+        cursor = respuesta.headers["X-Next-Cursor"]
+    with TestClient(app) as cliente:
+        respuesta = cliente.get("/api/estudiantes", params={"limit": 2, "cursor": cursor})
+        assert respuesta.status_code == 200
+        assert _ids(respuesta.json()) == ["1002", "1003"]
+
+# Carga con combinar=true
+
+def _por_id(cliente):
+    return {estudiante["id_estudiante"]: estudiante for estudiante in cliente.get("/api/estudiantes").json()}
+
+def test_combinar_inserta_actualiza_y_conserva(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(5)]).status_code == 200
+
+    filas = [fila_estudiante(1, nombres="Beatriz"), fila_estudiante(2), fila_estudiante(7)]
+    respuesta = subir(filas, combinar=True)
+    assert respuesta.status_code == 200
+    resultado = respuesta.json()
+    assert {clave: resultado[clave] for clave in ["insertados", "actualizados", "sin_cambios", "eliminados"]} == {
+        "insertados": 1, "actualizados": 1, "sin_cambios": 1, "eliminados": 0
+    }
+    assert resultado["sin_id"] == 0 and resultado["ids_repetidos"] == 0
+
+    # La fila actualizada conserva su posición y la nueva va al final
+    assert _ids(cliente.get("/api/estudiantes").json()) == ["1000", "1001", "1002", "1003", "1004", "1007"]
+    assert _por_id(cliente)["1001"]["nombres"] == "Beatriz"
+
+def test_combinar_eliminando_faltantes(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(5)]).status_code == 200
+
+    respuesta = subir([fila_estudiante(3), fila_estudiante(8)], combinar=True, eliminar_faltantes=True)
+    assert respuesta.json()["eliminados"] == 4
+    assert _ids(cliente.get("/api/estudiantes").json()) == ["1003", "1008"]
+
+def test_combinar_revalida_duplicados(cliente, subir):
+    filas = [fila_estudiante(numero) for numero in range(3)]
+    assert subir(filas, validar=True).json()["registros_invalidos"] == 0
+
+    # Un correo que ya usa otra fila vuelve inválida a la nueva (la primera aparición es válida)
+    respuesta = subir([fila_estudiante(9, correo=filas[0]["correo"])], combinar=True, validar=True)
+    assert respuesta.json()["registros_validos"] == 3
+    assert respuesta.json()["registros_invalidos"] == 1
+    validados = _ids(cliente.get("/api/estudiantes/validados").json())
+    assert validados == ["1000", "1001", "1002"]
+
+    # Al corregirla, la fila pasa a ser válida
+    respuesta = subir([fila_estudiante(9)], combinar=True, validar=True)
+    assert respuesta.json()["actualizados"] == 1
+    assert respuesta.json()["registros_invalidos"] == 0
+
+def test_combinar_filas_sin_id_e_ids_repetidos(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(3)]).status_code == 200
+
+    filas = [
+        fila_estudiante(1, nombres="Primera"),
+        fila_estudiante(20, id_estudiante=""),
+        fila_estudiante(1, nombres="Segunda"),
+        fila_estudiante(21, id_estudiante="  "),
+    ]
+    resultado = subir(filas, combinar=True).json()
+    assert resultado["sin_id"] == 2
+    assert resultado["ids_repetidos"] == 1
+    assert resultado["actualizados"] == 1 and resultado["insertados"] == 0
+
+    estudiantes = cliente.get("/api/estudiantes").json()
+    # Vale la última fila de un ID repetido; las filas sin ID se agregan, sin colapsar entre sí
+    assert [estudiante["nombres"] for estudiante in estudiantes if estudiante["id_estudiante"] == "1001"] == ["Segunda"]
+    assert [estudiante["correo"] for estudiante in estudiantes[3:]] == [filas[1]["correo"], filas[3]["correo"]]
+
+    # Con eliminar_faltantes las filas sin ID anteriores se reemplazan por las del archivo
+    resultado = subir([fila_estudiante(1), fila_estudiante(30, id_estudiante="")], combinar=True, eliminar_faltantes=True).json()
+    assert resultado["eliminados"] == 4 and resultado["sin_id"] == 1
+    assert [estudiante["correo"] for estudiante in cliente.get("/api/estudiantes").json()] == [
+        fila_estudiante(1)["correo"], fila_estudiante(30)["correo"]
+    ]
+
+def test_respuesta_sin_contadores_de_combinacion(cliente, subir):
+    resultado = subir([fila_estudiante(0)]).json()
+    assert "insertados" not in resultado and "sin_id" not in resultado
+    assert resultado["registros_validos"] == 1
+
+def test_combinar_sin_cambios_no_modifica_el_almacen(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(3)]).status_code == 200
+    etag = cliente.get("/api/estudiantes").headers["ETag"]
+    resultado = subir([fila_estudiante(0), fila_estudiante(2)], combinar=True).json()
+    assert resultado["sin_cambios"] == 2
+    assert cliente.get("/api/estudiantes").headers["ETag"] == etag
+
+# ETag e If-None-Match
+
+def test_etag_responde_304(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(3)]).status_code == 200
+    for ruta in ["/api/estudiantes", "/api/estudiantes/validados"]:
+        etag = cliente.get(ruta).headers["ETag"]
+        for encabezado in [etag, f"W/{etag}", f'"otro", {etag}', "*"]:
+            respuesta = cliente.get(ruta, headers={"If-None-Match": encabezado})
+            assert respuesta.status_code == 304, encabezado
+            assert respuesta.headers["ETag"] == etag
+        assert cliente.get(ruta, headers={"If-None-Match": '"otro"'}).status_code == 200
+
+def test_etag_cambia_con_los_datos(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(3)]).status_code == 200
+    etag = cliente.get("/api/estudiantes").headers["ETag"]
+
+    assert subir([fila_estudiante(7)], combinar=True).status_code == 200
+    respuesta = cliente.get("/api/estudiantes", headers={"If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["ETag"] != etag
+    assert len(respuesta.json()) == 4
+
+def test_etag_vale_en_otro_arranque(persistencia):
+    # Con base de datos el ETag sale de su generación: un cliente revalida contra otro worker o tras reiniciar
+    with TestClient(app) as cliente:
+        assert subir_csv(cliente, [fila_estudiante(numero) for numero in range(3)]).status_code == 200
+        etag = cliente.get("/api/estudiantes").headers["ETag"]
+    with TestClient(app) as cliente:
+        assert cliente.get("/api/estudiantes", headers={"If-None-Match": etag}).status_code == 304
+        assert subir_csv(cliente, [fila_estudiante(numero) for numero in range(2)]).status_code == 200
+        assert cliente.get("/api/estudiantes", headers={"If-None-Match": etag}).status_code == 200
+
+# Métricas
+
+LINEA_MUESTRA = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*"(?:,[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\]|\\.)*")*\})? (\S+)$')
+
+def _metricas(cliente):
+    """
+    Lee GET /metrics verificando el formato de exposición; devuelve el valor de
+    cada muestra por su nombre con etiquetas y el tipo de cada métrica.
+    """
+    respuesta = cliente.get("/metrics")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert respuesta.text.endswith("\n")
+    muestras, tipos, ayudas = {}, {}, set()
+    for linea in respuesta.text.splitlines():
+        if linea.startswith("# HELP "):
+            ayudas.add(linea.split(" ")[2])
+        elif linea.startswith("# TYPE "):
+            _, _, nombre, tipo = linea.split(" ")
+            assert nombre in ayudas and nombre not in tipos
+            tipos[nombre] = tipo
+        else:
+            coincidencia = LINEA_MUESTRA.match(linea)
+            assert coincidencia, linea
+            nombre, etiquetas, valor = coincidencia.groups()
+            # Cada muestra pertenece a la última métrica declarada
+            assert nombre.startswith(list(tipos)[-1])
+            muestras[nombre + (etiquetas or "")] = float(valor)
+    return muestras, tipos
+
+def test_metricas_de_peticiones_e_ingesta(cliente, subir):
+    antes, _ = _metricas(cliente)
+    assert subir([fila_estudiante(numero) for numero in range(12)]).status_code == 200
+    assert cliente.get("/api/estudiantes/1003").status_code == 200
+    assert cliente.get("/api/estudiantes/9999").status_code == 404
+    despues, tipos = _metricas(cliente)
+
+    assert tipos["http_peticion_duracion_segundos"] == "histogram"
+    assert tipos["ingesta_filas_total"] == "counter"
+    assert tipos["almacen_filas"] == "gauge"
+
+    # Una serie por plantilla de ruta y estado, no por ID
+    serie = 'metodo="GET",ruta="/api/estudiantes/{id_estudiante}",estado="%s"'
+    for estado in ("200", "404"):
+        cuenta = "http_peticion_duracion_segundos_count{%s}" % (serie % estado)
+        assert despues[cuenta] == antes.get(cuenta, 0) + 1
+    carga = "http_peticion_duracion_segundos_count{%s}" % 'metodo="POST",ruta="/api/estudiantes/upload-csv",estado="200"'
+    assert despues[carga] == antes.get(carga, 0) + 1
+    assert despues["ingesta_filas_total"] == antes.get("ingesta_filas_total", 0) + 12
+    assert despues["almacen_filas"] == 12
+
+    # Buckets acumulados, en orden creciente de `le` y con +Inf igual a la cantidad
+    etiquetas = serie % "404"
+    limites = [
+        (clave, valor) for clave, valor in despues.items()
+        if clave.startswith("http_peticion_duracion_segundos_bucket{%s," % etiquetas)
+    ]
+    les = [clave.rsplit('le="', 1)[1].rstrip('"}') for clave, _ in limites]
+    assert les[-1] == "+Inf"
+    assert [float(le) for le in les] == sorted(float(le) for le in les)
+    cuentas = [valor for _, valor in limites]
+    assert cuentas == sorted(cuentas)
+    assert cuentas[-1] == despues["http_peticion_duracion_segundos_count{%s}" % etiquetas]
+    assert despues["http_peticion_duracion_segundos_sum{%s}" % etiquetas] >= 0
+
+# Agregados
+
+def _agregados(cliente, *por):
+    respuesta = cliente.get("/api/estudiantes/agregados", params={"por": list(por)})
+    assert respuesta.status_code == 200
+    resultado = respuesta.json()
+    assert resultado["por"] == list(por)
+    totales = [grupo["total"] for grupo in resultado["grupos"]]
+    assert totales == sorted(totales, reverse=True)
+    assert resultado["total_registros"] == sum(totales)
+    return {
+        tuple(grupo["valores"][campo] for campo in por): (grupo["validos"], grupo["invalidos"], grupo["sin_validar"])
+        for grupo in resultado["grupos"]
+    }
+
+def _recontar(cliente, *por):
+    # Los mismos conteos recorriendo las filas validadas en la carga
+    validos = set(_ids(cliente.get("/api/estudiantes/validados").json()))
+    conteos = {}
+    for estudiante in cliente.get("/api/estudiantes").json():
+        clave = tuple(estudiante[campo] for campo in por)
+        valido, invalido, sin_validar = conteos.get(clave, (0, 0, 0))
+        if estudiante["id_estudiante"] in validos:
+            valido += 1
+        else:
+            invalido += 1
+        conteos[clave] = (valido, invalido, sin_validar)
+    return conteos
+
+def _filas_agregados():
+    riesgos = ["Bajo", "Medio", "Alto"]
+    return [
+        fila_estudiante(
+            numero,
+            riesgo_desercion=riesgos[numero % 3],
+            semestre=str(1 + numero % 4),
+            nombres="Ana2" if numero % 5 == 0 else "Ana",
+        )
+        for numero in range(30)
+    ]
+
+def test_agregados_por_uno_y_varios_campos(cliente, subir):
+    assert subir(_filas_agregados()).status_code == 200
+
+    assert _agregados(cliente, "riesgo_desercion") == {
+        ("Bajo",): (8, 2, 0), ("Medio",): (8, 2, 0), ("Alto",): (8, 2, 0)
+    }
+    cruzados = _agregados(cliente, "riesgo_desercion", "semestre")
+    assert len(cruzados) == 12
+    assert cruzados == _recontar(cliente, "riesgo_desercion", "semestre")
+
+    # Sin validar en la carga, todas las filas quedan en sin_validar
+    assert subir(_filas_agregados(), validar=False).status_code == 200
+    assert _agregados(cliente, "riesgo_desercion") == {
+        ("Bajo",): (0, 0, 10), ("Medio",): (0, 0, 10), ("Alto",): (0, 0, 10)
+    }
+
+def test_agregados_con_campos_no_admitidos(cliente, subir):
+    assert subir(_filas_agregados()).status_code == 200
+
+    for por in (["correo"], ["riesgo_desercion", "nombres"], ["campo_inexistente"]):
+        respuesta = cliente.get("/api/estudiantes/agregados", params={"por": por})
+        assert respuesta.status_code == 400
+        assert por[-1] in respuesta.json()["detail"]
+    repetido = cliente.get("/api/estudiantes/agregados", params={"por": ["semestre", "semestre"]})
+    assert repetido.status_code == 400
+    assert cliente.get("/api/estudiantes/agregados").status_code == 422
+
+def test_agregados_despues_de_escribir_y_combinar(cliente, subir):
+    assert subir(_filas_agregados()).status_code == 200
+
+    # Cambia el riesgo de una fila válida, corrige una inválida, agrega una y vuelve inválida otra
+    filas = [
+        fila_estudiante(1, riesgo_desercion="Alto", semestre="2"),
+        fila_estudiante(5, riesgo_desercion="Alto", semestre="2"),
+        fila_estudiante(40, riesgo_desercion="Medio", semestre="1"),
+        fila_estudiante(41, riesgo_desercion="Bajo", semestre="2", correo=fila_estudiante(2)["correo"]),
+    ]
+    assert subir(filas, combinar=True).status_code == 200
+    for por in (("riesgo_desercion",), ("semestre",), ("riesgo_desercion", "semestre")):
+        assert _agregados(cliente, *por) == _recontar(cliente, *por)
+    assert _agregados(cliente, "riesgo_desercion")[("Alto",)] == (10, 1, 0)
+
+    # Con eliminar_faltantes solo quedan las filas del archivo
+    assert subir(filas[:2], combinar=True, eliminar_faltantes=True).status_code == 200
+    assert _agregados(cliente, "riesgo_desercion") == {("Alto",): (2, 0, 0)}
 
-Pruebas como crear_usuario, obtener_usuarios, etc.
-"""
\ No newline at end of file
+    # Una carga que reemplaza los datos reinicia los conteos
+    assert subir([fila_estudiante(0, riesgo_desercion="Medio")]).status_code == 200
+    assert _agregados(cliente, "riesgo_desercion", "semestre") == {("Medio", "3"): (1, 0, 0)}
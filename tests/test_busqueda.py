@@ -0,0 +1,70 @@
+# test_busqueda.py
+"""
+Responsabilidad: Pruebas de GET /api/estudiantes/buscar y del índice de búsqueda.
+"""
+from app.models.estudiante import EstudianteStore
+from conftest import fila_estudiante
+
+def _buscar(cliente, consulta, **parametros):
+    respuesta = cliente.get("/api/estudiantes/buscar", params={"q": consulta, **parametros})
+    assert respuesta.status_code == 200
+    return respuesta.json()
+
+def _ids(resultado):
+    return [coincidencia["estudiante"]["id_estudiante"] for coincidencia in resultado["resultados"]]
+
+def test_exacta_antes_que_prefijo_y_difusa(cliente, subir):
+    filas = [
+        fila_estudiante(0, apellidos="Gomes"),
+        fila_estudiante(1, apellidos="Gomezano"),
+        fila_estudiante(2, apellidos="Gómez"),
+        fila_estudiante(3, apellidos="Ríos"),
+    ]
+    assert subir(filas).status_code == 200
+
+    resultado = _buscar(cliente, "gomez")
+    assert _ids(resultado) == ["1002", "1001", "1000"]
+    puntajes = [coincidencia["puntaje"] for coincidencia in resultado["resultados"]]
+    assert puntajes == sorted(puntajes, reverse=True) and len(set(puntajes)) == 3
+
+    # Sin búsqueda difusa el error de tipeo no coincide
+    assert _ids(_buscar(cliente, "gomez", difusa=False)) == ["1002", "1001"]
+
+def test_sin_tildes_ni_mayusculas(cliente, subir):
+    assert subir([fila_estudiante(0, nombres="José"), fila_estudiante(1, nombres="Jose")]).status_code == 200
+    assert _ids(_buscar(cliente, "JOSÉ")) == ["1000", "1001"]
+    assert _ids(_buscar(cliente, "EST1001@UNICESAR")) == ["1001"]
+
+def test_todas_las_palabras_deben_coincidir(cliente, subir):
+    filas = [
+        fila_estudiante(0, nombres="Ana", apellidos="Ríos"),
+        fila_estudiante(1, nombres="Ana", apellidos="Gómez"),
+        fila_estudiante(2, nombres="Luis", apellidos="Gómez"),
+    ]
+    assert subir(filas).status_code == 200
+    assert _ids(_buscar(cliente, "ana gom", difusa=False)) == ["1001"]
+    assert _buscar(cliente, "ana zzz")["total"] == 0
+
+def test_limite_y_total(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(6)]).status_code == 200
+    resultado = _buscar(cliente, "ana", limit=2)
+    assert resultado["total"] == 6
+    # A igual puntaje se respeta el orden del almacén
+    assert _ids(resultado) == ["1000", "1001"]
+
+def test_consulta_sin_palabras(cliente, subir):
+    assert subir([fila_estudiante(0)]).status_code == 200
+    assert cliente.get("/api/estudiantes/buscar", params={"q": " ., "}).status_code == 400
+
+def test_indice_listo_al_terminar_la_carga(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(3)]).status_code == 200
+    store = EstudianteStore()
+    # La carga deja el índice construido: la primera consulta no lo arma en el event loop
+    assert store._version_indice == store.version
+    indice = store._indice_busqueda
+    assert _ids(_buscar(cliente, "perez")) == ["1000", "1001", "1002"]
+    assert store._indice_busqueda is indice
+
+    assert subir([fila_estudiante(9, apellidos="Núñez")], combinar=True).status_code == 200
+    assert store._version_indice == store.version
+    assert _ids(_buscar(cliente, "nunez")) == ["1009"]
@@ -0,0 +1,139 @@
+# test_csv_handler.py
+"""
+Responsabilidad: Pruebas del parser de CSV por bloques y de la exportación por fragmentos.
+
+Las filas de iter_csv_archivo e iter_csv_upload deben ser las mismas que las
+de parse_csv sobre el archivo completo, aunque un registro quede partido entre
+dos bloques. El CSV de iter_csv_export debe ser el mismo que el de csv.writer
+sobre todos los registros, sin importar el tamaño de los fragmentos.
+"""
+import asyncio
+import csv
+import io
+from types import SimpleNamespace
+
+import pytest
+from fastapi import UploadFile
+
+from app.services.estudiante_service import EXPECTED_HEADERS
+from app.utils.csv_handler import TAMANO_BLOQUE_EXPORTACION, iter_csv_archivo, iter_csv_export, iter_csv_upload, parse_csv
+from conftest import csv_estudiantes, fila_estudiante
+
+def _filas_por_bloques(contenido: bytes, tamano_bloque: int, tamano_lote: int = 3):
+    lotes = iter_csv_archivo(io.BytesIO(contenido), tamano_bloque=tamano_bloque, tamano_lote=tamano_lote)
+    return [fila for lote in lotes for fila in lote]
+
+def _contenido_dificil() -> bytes:
+    # Saltos de línea y comillas dentro de campos citados, tildes de varios bytes y CRLF
+    filas = [
+        fila_estudiante(0, nombres="Ana\nMaría", apellidos='Pérez "la Mona"'),
+        fila_estudiante(1, apellidos="Núñez\r\nGómez"),
+        fila_estudiante(2, nombres="José"),
+        fila_estudiante(3, tipo_intervencion="Asesoría, grupal"),
+    ]
+    return csv_estudiantes(filas, terminador="\r\n")
+
+@pytest.mark.parametrize("tamano_bloque", [1, 2, 3, 7, 64, 1024 * 1024])
+def test_bloques_igual_que_parse_csv(tamano_bloque):
+    contenido = _contenido_dificil()
+    assert _filas_por_bloques(contenido, tamano_bloque) == parse_csv(contenido)
+
+def test_cortes_en_cada_posicion():
+    contenido = _contenido_dificil()
+    esperado = parse_csv(contenido)
+    for corte in range(1, len(contenido)):
+        # Dos bloques: el corte cae en cada byte del archivo, también dentro de un CRLF o una tilde
+        archivo = io.BytesIO(contenido)
+        lotes = iter_csv_archivo(archivo, tamano_bloque=corte, tamano_lote=100)
+        assert [fila for lote in lotes for fila in lote] == esperado, corte
+
+def test_campos_faltantes_y_sobrantes():
+    contenido = b"a,b,c\n1,2\n1,2,3,4\n\n5,6,7\n"
+    assert _filas_por_bloques(contenido, 4) == parse_csv(contenido)
+
+def test_upload_por_bloques_y_lotes():
+    contenido = csv_estudiantes([fila_estudiante(numero) for numero in range(10)], terminador="\r\n")
+    archivo = UploadFile(file=io.BytesIO(contenido), filename="estudiantes.csv")
+
+    async def leer():
+        return [lote async for lote in iter_csv_upload(archivo, tamano_bloque=50, tamano_lote=4)]
+
+    lotes = asyncio.run(leer())
+    assert [len(lote) for lote in lotes] == [4, 4, 2]
+    assert [fila for lote in lotes for fila in lote] == parse_csv(contenido)
+
+def test_utf8_invalido():
+    with pytest.raises(ValueError):
+        _filas_por_bloques(b"a,b\n1,\xff\n", 3)
+
+def test_error_a_mitad_de_archivo_conserva_los_datos(cliente, subir):
+    anteriores = [fila_estudiante(numero) for numero in range(30)]
+    assert subir(anteriores).status_code == 200
+
+    # Un byte inválido después de varios lotes hace fallar la carga
+    nuevas = csv_estudiantes([fila_estudiante(100 + numero) for numero in range(12000)])
+    respuesta = subir(nuevas + b"9999,\xff,x\n", validar=False)
+    assert respuesta.status_code == 500
+
+    estudiantes = cliente.get("/api/estudiantes").json()
+    assert [estudiante["id_estudiante"] for estudiante in estudiantes] == [fila["id_estudiante"] for fila in anteriores]
+
+# Exportación
+
+def _registros_exportacion(cantidad: int):
+    # Comas, comillas y saltos de línea en campos que el validador no restringe
+    return [
+        SimpleNamespace(**fila_estudiante(
+            numero,
+            id_estudiante=f'{numero},"{numero}"' if numero % 3 == 0 else str(1000 + numero),
+            nombres="Ana\nMaría" if numero % 2 else "Ana",
+            semestre='3, "tercero"\nnocturno' if numero % 4 == 1 else "3",
+        ))
+        for numero in range(cantidad)
+    ]
+
+def _csv_completo(registros) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPECTED_HEADERS)
+    writer.writerows([getattr(registro, encabezado) for encabezado in EXPECTED_HEADERS] for registro in registros)
+    return buffer.getvalue()
+
+@pytest.mark.parametrize("tamano_bloque", [1, 100, TAMANO_BLOQUE_EXPORTACION])
+def test_exportacion_por_fragmentos(tamano_bloque):
+    registros = _registros_exportacion(1000)
+    fragmentos = list(iter_csv_export(registros, EXPECTED_HEADERS, tamano_bloque=tamano_bloque))
+    texto = "".join(fragmentos)
+    assert texto == _csv_completo(registros)
+
+    # Los encabezados salen solos y cada fragmento, salvo el último, llega al tamaño pedido
+    # sin pasarlo en más de una fila
+    assert fragmentos[0] == ",".join(EXPECTED_HEADERS) + "\n"
+    fila_mas_larga = max(len(_csv_completo([registro])) for registro in registros)
+    assert all(tamano_bloque <= len(fragmento) < tamano_bloque + fila_mas_larga for fragmento in fragmentos[1:-1])
+    if tamano_bloque == TAMANO_BLOQUE_EXPORTACION:
+        assert len(fragmentos) > 3
+
+    # Cada valor se recupera igual al leer el CSV
+    filas = list(csv.reader(io.StringIO(texto, newline="")))
+    assert filas[0] == EXPECTED_HEADERS
+    assert filas[1:] == [[getattr(registro, encabezado) for encabezado in EXPECTED_HEADERS] for registro in registros]
+
+def test_exportacion_sin_registros():
+    assert list(iter_csv_export([], EXPECTED_HEADERS)) == [",".join(EXPECTED_HEADERS) + "\n"]
+
+def test_descargar_csv_ida_y_vuelta(cliente, subir):
+    filas = [vars(registro) for registro in _registros_exportacion(1000)]
+    filas[5]["nombres"] = "Ana5"
+    assert subir(filas).json()["registros_invalidos"] == 1
+
+    respuesta = cliente.get("/api/estudiantes/descargar-csv")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["content-type"].startswith("text/csv")
+    assert len(respuesta.content) > 2 * TAMANO_BLOQUE_EXPORTACION
+    # El archivo descargado se vuelve a leer igual que el subido, sin la fila inválida
+    validas = filas[:5] + filas[6:]
+    assert parse_csv(respuesta.content) == [{campo: fila[campo] for campo in EXPECTED_HEADERS} for fila in validas]
+
+    # Y se puede volver a subir tal cual
+    assert subir(respuesta.content).json()["registros_validos"] == len(validas)
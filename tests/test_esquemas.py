@@ -0,0 +1,176 @@
+# test_esquemas.py
+"""
+Responsabilidad: Pruebas de paridad entre los esquemas de app/schemas/compiled_schemas.py
+y los esquemas con @validator.
+
+Cada registro se valida con ambos juegos de esquemas: deben coincidir en el
+veredicto y, si lo aceptan, en los datos resultantes. Las diferencias
+deliberadas que documenta compiled_schemas.py no aparecen en estos valores.
+"""
+import random
+import sys
+from datetime import date
+from typing import Any, Dict, List, Type
+
+import pytest
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.schemas import base_schemas, comedor_schemas, compiled_schemas, poa_schemas, pops_schemas, povau_schemas
+from app.utils.validators import validate_not_empty, validate_only_letters
+
+ESQUEMAS = {
+    "EstudianteBase": base_schemas.EstudianteBase,
+    "ServicioPermanenciaBase": base_schemas.ServicioPermanenciaBase,
+    "POVAUCreate": povau_schemas.POVAUCreate,
+    "POVAUUpdate": povau_schemas.POVAUUpdate,
+    "POACreate": poa_schemas.POACreate,
+    "POAUpdate": poa_schemas.POAUpdate,
+    "POPSCreate": pops_schemas.POPSCreate,
+    "POPSUpdate": pops_schemas.POPSUpdate,
+    "ComedorCreate": comedor_schemas.ComedorCreate,
+    "ComedorUpdate": comedor_schemas.ComedorUpdate,
+    "RegistroBeneficioCreate": comedor_schemas.RegistroBeneficioCreate,
+    "RegistroBeneficioUpdate": comedor_schemas.RegistroBeneficioUpdate,
+}
+
+FECHAS_VALIDAS = ["2023-01-15", "2023-02-28", "2024-02-29", "2023-06-01", "2023-12-31", "2024-07-04"]
+FECHAS_INVALIDAS = ["2023-02-30", "2023-13-01", "15/01/2023", "2023-1-15", "0000-01-01", "2023-01-15T00:00:00", "20230115"]
+
+# Valores válidos e inválidos por campo; los inválidos incluyen casos de borde
+VALORES: Dict[str, Dict[str, List[Any]]] = {
+    "tipo_documento": {"validos": ["CC", "TI", "CE", "Pasaporte"], "invalidos": ["cc", "XX", "CC "]},
+    "numero_documento": {"validos": ["1234567890", "12345", "A1B2C3", " 12345 "], "invalidos": ["1234", "1" * 21, "     ", "\t\n\x1c\x1d\x1e"]},
+    "nombres": {"validos": ["Juan", "María José", "Ñandú", "Ana\n", "Lu"], "invalidos": ["J", "Juan2", "  ", "Jean-Luc", "x" * 51, "Zoë"]},
+    "apellidos": {"validos": ["Pérez Gómez", "De la Hoz", "Ríos"], "invalidos": ["O'Neil", "Pérez3", "　　"]},
+    "correo": {"validos": ["juan.perez@upc.edu.co", "ana@unicesar.edu.co"], "invalidos": ["correo_invalido", "a@b", "@upc.edu.co"]},
+    "telefono": {"validos": ["3001234567", "1234567", "٣٠٠١٢٣٤٥٦٧"], "invalidos": ["123456", "1" * 16, "300-123-4567", "3001234567\n"]},
+    "direccion": {"validos": ["Calle 15 #23-45", "x" * 100], "invalidos": ["x" * 101]},
+    "programa_academico": {"validos": ["Ingeniería de Sistemas", " a "], "invalidos": ["", "   ", " "]},
+    "semestre": {"validos": [1, 5, 10, "3"], "invalidos": [0, -1, "primero", 2.5]},
+    "riesgo_desercion": {"validos": ["Muy bajo", "Bajo", "Medio", "Alto", "Muy alto"], "invalidos": ["bajo", "Crítico"]},
+    "nivel_riesgo": {"validos": ["Muy bajo", "Bajo", "Medio", "Alto", "Muy alto"], "invalidos": ["BAJO", ""]},
+    "estrato": {"validos": [1, 3, 6, "2"], "invalidos": [0, 7, "siete"]},
+    "tipo_vulnerabilidad": {"validos": ["Economica", "Academica", "Psicosocial", "Multiple", None], "invalidos": ["Económica", "Otra"]},
+    "id_estudiante": {"validos": [1, 25, "42"], "invalidos": [0, -3, "abc", 1.5]},
+    "servicio": {"validos": ["POVAU", "POA", "POPS", "Comedor"], "invalidos": ["povau", "Biblioteca"]},
+    "fecha_registro": {"validos": FECHAS_VALIDAS, "invalidos": FECHAS_INVALIDAS},
+    "estado_participacion": {"validos": ["Activo", "Inactivo", "Finalizado"], "invalidos": ["activo", "Suspendido"]},
+    "observaciones": {"validos": [None, "Buen desempeño", "x" * 255], "invalidos": ["x" * 256]},
+    "tipo_participante": {"validos": ["Admitido", "Nuevo", "Media academica"], "invalidos": ["Media académica", "nuevo"]},
+    "riesgo_spadies": {"validos": ["Bajo", "Medio", "Alto"], "invalidos": ["Muy alto", "bajo"]},
+    "fecha_ingreso_programa": {"validos": FECHAS_VALIDAS, "invalidos": FECHAS_INVALIDAS},
+    "requiere_tutoria": {"validos": [True, False, "true", 0], "invalidos": ["quizás", 2]},
+    "fecha_asignacion": {"validos": FECHAS_VALIDAS, "invalidos": FECHAS_INVALIDAS},
+    "acciones_apoyo": {"validos": [None, "Tutoría semanal"], "invalidos": ["x" * 256]},
+    "motivo_intervencion": {"validos": ["Ansiedad", "x" * 100], "invalidos": ["", " \n ", "x" * 101]},
+    "tipo_intervencion": {"validos": ["Asesoria", "Taller", "Terapia individual", "Asesoria grupal"], "invalidos": ["Asesoría", "Charla"]},
+    "fecha_atencion": {"validos": FECHAS_VALIDAS, "invalidos": FECHAS_INVALIDAS},
+    "seguimiento": {"validos": [None, "Mensual"], "invalidos": ["x" * 256]},
+    "condicion_socioeconomica": {"validos": ["Estrato 1", "x" * 100], "invalidos": ["", "\x1f", "x" * 101]},
+    "fecha_solicitud": {"validos": FECHAS_VALIDAS, "invalidos": FECHAS_INVALIDAS},
+    "aprobado": {"validos": [True, False, "yes"], "invalidos": ["talvez"]},
+    "fecha_inscripcion": {"validos": FECHAS_VALIDAS, "invalidos": FECHAS_INVALIDAS},
+    "estado_solicitud": {"validos": [True, False], "invalidos": ["pendiente"]},
+    "periodo_academico": {"validos": ["2023-1", "2024-2", "2023-1\n", "٢٠٢٣-1"], "invalidos": ["2023-3", "2023-01", "23-1"]},
+    "fecha_inicio_servicio": {"validos": FECHAS_VALIDAS, "invalidos": FECHAS_INVALIDAS},
+    "fecha_finalizacion_servicio": {"validos": FECHAS_VALIDAS, "invalidos": FECHAS_INVALIDAS},
+    "numero_raciones_asignadas": {"validos": [1, 20, "5"], "invalidos": [0, -2, "muchas"]},
+    "frecuencia_semanal": {"validos": [None, "diaria", "3 veces por semana", "2 veces por semana", "semanal"], "invalidos": ["Diaria", "mensual"]},
+    "tipo_comida_recibida": {"validos": ["Almuerzo", "Cena", "Desayuno"], "invalidos": ["almuerzo", "Merienda"]},
+}
+
+# Valores de tipo equivocado que se prueban en cualquier campo
+VALORES_EXTRANOS = [None, 12345, 3.5, ["lista"], {"a": 1}, b"bytes", date(2023, 1, 15)]
+
+def generar_registros(esquema: Type[BaseModel], cantidad: int, rng: random.Random, tasa_invalidos: float) -> List[Dict[str, Any]]:
+    """
+    Genera registros para `esquema`: cada campo toma un valor inválido con
+    probabilidad `tasa_invalidos` y a veces falta o trae un tipo equivocado.
+    """
+    registros = []
+    for _ in range(cantidad):
+        registro = {}
+        for campo in esquema.model_fields:
+            azar = rng.random()
+            if azar < 0.02:
+                continue
+            if azar < 0.04:
+                registro[campo] = rng.choice(VALORES_EXTRANOS)
+            elif azar < 0.04 + tasa_invalidos:
+                registro[campo] = rng.choice(VALORES[campo]["invalidos"])
+            else:
+                registro[campo] = rng.choice(VALORES[campo]["validos"])
+        registros.append(registro)
+    return registros
+
+def _aceptado(esquema: Type[BaseModel], registro: Dict[str, Any]):
+    try:
+        datos = esquema(**registro).model_dump()
+    except ValidationError:
+        return None
+    # Los esquemas compilados devuelven las fechas como date; los originales, como texto
+    return {campo: valor.isoformat() if isinstance(valor, date) else valor for campo, valor in datos.items()}
+
+def _comparar(nombre: str, registros: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Registros en los que el esquema compilado no coincide con el original."""
+    original, compilado = ESQUEMAS[nombre], getattr(compiled_schemas, nombre)
+    return [registro for registro in registros if _aceptado(original, registro) != _aceptado(compilado, registro)]
+
+# Fechas que RegistroBeneficioBase compara entre sí: una fecha válida puede dejar el registro fuera de orden
+FECHAS_ORDENADAS = {"fecha_inscripcion", "fecha_inicio_servicio", "fecha_finalizacion_servicio"}
+
+def _variantes(nombre: str):
+    # Un registro con el primer valor válido de cada campo y, a partir de él,
+    # uno por cada valor posible de un solo campo (o sin ese campo)
+    base = {campo: VALORES[campo]["validos"][0] for campo in ESQUEMAS[nombre].model_fields}
+    if "fecha_finalizacion_servicio" in base:
+        base["fecha_finalizacion_servicio"] = FECHAS_VALIDAS[-1]
+    yield base, True
+    for campo in base:
+        sin_campo = dict(base)
+        del sin_campo[campo]
+        yield sin_campo, None
+        for tipo, valores in [("validos", VALORES[campo]["validos"]), ("invalidos", VALORES[campo]["invalidos"]), ("extranos", VALORES_EXTRANOS)]:
+            for valor in valores:
+                esperado = {"validos": campo not in FECHAS_ORDENADAS or None, "invalidos": False}.get(tipo)
+                yield {**base, campo: valor}, esperado
+
+@pytest.mark.parametrize("nombre", ESQUEMAS)
+def test_un_campo_a_la_vez(nombre):
+    original = ESQUEMAS[nombre]
+    variantes = list(_variantes(nombre))
+    assert _comparar(nombre, [registro for registro, _ in variantes]) == []
+    # Los valores de la tabla son lo que dicen ser, para que la comparación pruebe ambos casos
+    for registro, esperado in variantes:
+        if esperado is not None:
+            assert (_aceptado(original, registro) is not None) == esperado, registro
+
+@pytest.mark.parametrize("nombre", ESQUEMAS)
+def test_registros_mezclados(nombre):
+    rng = random.Random(nombre)
+    original = ESQUEMAS[nombre]
+    registros = generar_registros(original, 200, rng, 0.01) + generar_registros(original, 200, rng, 0.2)
+    assert _comparar(nombre, registros) == []
+
+def test_reglas_de_texto_con_cada_caracter_unicode():
+    no_vacio = TypeAdapter(compiled_schemas.TextoNoVacio100)
+    nombre = TypeAdapter(compiled_schemas.NombreApellido)
+
+    def acepta(adaptador, valor):
+        try:
+            adaptador.validate_python(valor)
+            return True
+        except ValidationError:
+            return False
+
+    diferencias = []
+    for codigo in range(sys.maxunicode + 1):
+        if 0xD800 <= codigo <= 0xDFFF:
+            continue
+        caracter = chr(codigo)
+        doble = caracter * 2
+        if acepta(no_vacio, caracter) != validate_not_empty(caracter):
+            diferencias.append(("no vacío", f"U+{codigo:04X}"))
+        if acepta(nombre, doble) != (validate_only_letters(doble) and validate_not_empty(doble)):
+            diferencias.append(("nombre", f"U+{codigo:04X}"))
+    assert diferencias == []
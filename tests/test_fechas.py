@@ -0,0 +1,98 @@
+# test_fechas.py
+"""
+Responsabilidad: Pruebas de ColumnaFechas: formato dominante, memorización y fechas inválidas.
+"""
+from datetime import date, datetime
+
+import pytest
+
+import app.utils.fechas as modulo_fechas
+from app.utils.fechas import TAMANO_MUESTRA, ColumnaFechas
+
+@pytest.fixture
+def llamadas_strptime(monkeypatch):
+    # Cuenta los intentos de strptime para saber cuándo se usó la memoria
+    llamadas = []
+
+    class DatetimeContado(datetime):
+        @classmethod
+        def strptime(cls, valor, formato):
+            llamadas.append((valor, formato))
+            return datetime.strptime(valor, formato)
+
+    monkeypatch.setattr(modulo_fechas, "datetime", DatetimeContado)
+    return llamadas
+
+def _fechas_mes_dia(cantidad):
+    # Días mayores que 12: solo el formato mes/día/año las reconoce
+    return [f"{1 + numero % 12:02d}/{13 + numero % 16:02d}/{2000 + numero // 12}" for numero in range(cantidad)]
+
+def test_formato_dominante_con_la_muestra():
+    columna = ColumnaFechas()
+    for valor in _fechas_mes_dia(TAMANO_MUESTRA):
+        assert columna.es_valida(valor)
+    assert columna.formato_dominante == "%m/%d/%Y"
+    assert columna.formatos[0] == "%m/%d/%Y"
+    # Una fecha ambigua se interpreta con el formato dominante
+    assert columna.normalizar("02/03/2023") == "2023-02-03"
+
+def test_sin_muestra_completa_se_respeta_el_orden():
+    columna = ColumnaFechas()
+    assert columna.normalizar("02/03/2023") == "2023-03-02"
+    assert columna.formato_dominante is None
+
+def test_inferir_antes_de_completar_la_muestra():
+    columna = ColumnaFechas()
+    for valor in ["2023-01-15", "2023-02-20", "15/01/2023"]:
+        columna.parsear(valor)
+    assert columna.inferir_formato() == "%Y-%m-%d"
+    # Las fechas memorizadas antes de inferir se vuelven a interpretar
+    assert columna.parsear("2023-01-15") == date(2023, 1, 15)
+
+def test_empate_conserva_el_orden_de_los_formatos():
+    columna = ColumnaFechas()
+    columna.parsear("05/06/2023")
+    assert columna.inferir_formato() == "%d/%m/%Y"
+
+def test_fechas_repetidas_se_analizan_una_vez(llamadas_strptime):
+    columna = ColumnaFechas()
+    assert columna.parsear("2023-02-01") == date(2023, 2, 1)
+    primeras = len(llamadas_strptime)
+    for _ in range(1000):
+        assert columna.es_valida("2023-02-01")
+    assert len(llamadas_strptime) == primeras
+
+    # Las inválidas también se memorizan
+    assert not columna.es_valida("2023-02-30")
+    intentos = len(llamadas_strptime)
+    assert not columna.es_valida("2023-02-30")
+    assert len(llamadas_strptime) == intentos
+
+def test_con_formato_dominante_se_prueba_primero(llamadas_strptime):
+    columna = ColumnaFechas()
+    for valor in _fechas_mes_dia(TAMANO_MUESTRA):
+        columna.parsear(valor)
+    llamadas_strptime.clear()
+    assert columna.parsear("12/31/1999") == date(1999, 12, 31)
+    assert llamadas_strptime == [("12/31/1999", "%m/%d/%Y")]
+
+@pytest.mark.parametrize("valor", ["", None, "2023-02-30", "31/13/2023", "2023-1-15T00", "fecha", "0000-01-01"])
+def test_fechas_invalidas(valor):
+    columna = ColumnaFechas()
+    assert not columna.es_valida(valor)
+    assert columna.normalizar(valor) is None
+
+def test_memoria_acotada(monkeypatch):
+    monkeypatch.setattr(modulo_fechas, "MAX_VALORES_CACHE", 10)
+    columna = ColumnaFechas()
+    for dia in range(1, 26):
+        assert columna.es_valida(f"2023-01-{dia:02d}")
+    assert len(columna._fechas) <= 10
+
+def test_reiniciar_olvida_el_formato():
+    columna = ColumnaFechas()
+    for valor in _fechas_mes_dia(TAMANO_MUESTRA):
+        columna.parsear(valor)
+    columna.reiniciar()
+    assert columna.formato_dominante is None
+    assert columna.normalizar("02/03/2023") == "2023-03-02"
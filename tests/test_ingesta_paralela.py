@@ -0,0 +1,89 @@
+# test_ingesta_paralela.py
+"""
+Responsabilidad: Pruebas de la división del archivo en fragmentos para la carga en paralelo.
+
+Cada fragmento debe terminar en un salto de línea fuera de un campo citado, y
+las filas de todos los fragmentos, en orden, deben ser las de parse_csv.
+"""
+import pytest
+
+from app.services.estudiante_service import EXPECTED_HEADERS
+from app.services.ingesta_paralela import dividir_en_fragmentos, leer_encabezados, procesar_fragmento
+from app.utils.csv_handler import parse_csv
+from conftest import csv_estudiantes, fila_estudiante
+
+def _contenido_citado() -> bytes:
+    # Saltos de línea (LF y CRLF) y comillas escapadas dentro de campos citados
+    filas = [
+        fila_estudiante(0, nombres="Ana\nMaría", apellidos='Pérez "la Mona"'),
+        fila_estudiante(1, apellidos="Núñez\r\nGómez"),
+        fila_estudiante(2, nombres='"\n"'),
+        fila_estudiante(3, tipo_intervencion="Asesoría, grupal"),
+    ] + [fila_estudiante(numero) for numero in range(4, 12)]
+    return csv_estudiantes(filas, terminador="\r\n")
+
+def _escribir(tmp_path, contenido: bytes) -> str:
+    ruta = tmp_path / "estudiantes.csv"
+    ruta.write_bytes(contenido)
+    return str(ruta)
+
+@pytest.mark.parametrize("tamano", [1, 5, 64, 300, 1024 * 1024])
+def test_fragmentos_cubren_el_archivo_y_cortan_entre_registros(tmp_path, tamano):
+    contenido = _contenido_citado()
+    ruta = _escribir(tmp_path, contenido)
+    _, inicio = leer_encabezados(ruta)
+
+    fragmentos = dividir_en_fragmentos(ruta, inicio, tamano)
+    assert fragmentos[0][0] == inicio and fragmentos[-1][1] == len(contenido)
+    for (_, fin), (siguiente, _) in zip(fragmentos, fragmentos[1:]):
+        assert fin == siguiente
+        # Fuera de un campo citado: las comillas anteriores al corte están pareadas
+        assert contenido[fin - 1:fin] == b"\n"
+        assert contenido[:fin].count(b'"') % 2 == 0
+    if tamano == 1024 * 1024:
+        assert len(fragmentos) == 1
+
+@pytest.mark.parametrize("tamano", [1, 5, 64, 300])
+def test_filas_de_los_fragmentos_igual_que_parse_csv(tmp_path, tamano):
+    contenido = _contenido_citado()
+    ruta = _escribir(tmp_path, contenido)
+    encabezados, inicio = leer_encabezados(ruta)
+
+    columnas = {campo: [] for campo in EXPECTED_HEADERS}
+    for desde, hasta in dividir_en_fragmentos(ruta, inicio, tamano):
+        columnas_fragmento, codigos = procesar_fragmento(ruta, desde, hasta, encabezados, EXPECTED_HEADERS, False)
+        assert codigos is None
+        for campo in EXPECTED_HEADERS:
+            columnas[campo].extend(columnas_fragmento[campo])
+
+    filas = [dict(zip(EXPECTED_HEADERS, valores)) for valores in zip(*columnas.values())]
+    assert filas == parse_csv(contenido)
+
+def test_archivo_sin_datos(tmp_path):
+    ruta = _escribir(tmp_path, csv_estudiantes([]))
+    _, inicio = leer_encabezados(ruta)
+    assert dividir_en_fragmentos(ruta, inicio, 10) == []
+
+def test_ultima_linea_sin_salto(tmp_path):
+    contenido = csv_estudiantes([fila_estudiante(0), fila_estudiante(1, nombres="Ana\nMaría")]).rstrip(b"\n")
+    ruta = _escribir(tmp_path, contenido)
+    _, inicio = leer_encabezados(ruta)
+    fragmentos = dividir_en_fragmentos(ruta, inicio, 1)
+    assert fragmentos[-1][1] == len(contenido)
+    assert len(fragmentos) == 2
+
+def test_carga_paralela_igual_que_por_lotes(cliente, subir):
+    filas = [fila_estudiante(numero) for numero in range(20)]
+    filas[3]["nombres"] = "Ana\nMaría"
+    filas[5]["correo"] = filas[4]["correo"]
+    contenido = csv_estudiantes(filas, terminador="\r\n")
+
+    assert subir(contenido, validar=True).status_code == 200
+    por_lotes = cliente.get("/api/estudiantes").json()
+    resumen = cliente.get("/api/estudiantes/resumen-validacion").json()
+
+    respuesta = subir(contenido, validar=True, paralelo=True)
+    assert respuesta.status_code == 200
+    assert respuesta.json()["registros_invalidos"] == 1
+    assert cliente.get("/api/estudiantes").json() == por_lotes
+    assert cliente.get("/api/estudiantes/resumen-validacion").json() == resumen
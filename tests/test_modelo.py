@@ -0,0 +1,33 @@
+# test_modelo.py
+"""
+Responsabilidad: Pruebas del modelo en memoria de los estudiantes (app/models/estudiante.py).
+"""
+from app.models.estudiante import (
+    CAMPOS_CATEGORICOS, CAMPOS_ESTUDIANTE, MAX_CATEGORIAS, EstudianteModel, crear_estudiantes
+)
+from conftest import fila_estudiante
+
+def test_crear_estudiantes_equivale_al_constructor():
+    filas = [fila_estudiante(numero, semestre=str(numero % 10), aprobado=None) for numero in range(50)]
+    for numero, fila in enumerate(filas):
+        fila["fecha_atencion"] = f"2024-01-{numero:02d}"
+    esperados = [EstudianteModel(**fila) for fila in filas]
+    creados = crear_estudiantes({campo: [fila[campo] for fila in filas] for campo in CAMPOS_ESTUDIANTE})
+
+    for esperado, creado in zip(esperados, creados):
+        assert creado.es_valido is None and creado.codigos_error == 0
+        for campo in CAMPOS_ESTUDIANTE:
+            assert getattr(creado, campo) == getattr(esperado, campo)
+        for campo in CAMPOS_CATEGORICOS:
+            assert getattr(creado, "_" + campo) == getattr(esperado, "_" + campo)
+
+def test_columna_sin_espacio_en_el_diccionario(monkeypatch):
+    campo = EstudianteModel.fecha_solicitud
+    monkeypatch.setattr(campo, "valores", [None] * MAX_CATEGORIAS)
+    monkeypatch.setattr(campo, "codigos", {None: 0})
+    creado, = crear_estudiantes({
+        nombre: [valor] for nombre, valor in fila_estudiante(1, fecha_solicitud="2020-12-31").items()
+    })
+    # El diccionario está lleno: el valor nuevo se guarda tal cual
+    assert creado._fecha_solicitud == "2020-12-31"
+    assert creado.fecha_solicitud == "2020-12-31"
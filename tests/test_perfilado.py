@@ -0,0 +1,50 @@
+# test_perfilado.py
+"""
+Responsabilidad: Pruebas del profiler por muestreo de app/perfilado.py.
+"""
+import asyncio
+import sys
+import threading
+import time
+
+from app.perfilado import Muestreador
+
+def _trabajo_propio():
+    fin = time.perf_counter() + 0.02
+    while time.perf_counter() < fin:
+        pass
+
+def _trabajo_ajeno():
+    fin = time.perf_counter() + 0.02
+    while time.perf_counter() < fin:
+        pass
+
+async def _peticion(trabajo, muestreadores, vueltas=10):
+    # Cada petición perfila su propio marco, como MiddlewarePerfilado.__call__
+    muestreador = Muestreador(threading.get_ident(), sys._getframe(), intervalo=0.0005)
+    muestreadores.append(muestreador)
+    muestreador.iniciar()
+    try:
+        for _ in range(vueltas):
+            trabajo()
+            await asyncio.sleep(0)
+    finally:
+        muestreador.detener()
+
+def test_peticiones_simultaneas_no_se_mezclan():
+    muestreadores = []
+
+    async def ambas():
+        await asyncio.gather(_peticion(_trabajo_propio, muestreadores), _peticion(_trabajo_ajeno, muestreadores))
+
+    asyncio.run(ambas())
+    for muestreador, propio, ajeno in [
+        (muestreadores[0], "_trabajo_propio", "_trabajo_ajeno"),
+        (muestreadores[1], "_trabajo_ajeno", "_trabajo_propio"),
+    ]:
+        en_peticion = [pila for pila in muestreador.muestras if pila[0].startswith("_peticion ")]
+        assert any(propio in pila[-1] for pila in en_peticion)
+        # El trabajo de la otra petición, aunque corra en el mismo código, queda fuera de esta
+        assert not any(ajeno in marco for pila in en_peticion for marco in pila)
+        assert any(pila[0] == "otras tareas del event loop" and ajeno in pila[-1] for pila in muestreador.muestras)
+        assert muestreador.raiz is None
@@ -0,0 +1,196 @@
+# test_persistencia.py
+"""
+Responsabilidad: Pruebas de la recuperación de los datos al arrancar, con SQLite y snapshot.
+
+El snapshot solo se usa si corresponde a la generación actual de la base de
+datos; si falta o quedó desactualizado, los datos salen de la base y el
+snapshot se vuelve a escribir.
+"""
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from app.database import BaseDatosEstudiantes
+import app.main as principal
+from app.main import app
+from app.models.estudiante import CAMPOS_ESTUDIANTE, EstudianteStore, crear_estudiantes
+from app.snapshot import Snapshot, guardar_snapshot
+from conftest import fila_estudiante, subir_csv
+
+def _ids(cliente):
+    return [estudiante["id_estudiante"] for estudiante in cliente.get("/api/estudiantes").json()]
+
+def _generaciones(rutas):
+    base_datos = BaseDatosEstudiantes(rutas["base_datos"])
+    snapshot = Snapshot.abrir(rutas["snapshot"])
+    try:
+        return base_datos.generacion(), snapshot.generacion if snapshot is not None else None
+    finally:
+        base_datos.cerrar()
+        if snapshot is not None:
+            snapshot.cerrar()
+
+def _cargar(filas, **parametros):
+    with TestClient(app) as cliente:
+        assert subir_csv(cliente, filas, **parametros).status_code == 200
+        return _ids(cliente)
+
+def test_arranque_desde_el_snapshot(persistencia):
+    cargados = _cargar([fila_estudiante(numero) for numero in range(10)], validar=True)
+    generacion, generacion_snapshot = _generaciones(persistencia)
+    assert generacion == generacion_snapshot
+
+    with TestClient(app) as cliente:
+        # El snapshot vigente se abre sin construir las filas
+        assert EstudianteStore()._snapshot is not None
+        assert _ids(cliente) == cargados
+        assert cliente.get("/api/estudiantes/resumen-validacion").json()["registros_validos"] == 10
+
+def test_snapshot_desactualizado_se_ignora_y_se_reescribe(persistencia):
+    _cargar([fila_estudiante(numero) for numero in range(5)])
+    viejo = persistencia["snapshot"] + ".viejo"
+    shutil.copyfile(persistencia["snapshot"], viejo)
+    cargados = _cargar([fila_estudiante(numero) for numero in range(20, 28)])
+
+    # Queda el snapshot de una generación anterior (por ejemplo, si falló al escribirse)
+    os.replace(viejo, persistencia["snapshot"])
+    assert _generaciones(persistencia)[0] != _generaciones(persistencia)[1]
+
+    with TestClient(app) as cliente:
+        assert EstudianteStore()._snapshot is None
+        assert _ids(cliente) == cargados
+    generacion, generacion_snapshot = _generaciones(persistencia)
+    assert generacion == generacion_snapshot
+
+def test_snapshot_faltante_se_reconstruye_desde_la_base(persistencia):
+    cargados = _cargar([fila_estudiante(numero) for numero in range(6)], validar=True)
+    os.remove(persistencia["snapshot"])
+
+    with TestClient(app) as cliente:
+        assert _ids(cliente) == cargados
+        assert cliente.get("/api/estudiantes/resumen-validacion").json()["registros_validos"] == 6
+    generacion, generacion_snapshot = _generaciones(persistencia)
+    assert generacion == generacion_snapshot
+
+def test_snapshot_sin_base_de_datos(persistencia, monkeypatch):
+    monkeypatch.setattr(principal, "RUTA_BASE_DATOS", "")
+    cargados = _cargar([fila_estudiante(numero) for numero in range(4)])
+    assert not os.path.exists(persistencia["base_datos"])
+
+    with TestClient(app) as cliente:
+        assert _ids(cliente) == cargados
+
+def _estudiantes(numeros):
+    return crear_estudiantes({campo: [fila_estudiante(numero)[campo] for numero in numeros] for campo in CAMPOS_ESTUDIANTE})
+
+def test_snapshot_de_otro_worker_se_adopta_sin_bloquear(persistencia, monkeypatch):
+    monkeypatch.setattr(principal, "RUTA_BASE_DATOS", "")
+    with TestClient(app) as cliente:
+        assert subir_csv(cliente, [fila_estudiante(numero) for numero in range(3)]).status_code == 200
+        anteriores = _ids(cliente)
+
+        # Las filas del snapshot nuevo se construyen en el executor; aquí se frenan hasta liberarlas
+        liberar = threading.Event()
+        construir = Snapshot.estudiantes
+
+        def construir_frenado(snapshot):
+            assert liberar.wait(10)
+            return construir(snapshot)
+
+        monkeypatch.setattr(Snapshot, "estudiantes", construir_frenado)
+        # Otro worker publica una carga
+        totales = {"validado_en_carga": False, "total_validos": 0, "total_invalidos": 0, "errores_por_campo": {}}
+        guardar_snapshot(persistencia["snapshot"], _estudiantes(range(10, 15)), totales)
+
+        inicio = time.perf_counter()
+        assert _ids(cliente) == anteriores
+        assert cliente.get("/api/estudiantes/validados").status_code == 200
+        assert time.perf_counter() - inicio < 2
+        assert EstudianteStore()._sincronizando
+
+        liberar.set()
+        limite = time.perf_counter() + 10
+        while EstudianteStore()._sincronizando and time.perf_counter() < limite:
+            time.sleep(0.01)
+        assert _ids(cliente) == [str(1000 + numero) for numero in range(10, 15)]
+        # El snapshot adoptado ya está construido: no queda nada pendiente para el event loop
+        assert EstudianteStore()._snapshot is None
+
+def test_consulta_por_id_usa_la_base_sin_construir_el_snapshot(persistencia):
+    filas = [fila_estudiante(numero) for numero in range(5)]
+    filas[3]["nombres"] = "Ana3"
+    filas.append(fila_estudiante(7, id_estudiante="1001"))
+    _cargar(filas, validar=True)
+
+    with TestClient(app) as cliente:
+        store = EstudianteStore()
+        assert store._snapshot is not None
+        respuesta = cliente.get("/api/estudiantes/1003")
+        assert respuesta.status_code == 200
+        assert respuesta.json()["nombres"] == "Ana3"
+        # Con un ID repetido vale la primera aparición, igual que en memoria
+        assert cliente.get("/api/estudiantes/1001").json()["correo"] == filas[1]["correo"]
+        assert cliente.get("/api/estudiantes/9999").status_code == 404
+        assert store._snapshot is not None
+
+        # Con las filas construidas la respuesta es la misma
+        en_base = cliente.get("/api/estudiantes/1003").json()
+        assert len(_ids(cliente)) == 6
+        assert store._snapshot is None
+        assert cliente.get("/api/estudiantes/1003").json() == en_base
+
+def test_indices_de_la_base(tmp_path):
+    ruta = str(tmp_path / "estudiantes.db")
+    # Una base creada antes con índices en columnas que no se consultan
+    BaseDatosEstudiantes(ruta).cerrar()
+    conexion = sqlite3.connect(ruta)
+    conexion.execute("CREATE INDEX idx_estudiantes_correo ON estudiantes (correo)")
+    conexion.close()
+
+    base_datos = BaseDatosEstudiantes(ruta)
+    try:
+        indices = base_datos.conexion.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'estudiantes'"
+        ).fetchall()
+        assert indices == [("idx_estudiantes_id_estudiante",)]
+        plan = base_datos.conexion.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM estudiantes WHERE id_estudiante = ? ORDER BY posicion", ("1",)
+        ).fetchall()
+        assert "idx_estudiantes_id_estudiante" in str(plan)
+    finally:
+        base_datos.cerrar()
+
+def test_escrituras_simultaneas_del_snapshot(tmp_path):
+    # Dos workers (o dos cargas) que publican a la vez: cada uno escribe su propio
+    # temporal y el snapshot publicado es siempre uno de los dos, completo
+    ruta = str(tmp_path / "estudiantes.snapshot")
+    contenidos = [_estudiantes(range(inicio, inicio + 5000)) for inicio in (0, 50000)]
+    esperados = [[estudiante.id_estudiante for estudiante in estudiantes] for estudiantes in contenidos]
+    errores = []
+    barrera = threading.Barrier(2)
+
+    def escribir(estudiantes):
+        try:
+            for _ in range(25):
+                barrera.wait()
+                guardar_snapshot(ruta, estudiantes, {})
+        except BaseException as e:
+            errores.append(e)
+            barrera.abort()
+
+    hilos = [threading.Thread(target=escribir, args=(estudiantes,)) for estudiantes in contenidos]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert errores == []
+    assert os.listdir(tmp_path) == ["estudiantes.snapshot"]
+    snapshot = Snapshot(ruta)
+    try:
+        assert [estudiante.id_estudiante for estudiante in snapshot.estudiantes()] in esperados
+    finally:
+        snapshot.cerrar()
@@ -0,0 +1,171 @@
+# test_trabajos.py
+"""
+Responsabilidad: Pruebas de las cargas en segundo plano, del estado de sus trabajos
+y de la escritura del almacén fuera del event loop.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.models.estudiante import EstudianteModel, EstudianteStore
+from app.services import trabajos
+from app.services.trabajos import RegistroTrabajos
+from conftest import csv_estudiantes, fila_estudiante, subir_csv
+
+@pytest.fixture
+def directorio_trabajos(tmp_path, monkeypatch):
+    """Registro vacío que publica el estado de los trabajos en `tmp_path`."""
+    monkeypatch.setattr(RegistroTrabajos, "_trabajos", OrderedDict())
+    monkeypatch.setattr(RegistroTrabajos, "directorio", str(tmp_path))
+    return tmp_path
+
+def _esperar(cliente, job_id: str, limite: float = 10.0) -> dict:
+    fin = time.monotonic() + limite
+    while True:
+        estado = cliente.get(f"/api/estudiantes/jobs/{job_id}").json()
+        if estado["estado"] in ("completado", "error") or time.monotonic() > fin:
+            return estado
+        time.sleep(0.01)
+
+def test_estado_publicado_para_otros_workers(directorio_trabajos):
+    trabajo = RegistroTrabajos.crear("estudiantes.csv", 1000)
+    trabajo.iniciar()
+    trabajo.avanzar(10, 400)
+    trabajo.publicar()
+
+    # Otro worker no tiene el trabajo en memoria: lo lee del directorio compartido
+    RegistroTrabajos._trabajos.clear()
+    publicado = RegistroTrabajos.obtener(trabajo.id)
+    assert publicado.estado == "procesando"
+    assert publicado.resumen()["progreso"] == 0.4
+    assert publicado.resumen()["filas_procesadas"] == 10
+
+    trabajo.completar({"estudiantes_cargados": 25})
+    resumen = RegistroTrabajos.obtener(trabajo.id).resumen()
+    assert resumen == trabajo.resumen()
+    assert resumen["estado"] == "completado"
+
+def test_id_desconocido_o_invalido(directorio_trabajos):
+    assert RegistroTrabajos.obtener("0" * 32) is None
+    assert RegistroTrabajos.obtener("../" + "0" * 32) is None
+
+def test_se_conservan_los_trabajos_mas_recientes(directorio_trabajos, monkeypatch):
+    monkeypatch.setattr(trabajos, "MAX_TRABAJOS", 3)
+    creados = []
+    for numero in range(5):
+        trabajo = RegistroTrabajos.crear(f"{numero}.csv", 10)
+        trabajo.completar({})
+        # Tiempos de modificación distintos aunque el sistema de archivos tenga poca resolución
+        os.utime(directorio_trabajos / f"{trabajo.id}.json", (numero, numero))
+        creados.append(trabajo.id)
+    RegistroTrabajos.crear("ultimo.csv", 10)
+    assert sorted(os.listdir(directorio_trabajos)) == sorted(
+        f"{trabajo_id}.json" for trabajo_id in creados[3:] + [list(RegistroTrabajos._trabajos)[-1]]
+    )
+
+def test_carga_en_segundo_plano_consultada_desde_otro_worker(cliente, directorio_trabajos):
+    respuesta = cliente.post(
+        "/api/estudiantes/upload-csv",
+        params={"en_segundo_plano": True, "validar": True},
+        files={"file": ("estudiantes.csv", csv_estudiantes([fila_estudiante(numero) for numero in range(30)]), "text/csv")}
+    )
+    assert respuesta.status_code == 202
+    job_id = respuesta.json()["job_id"]
+    assert respuesta.headers["Location"].endswith(f"/api/estudiantes/jobs/{job_id}")
+
+    estado = _esperar(cliente, job_id)
+    assert estado["estado"] == "completado"
+
+    RegistroTrabajos._trabajos.clear()
+    publicado = cliente.get(f"/api/estudiantes/jobs/{job_id}")
+    assert publicado.status_code == 200
+    assert publicado.json()["resultado"]["estudiantes_cargados"] == 30
+    assert cliente.get(f"/api/estudiantes/jobs/{'f' * 32}").status_code == 404
+
+def test_estados_de_una_carga_en_segundo_plano(cliente):
+    contenido = csv_estudiantes([fila_estudiante(numero) for numero in range(5)])
+    respuesta = cliente.post(
+        "/api/estudiantes/upload-csv",
+        params={"en_segundo_plano": True},
+        files={"file": ("estudiantes.csv", contenido, "text/csv")}
+    )
+    # La respuesta sale antes de que la tarea empiece
+    assert respuesta.json()["estado"] == "pendiente"
+    assert respuesta.json()["progreso"] == 0.0
+
+    estado = _esperar(cliente, respuesta.json()["job_id"])
+    assert estado["estado"] == "completado"
+    assert estado["progreso"] == 1.0 and estado["eta_segundos"] == 0.0
+    assert estado["filas_procesadas"] == 5
+    assert estado["resultado"]["estudiantes_cargados"] == 5
+
+def test_carga_en_segundo_plano_con_error(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(3)]).status_code == 200
+    respuesta = cliente.post(
+        "/api/estudiantes/upload-csv",
+        params={"en_segundo_plano": True},
+        files={"file": ("estudiantes.csv", b"otra,cosa\n1,2\n", "text/csv")}
+    )
+    estado = _esperar(cliente, respuesta.json()["job_id"])
+    assert estado["estado"] == "error"
+    assert estado["codigo_error"] == 400
+    assert estado["resultado"] is None
+    assert len(cliente.get("/api/estudiantes").json()) == 3
+
+def test_combinacion_en_segundo_plano(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(4)]).status_code == 200
+    filas = [fila_estudiante(0, nombres="Beatriz"), fila_estudiante(9)]
+    respuesta = cliente.post(
+        "/api/estudiantes/upload-csv",
+        params={"en_segundo_plano": True, "combinar": True},
+        files={"file": ("estudiantes.csv", csv_estudiantes(filas), "text/csv")}
+    )
+    estado = _esperar(cliente, respuesta.json()["job_id"])
+    assert estado["estado"] == "completado"
+    assert estado["resultado"]["insertados"] == 1 and estado["resultado"]["actualizados"] == 1
+    assert cliente.get("/api/estudiantes/1000").json()["nombres"] == "Beatriz"
+    assert len(cliente.get("/api/estudiantes").json()) == 5
+
+def test_consultas_durante_la_escritura_ven_los_datos_anteriores(cliente, subir):
+    assert subir([fila_estudiante(numero) for numero in range(3)]).status_code == 200
+    store = EstudianteStore()
+    empezo, seguir = threading.Event(), threading.Event()
+
+    def reemplazar(almacen):
+        with almacen.carga():
+            almacen.clear_estudiantes()
+            almacen.add_estudiantes([EstudianteModel(**fila_estudiante(50))])
+            empezo.set()
+            assert seguir.wait(10)
+
+    escritura = cliente.portal.start_task_soon(store.escribir, reemplazar, True)
+    assert empezo.wait(10)
+    # La escritura está detenida en su hilo: el event loop sigue atendiendo
+    assert len(cliente.get("/api/estudiantes").json()) == 3
+    seguir.set()
+    escritura.result(10)
+    assert [estudiante["id_estudiante"] for estudiante in cliente.get("/api/estudiantes").json()] == ["1050"]
+
+def test_escritura_fallida_no_cambia_el_almacen(persistencia):
+    with TestClient(app) as cliente:
+        assert subir_csv(cliente, [fila_estudiante(numero) for numero in range(3)]).status_code == 200
+        store = EstudianteStore()
+        version = store.version
+
+        def fallar(almacen):
+            with almacen.carga():
+                almacen.clear_estudiantes()
+                raise RuntimeError("falla a mitad de la escritura")
+
+        with pytest.raises(RuntimeError):
+            cliente.portal.call(store.escribir, fallar)
+        assert store.version == version
+        assert len(cliente.get("/api/estudiantes").json()) == 3
+    # La transacción se revirtió: al arrancar de nuevo siguen las mismas filas
+    with TestClient(app) as cliente:
+        assert len(cliente.get("/api/estudiantes").json()) == 3
@@ -0,0 +1,205 @@
+# test_validacion.py
+"""
+Responsabilidad: Pruebas de la validación en la carga: veredicto de cada fila,
+totales del resumen de validación y caché del resultado de validate_estudiantes.
+"""
+import random
+
+import pytest
+
+from app.metricas import CONSULTAS_CACHE
+from app.models.estudiante import EstudianteStore, crear_estudiantes, describir_errores
+from app.services.estudiante_service import (
+    CAMPOS_FECHA, EXPECTED_HEADERS, MASCARA_DUPLICADOS, MIN_FILAS_VECTORIZADO, VALORES_PERMITIDOS,
+    EstudianteService, columnas_fechas
+)
+from conftest import fila_estudiante
+
+def _filas_con_errores():
+    return [
+        fila_estudiante(0),
+        fila_estudiante(1, nombres="Ana2"),
+        fila_estudiante(2, correo="sin-arroba"),
+        fila_estudiante(0),
+        fila_estudiante(4, fecha_atencion="2023-02-30"),
+        fila_estudiante(5, riesgo_desercion="Altísimo"),
+        fila_estudiante(6, apellidos=""),
+        fila_estudiante(7),
+    ]
+
+ERRORES_ESPERADOS = {
+    "1000": [],
+    "1001": [("nombres", "Solo letras permitidas")],
+    "1002": [("correo", "Formato inválido")],
+    # La segunda aparición del ID 1000 repite también su correo
+    "1000b": [("id_estudiante", "Valor duplicado"), ("correo", "Valor duplicado")],
+    "1004": [("fecha_atencion", "Formato de fecha inválido")],
+    "1005": [("riesgo_desercion", "Valor no permitido: Altísimo")],
+    "1006": [("apellidos", "Campo requerido")],
+    "1007": [],
+}
+
+def _resumen(cliente):
+    respuesta = cliente.get("/api/estudiantes/resumen-validacion")
+    assert respuesta.status_code == 200
+    return respuesta.json()
+
+def test_veredicto_por_fila(cliente, subir):
+    assert subir(_filas_con_errores(), validar=True).json()["registros_invalidos"] == 6
+
+    estudiantes = EstudianteStore().get_all_estudiantes()
+    claves = ["1000", "1001", "1002", "1000b", "1004", "1005", "1006", "1007"]
+    for clave, estudiante in zip(claves, estudiantes):
+        errores = sorted((campo, error) for campo, error, _ in describir_errores(estudiante, estudiante.codigos_error))
+        assert errores == sorted(ERRORES_ESPERADOS[clave]), clave
+        assert estudiante.es_valido == (not ERRORES_ESPERADOS[clave])
+
+    validados = cliente.get("/api/estudiantes/validados").json()
+    assert [estudiante["id_estudiante"] for estudiante in validados] == ["1000", "1007"]
+
+def test_resumen_desde_los_contadores(cliente, subir):
+    assert subir(_filas_con_errores(), validar=True).status_code == 200
+    resumen = _resumen(cliente)
+    assert resumen == {
+        "total_registros": 8,
+        "registros_validos": 2,
+        "registros_invalidos": 6,
+        "errores_por_campo": {
+            "nombres": {"Solo letras permitidas": 1},
+            "apellidos": {"Campo requerido": 1},
+            "correo": {"Formato inválido": 1, "Valor duplicado": 1},
+            "id_estudiante": {"Valor duplicado": 1},
+            "fecha_atencion": {"Formato de fecha inválido": 1},
+            "riesgo_desercion": {"Valor no permitido: Altísimo": 1},
+        },
+    }
+
+    # Sin validar en la carga el resumen se calcula al pedirlo y da lo mismo
+    assert subir(_filas_con_errores(), validar=False).json()["registros_validos"] is None
+    assert EstudianteStore().validado_en_carga is False
+    assert _resumen(cliente) == resumen
+
+def test_contadores_se_ajustan_al_combinar(cliente, subir):
+    filas = _filas_con_errores()
+    assert subir(filas, validar=True).status_code == 200
+
+    # Corregir una fila, invalidar otra y agregar una que repite un correo válido
+    cambios = [
+        fila_estudiante(1),
+        fila_estudiante(7, correo="otro-sin-arroba"),
+        fila_estudiante(9, correo=filas[0]["correo"]),
+    ]
+    assert subir(cambios, validar=True, combinar=True).status_code == 200
+    combinado = _resumen(cliente)
+
+    # Los contadores coinciden con validar desde cero el contenido resultante
+    assert subir(cliente.get("/api/estudiantes").json(), validar=True).status_code == 200
+    assert _resumen(cliente) == combinado
+    assert combinado["registros_validos"] == 2
+    assert combinado["errores_por_campo"]["correo"] == {"Formato inválido": 2, "Valor duplicado": 2}
+
+# Caché de validate_estudiantes
+
+def _consultas_cache(resultado):
+    return CONSULTAS_CACHE._valores.get(("validacion", resultado), 0)
+
+@pytest.fixture
+def calculos(monkeypatch):
+    """Cuenta las veces que se recalculan los códigos de error de todo el almacén."""
+    llamadas = []
+    calcular = EstudianteService._calcular_codigos_lote
+
+    def contar(servicio, estudiantes, *argumentos):
+        llamadas.append(len(estudiantes))
+        return calcular(servicio, estudiantes, *argumentos)
+
+    monkeypatch.setattr(EstudianteService, "_calcular_codigos_lote", contar)
+    return llamadas
+
+def test_cache_de_validacion(cliente, subir, calculos):
+    assert subir(_filas_con_errores(), validar=False).status_code == 200
+    calculos.clear()
+    aciertos, fallos = _consultas_cache("acierto"), _consultas_cache("fallo")
+
+    primero = EstudianteService().validate_estudiantes()
+    assert calculos == [len(_filas_con_errores())]
+    assert _consultas_cache("fallo") == fallos + 1
+
+    # Sin cambios en el almacén se reutiliza el resultado, también desde la API
+    segundo = EstudianteService().validate_estudiantes()
+    assert segundo == primero and segundo["estudiantes_validos"] is primero["estudiantes_validos"]
+    assert cliente.get("/api/estudiantes/validados").status_code == 200
+    assert _resumen(cliente)["registros_validos"] == primero["registros_validos"]
+    assert calculos == [len(_filas_con_errores())]
+    assert _consultas_cache("acierto") == aciertos + 3
+    assert _consultas_cache("fallo") == fallos + 1
+
+def test_cache_de_validacion_se_invalida_al_escribir(cliente, subir, calculos):
+    filas = [fila_estudiante(numero) for numero in range(4)]
+    assert subir(filas, validar=False).status_code == 200
+    assert EstudianteService().validate_estudiantes()["registros_invalidos"] == 0
+
+    # Una combinación que no cambia ninguna fila no modifica la versión del almacén
+    calculos.clear()
+    assert subir(filas[:2], combinar=True, validar=False).json()["sin_cambios"] == 2
+    assert EstudianteService().validate_estudiantes()["registros_invalidos"] == 0
+    assert calculos == []
+
+    # Una combinación que cambia una fila obliga a validar otra vez
+    assert subir([fila_estudiante(1, nombres="Ana1")], combinar=True, validar=False).status_code == 200
+    resultado = EstudianteService().validate_estudiantes()
+    assert calculos == [4]
+    assert [fila["estudiante"].id_estudiante for fila in resultado["detalle_invalidos"]] == ["1001"]
+
+    # Igual que una carga que reemplaza los datos
+    assert subir([fila_estudiante(7, correo="sin-arroba")], validar=False).status_code == 200
+    resultado = EstudianteService().validate_estudiantes()
+    assert calculos == [4, 1]
+    assert resultado["total_registros"] == 1 and resultado["registros_invalidos"] == 1
+
+# Validación por columnas frente a la validación fila por fila
+
+def _valores_campo(campo):
+    if campo in VALORES_PERMITIDOS:
+        return [valor for valor in VALORES_PERMITIDOS[campo] if valor] + ["", None, "Otro valor"]
+    if campo in CAMPOS_FECHA:
+        return ["2023-02-01", "01/02/2023", "13/02/2023", "02/13/2023", "2023/02/01", "2023-02-30", "fecha", "", None]
+    if campo in ("nombres", "apellidos"):
+        return ["Ana", "José María", "Núñez", "Ana2", "O'Neil", "", None]
+    if campo == "id_estudiante":
+        return [str(1000 + numero) for numero in range(40)] + ["", None]
+    if campo == "correo":
+        return [f"est{numero}@unicesar.edu.co" for numero in range(40)] + ["sin-arroba", "", None]
+    return ["1", "3", "10", "", None]
+
+def _lote_aleatorio(rng, filas):
+    # Filas válidas con números repetidos (IDs y correos duplicados) y algunos campos alterados
+    lote = []
+    for _ in range(filas):
+        fila = fila_estudiante(rng.randrange(filas))
+        for campo in rng.sample(EXPECTED_HEADERS, rng.choice([0, 0, 1, 2])):
+            fila[campo] = rng.choice(_valores_campo(campo))
+        lote.append(fila)
+    return crear_estudiantes({campo: [fila[campo] for fila in lote] for campo in EXPECTED_HEADERS})
+
+@pytest.mark.parametrize("semilla", range(5))
+def test_codigos_por_lote_igual_que_por_fila(semilla):
+    rng = random.Random(semilla)
+    servicio = EstudianteService()
+    # Los conjuntos de IDs y correos válidos pasan de un lote al siguiente, como en una carga
+    ids_lote, correos_lote, fechas_lote = set(), set(), columnas_fechas()
+    ids_fila, correos_fila, fechas_fila = set(), set(), columnas_fechas()
+    for filas in [MIN_FILAS_VECTORIZADO * 4, MIN_FILAS_VECTORIZADO + 1, MIN_FILAS_VECTORIZADO * 2]:
+        estudiantes = _lote_aleatorio(rng, filas)
+        por_lote = servicio._calcular_codigos_lote(estudiantes, ids_lote, correos_lote, fechas_lote)
+        por_fila = [
+            servicio._calcular_codigos_error(estudiante, ids_fila, correos_fila, fechas_fila)
+            for estudiante in estudiantes
+        ]
+        assert por_lote == por_fila
+        assert ids_lote == ids_fila
+        assert correos_lote == correos_fila
+    # Los lotes aleatorios tienen filas válidas y cada tipo de error
+    assert any(codigo == 0 for codigo in por_lote)
+    assert any(codigo & MASCARA_DUPLICADOS for codigo in por_lote)
+    assert any(codigo & ~MASCARA_DUPLICADOS for codigo in por_lote)
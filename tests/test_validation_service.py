@@ -0,0 +1,72 @@
+# test_validation_service.py
+"""
+Responsabilidad: Pruebas de ValidationService.validate_many frente a la
+validación de un registro a la vez con validate_data.
+"""
+import random
+
+import pytest
+
+from app.schemas.base_schemas import EstudianteBase
+from app.services.validation_service import ValidationService
+from test_esquemas import ESQUEMAS, generar_registros
+
+def _uno_por_uno(registros, esquema):
+    # Resultado y errores de validate_data para cada registro
+    resultados, errores = [], {}
+    for indice, registro in enumerate(registros):
+        try:
+            resultados.append(ValidationService.validate_data(registro, esquema))
+        except ValueError as e:
+            resultados.append(None)
+            errores[indice] = str(e).split("\n")
+    return resultados, errores
+
+@pytest.mark.parametrize("nombre", list(ESQUEMAS))
+def test_validacion_en_bloque_igual_que_uno_por_uno(nombre):
+    esquema = ESQUEMAS[nombre]
+    registros = generar_registros(esquema, 150, random.Random(nombre), tasa_invalidos=0.02)
+    resultados, errores = _uno_por_uno(registros, esquema)
+    assert any(resultado is not None for resultado in resultados) and errores
+
+    assert ValidationService.validate_many(registros, esquema) == {"resultados": resultados, "errores": errores}
+
+@pytest.mark.parametrize("nombre", list(ESQUEMAS))
+def test_particionar(nombre):
+    esquema = ESQUEMAS[nombre]
+    registros = generar_registros(esquema, 150, random.Random(nombre), tasa_invalidos=0.02)
+    resultados, errores = _uno_por_uno(registros, esquema)
+
+    particion = ValidationService.validate_many(registros, esquema, particionar=True)
+    assert particion["validos"] == [resultado for resultado in resultados if resultado is not None]
+    # Los inválidos son los registros originales, en el orden de la lista
+    assert particion["invalidos"] == [registros[indice] for indice in sorted(errores)]
+    assert all(particion["invalidos"][posicion] is registros[indice] for posicion, indice in enumerate(sorted(errores)))
+    assert particion["errores"] == errores
+
+def test_registros_que_no_son_diccionarios():
+    valido = {
+        "tipo_documento": "CC", "numero_documento": "1234567890", "nombres": "Juan", "apellidos": "Pérez",
+        "correo": "juan.perez@upc.edu.co", "programa_academico": "Ingeniería de Sistemas",
+        "semestre": 5, "riesgo_desercion": "Bajo", "estrato": 3,
+    }
+    registros = [None, valido, "texto", 5, ["lista"], EstudianteBase(**valido)]
+    resultado = ValidationService.validate_many(registros, EstudianteBase)
+
+    # Una fila que no es un diccionario no interrumpe la validación de las demás
+    mensaje = ["Error en campo 'registro': Input should be a valid dictionary or instance of EstudianteBase"]
+    assert resultado["errores"] == {0: mensaje, 2: mensaje, 3: mensaje, 4: mensaje}
+    esperado = ValidationService.validate_data(valido, EstudianteBase)
+    assert resultado["resultados"] == [None, esperado, None, None, None, esperado]
+
+def test_errores_de_fila_invalida():
+    registros = [{"tipo_documento": "XX", "nombres": "Juan2"}, {}]
+    errores = ValidationService.validate_many(registros, EstudianteBase)["errores"]
+
+    # Cada fila fallida queda como una lista de mensajes, uno por error, con el campo del error
+    assert set(errores) == {0, 1}
+    assert all(type(mensaje) is str for mensajes in errores.values() for mensaje in mensajes)
+    assert errores[0][0].startswith("Error en campo 'tipo_documento': ")
+    assert any(mensaje.startswith("Error en campo 'nombres': ") for mensaje in errores[0])
+    assert "Error en campo 'correo': Field required" in errores[0]
+    assert len(errores[1]) == len([campo for campo, info in EstudianteBase.model_fields.items() if info.is_required()])